@@ -1,5 +1,18 @@
-import React, { useState, useEffect, useCallback } from 'react';
-import { motion, AnimatePresence } from 'framer-motion';
+import React, {
+    useState,
+    useEffect,
+    useCallback,
+    useMemo,
+    useRef,
+    useLayoutEffect,
+    useSyncExternalStore,
+    Profiler,
+    createContext,
+    useContext,
+} from 'react';
+import { createPortal, flushSync } from 'react-dom';
+import { createRoot } from 'react-dom/client';
+import type { HTMLMotionProps } from 'framer-motion';
 import {
     Search,
     Play,
@@ -10,12 +23,10 @@ import {
     X,
     Loader2,
     Share,
-    Moon,
-    Sun,
-    AlertCircle,
     Music,
     LayoutList,
     Settings,
+    SkipForward,
 } from 'lucide-react';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
@@ -27,39 +38,30 @@ import {
     CardHeader,
     CardTitle,
 } from '@/components/ui/card';
-import {
-    Sheet,
-    SheetContent,
-    SheetDescription,
-    SheetHeader,
-    SheetTitle,
-    SheetTrigger,
-} from '@/components/ui/sheet';
-import {
-    DropdownMenu,
-    DropdownMenuContent,
-    DropdownMenuItem,
-    DropdownMenuLabel,
-    DropdownMenuSeparator,
-    DropdownMenuTrigger,
-} from '@/components/ui/dropdown-menu';
-import { ScrollArea } from "@/components/ui/scroll-area"
 import { cn } from '@/lib/utils';
+import type { ServiceWorkerCacheStats, ServiceWorkerMessage } from './sw';
+import {
+    ComputeState,
+    FuzzySearchIndex,
+    SearchIndex,
+    TrackTable,
+    durationSeconds,
+    formatDuration,
+    normalizeText,
+    tokenize,
+    watchUrl,
+    type ComputeMessage,
+    type ComputeReply,
+    type ComputeRequest,
+    type VideoItem,
+} from './searchCore';
 
 // Mock Data & Types (Replace with actual API calls and types)
-interface VideoItem {
-    id: string;
-    title: string;
-    artist: string;
-    thumbnail: string;
-    duration: string;
-    url: string; // Add URL for direct playback
-}
-
-interface Playlist {
+// VideoItem is defined in searchCore.ts, which the compute worker loads without this module.
+export interface Playlist {
     id: string;
     name: string;
-    videos: VideoItem[];
+    videoIds: string[];
 }
 
 const mockSearchResults: VideoItem[] = [
@@ -109,145 +111,4966 @@ const mockPlaylists: Playlist[] = [
     {
         id: 'p1',
         name: 'My Favorites',
-        videos: [mockSearchResults[0], mockSearchResults[2]],
+        videoIds: [mockSearchResults[0].id, mockSearchResults[2].id],
     },
     {
         id: 'p2',
         name: '80s Hits',
-        videos: [mockSearchResults[1], mockSearchResults[2]],
+        videoIds: [mockSearchResults[1].id, mockSearchResults[2].id],
     },
 ];
 
 const mockLyrics = `
-[Verse 1]
-We're no strangers to love
-You know the rules and so do I
-A full commitment's what I'm thinking of
-You wouldn't get this from any other guy
-
-[Pre-Chorus]
-I just wanna tell you how I'm feeling
-Gotta make you understand
-
-[Chorus]
-Never gonna give you up
-Never gonna let you down
-Never gonna run around and desert you
-Never gonna make you cry
-Never gonna say goodbye
-Never gonna tell a lie and hurt you
+[ar:Rick Astley]
+[ti:Never Gonna Give You Up]
+[00:18.50]We're no strangers to love
+[00:22.80]You know the rules and so do I
+[00:27.10]A full commitment's what I'm thinking of
+[00:31.40]You wouldn't get this from any other guy
+[00:35.70]I just wanna tell you how I'm feeling
+[00:40.00]Gotta make you understand
+[00:43.00]Never gonna give you up
+[00:45.20]Never gonna let you down
+[00:47.30]Never gonna run around and desert you
+[00:51.60]Never gonna make you cry
+[00:53.70]Never gonna say goodbye
+[00:55.90]Never gonna tell a lie and hurt you
 `;
 
-// Helper Components
-const VideoCard: React.FC<{
-    video: VideoItem;
-    onPlay: (video: VideoItem) => void;
-    onAddToPlaylist?: (video: VideoItem, playlistId: string) => void;
-    playlists?: Playlist[];
-    isListView?: boolean;
-}> = ({ video, onPlay, onAddToPlaylist, playlists, isListView }) => {
-    const [isMenuOpen, setIsMenuOpen] = useState(false);
+// Instrumentation
+// Named spans and samples from the app (search latency, play-to-audio, lyric fetches, playlist
+// edits), React Profiler commits, long tasks and dropped frames all land in one place. Each metric
+// keeps its latest samples in a fixed-size ring for p50/p95/p99 summaries. Spans also appear as
+// performance measures in the browser's performance panel. A sink, if one is set, receives every
+// event in batches (e.g. to a local collector).
+const METRIC_WINDOW = 512;
+const TELEMETRY_BATCH_SIZE = 50;
+const TELEMETRY_FLUSH_MS = 10_000;
+const TELEMETRY_MAX_PENDING = 1_000;
+const FRAME_BUDGET_MS = 1000 / 60;
 
-    return (
-        <Card
-            className={cn(
-                'group relative overflow-hidden transition-all duration-300',
-                isListView
-                    ? 'flex flex-row items-center gap-4 p-4'
-                    : 'hover:scale-[1.02] hover:shadow-lg',
-            )}
-            onClick={() => onPlay(video)}
-        >
-            {isListView ? (
-                <>
-                    <img
-                        src={video.thumbnail}
-                        alt={video.title}
-                        className="w-24 h-24 rounded-md object-cover"
-                    />
-                    <div className="flex-1">
-                        <CardTitle className="text-sm font-semibold">{video.title}</CardTitle>
-                        <CardDescription className="text-xs text-gray-400">
-                            {video.artist} - {video.duration}
-                        </CardDescription>
-                    </div>
-                </>
-            ) : (
-                <>
-                    <img
-                        src={video.thumbnail}
-                        alt={video.title}
-                        className="w-full h-48 object-cover rounded-t-lg"
-                    />
-                    <CardHeader>
-                        <CardTitle className="text-sm font-semibold">{video.title}</CardTitle>
-                        <CardDescription className="text-xs text-gray-400">
-                            {video.artist} - {video.duration}
-                        </CardDescription>
-                    </CardHeader>
-                </>
-            )}
+interface TelemetryEvent {
+    name: string;
+    value: number;
+    at: number; // epoch ms
+    detail?: Record<string, unknown>;
+}
+
+interface TelemetrySink {
+    send: (events: TelemetryEvent[]) => Promise<void> | void;
+}
+
+interface TelemetrySpan {
+    end: (detail?: Record<string, unknown>) => number;
+    cancel: () => void;
+}
+
+interface MetricSummary {
+    name: string;
+    count: number; // since start; the percentiles cover the latest METRIC_WINDOW samples
+    mean: number;
+    p50: number;
+    p95: number;
+    p99: number;
+    max: number;
+}
+
+// The latest `capacity` samples of one metric in a circular Float64Array.
+class Histogram {
+    private samples: Float64Array;
+    private next = 0;
+    private filled = 0;
+    private total = 0;
+
+    constructor(capacity = METRIC_WINDOW) {
+        this.samples = new Float64Array(capacity);
+    }
+
+    add(value: number) {
+        this.samples[this.next] = value;
+        this.next = (this.next + 1) % this.samples.length;
+        this.filled = Math.min(this.filled + 1, this.samples.length);
+        this.total++;
+    }
+
+    summary(name: string): MetricSummary {
+        const sorted = this.samples.slice(0, this.filled).sort();
+        const sum = sorted.reduce((acc, value) => acc + value, 0);
+        return {
+            name,
+            count: this.total,
+            mean: this.filled === 0 ? 0 : sum / this.filled,
+            p50: percentile(sorted, 0.5),
+            p95: percentile(sorted, 0.95),
+            p99: percentile(sorted, 0.99),
+            max: this.filled === 0 ? 0 : sorted[this.filled - 1],
+        };
+    }
+}
+
+// Posts batches as JSON, with sendBeacon where available so a batch sent while the page unloads
+// still arrives.
+export const createHttpTelemetrySink = (url: string): TelemetrySink => ({
+    send: (events) => {
+        const body = JSON.stringify(events);
+        if (typeof navigator !== 'undefined' && navigator.sendBeacon?.(url, body)) return;
+        return fetch(url, { method: 'POST', body, keepalive: true, headers: { 'Content-Type': 'application/json' } })
+            .then(() => undefined);
+    },
+});
+
+class Telemetry {
+    private histograms = new Map<string, Histogram>();
+    private pending: TelemetryEvent[] = [];
+    private sink: TelemetrySink | null = null;
+    private flushTimer: ReturnType<typeof setInterval> | null = null;
+    private nextSpanId = 0;
+
+    record(name: string, value: number, detail?: Record<string, unknown>) {
+        let histogram = this.histograms.get(name);
+        if (!histogram) this.histograms.set(name, (histogram = new Histogram()));
+        histogram.add(value);
+        if (!this.sink) return;
+        this.pending.push({ name, value, at: Date.now(), detail });
+        if (this.pending.length > TELEMETRY_MAX_PENDING) this.pending.splice(0, this.pending.length - TELEMETRY_MAX_PENDING);
+        if (this.pending.length >= TELEMETRY_BATCH_SIZE) this.flush();
+    }
+
+    // Marks the start of `name`; end() adds a performance measure and records its duration. The
+    // browser's performance panel keeps the measures it saw; the timeline's entries are cleared so
+    // they don't pile up over a long session.
+    start(name: string): TelemetrySpan {
+        const startMark = `tuneflow:${name}#${this.nextSpanId++}`;
+        const startedAt = performance.now();
+        performance.mark(startMark);
+        let open = true;
+        return {
+            end: (detail) => {
+                if (!open) return 0;
+                open = false;
+                const duration = performance.now() - startedAt;
+                performance.measure(`tuneflow:${name}`, startMark);
+                performance.clearMarks(startMark);
+                performance.clearMeasures(`tuneflow:${name}`);
+                this.record(name, duration, detail);
+                return duration;
+            },
+            cancel: () => {
+                if (!open) return;
+                open = false;
+                performance.clearMarks(startMark);
+            },
+        };
+    }
+
+    async time<T>(name: string, run: () => Promise<T>): Promise<T> {
+        const span = this.start(name);
+        try {
+            const result = await run();
+            span.end();
+            return result;
+        } finally {
+            span.cancel();
+        }
+    }
+
+    // For <Profiler onRender>; records each commit's render time under "render.<id>".
+    onRender: React.ProfilerOnRenderCallback = (id, phase, actualDuration) => {
+        this.record(`render.${id}`, actualDuration, { phase });
+    };
+
+    // Records long tasks (where supported) and frames that overran the 60Hz budget by half again.
+    // Returns a function that stops both.
+    observeMainThread() {
+        let observer: PerformanceObserver | null = null;
+        if (typeof PerformanceObserver !== 'undefined' && PerformanceObserver.supportedEntryTypes?.includes('longtask')) {
+            observer = new PerformanceObserver((list) => {
+                for (const entry of list.getEntries()) this.record('longTask', entry.duration);
+            });
+            observer.observe({ type: 'longtask', buffered: true });
+        }
+
+        let frame = 0;
+        let last = performance.now();
+        const onFrame = (now: number) => {
+            const delta = now - last;
+            last = now;
+            // Very long gaps are a hidden tab, not jank
+            if (delta > FRAME_BUDGET_MS * 1.5 && delta < 1000) this.record('droppedFrame', delta);
+            frame = requestAnimationFrame(onFrame);
+        };
+        frame = requestAnimationFrame(onFrame);
+
+        return () => {
+            observer?.disconnect();
+            cancelAnimationFrame(frame);
+        };
+    }
+
+    summaries(): MetricSummary[] {
+        return [...this.histograms]
+            .map(([name, histogram]) => histogram.summary(name))
+            .sort((a, b) => a.name.localeCompare(b.name));
+    }
+
+    export() {
+        return JSON.stringify({ exportedAt: new Date().toISOString(), userAgent: navigator.userAgent, metrics: this.summaries() }, null, 2);
+    }
+
+    clear() {
+        this.histograms.clear();
+        this.pending = [];
+    }
+
+    // Starts (or, with null, stops) batching events to `sink`. Batches also go out every
+    // TELEMETRY_FLUSH_MS and when the page is hidden.
+    setSink(sink: TelemetrySink | null) {
+        this.flush();
+        this.sink = sink;
+        if (this.flushTimer !== null) clearInterval(this.flushTimer);
+        this.flushTimer = null;
+        document.removeEventListener('visibilitychange', this.flushWhenHidden);
+        if (!sink) return;
+        this.flushTimer = setInterval(() => this.flush(), TELEMETRY_FLUSH_MS);
+        document.addEventListener('visibilitychange', this.flushWhenHidden);
+    }
+
+    flush() {
+        if (!this.sink || this.pending.length === 0) return;
+        const batch = this.pending;
+        this.pending = [];
+        try {
+            void Promise.resolve(this.sink.send(batch)).catch((error) => console.warn('Telemetry sink failed', error));
+        } catch (error) {
+            console.warn('Telemetry sink failed', error);
+        }
+    }
+
+    private flushWhenHidden = () => {
+        if (document.visibilityState === 'hidden') this.flush();
+    };
+}
+
+export const telemetry = new Telemetry();
+
+// Lazy Loading
+// The first screen is only the search bar, so the animation runtime, the menu primitives and the
+// views behind it (the full-screen player in fullScreenPlayer.tsx and syncedLyrics.tsx, and the
+// sheets in settingsSheet.tsx and playlistSheet.tsx, which bring the sheet primitives) stay out
+// of the startup bundle and load as separate chunks. Menus and sheets are prefetched once the
+// browser is idle, or when their trigger is hovered or pressed; the full-screen player once a
+// track is playing. The views import what they share with the app from this module. The motion
+// runtime waits for the user's first interaction; until it arrives, animated elements render as
+// plain ones in their final state. Startup itself is measured once: first render, first contentful
+// paint, time to interactive, and the script bytes loaded before first render against a budget.
+const STARTUP_SCRIPT_BUDGET_BYTES = 200 * 1024; // as transferred, i.e. compressed
+const TTI_QUIET_WINDOW_MS = 5_000;
+
+// A dynamically imported module. Components observe it like a store and render a fallback until
+// it has loaded; load() starts the import at most once at a time.
+class LazyModule<M> {
+    private promise: Promise<M> | null = null;
+    private module: M | null = null;
+    private listeners = new Set<() => void>();
+
+    constructor(private name: string, private loader: () => Promise<M>) {}
+
+    subscribe = (listener: () => void) => {
+        this.listeners.add(listener);
+        return () => {
+            this.listeners.delete(listener);
+        };
+    };
+
+    getSnapshot = () => this.module;
+
+    load() {
+        return (this.promise ??= telemetry.time(`chunk.${this.name}`, this.loader).then(
+            (module) => {
+                this.module = module;
+                this.listeners.forEach((listener) => listener());
+                return module;
+            },
+            (error) => {
+                this.promise = null; // allow a retry
+                throw error;
+            },
+        ));
+    }
+
+    prefetch = () => {
+        this.load().catch((error) => console.warn(`Failed to load the ${this.name} chunk`, error));
+    };
+}
+
+// The module, or null while it loads. With `load`, mounting (or `load` turning true) starts it.
+const useLazyModule = <M,>(lazyModule: LazyModule<M>, load = true) => {
+    const module = useSyncExternalStore(lazyModule.subscribe, lazyModule.getSnapshot);
+    useEffect(() => {
+        if (load) lazyModule.prefetch();
+    }, [lazyModule, load]);
+    return module;
+};
+
+const motionRuntime = new LazyModule('motion', () => import('framer-motion'));
+const dropdownMenuUi = new LazyModule('dropdownMenu', () => import('@/components/ui/dropdown-menu'));
+const fullScreenPlayerView = new LazyModule('fullScreenPlayer', () => import('./fullScreenPlayer'));
+const syncedLyricsView = new LazyModule('syncedLyrics', () => import('./syncedLyrics'));
+const settingsSheetView = new LazyModule('settingsSheet', () => import('./settingsSheet'));
+const playlistSheetView = new LazyModule('playlistSheet', () => import('./playlistSheet'));
+
+// Calls `callback` once, on the first pointer or key press. Returns a function that cancels it.
+const onFirstInteraction = (callback: () => void) => {
+    const events = ['pointerdown', 'keydown', 'touchstart'];
+    const handle = () => {
+        cancel();
+        callback();
+    };
+    const cancel = () => events.forEach((event) => window.removeEventListener(event, handle, true));
+    events.forEach((event) => window.addEventListener(event, handle, { capture: true, passive: true }));
+    return cancel;
+};
+
+// Runs `callback` when the main thread is idle (or shortly, where requestIdleCallback is missing).
+const whenIdle = (callback: () => void) => {
+    if (typeof requestIdleCallback === 'function') {
+        const handle = requestIdleCallback(callback, { timeout: 2000 });
+        return () => cancelIdleCallback(handle);
+    }
+    const timer = setTimeout(callback, 200);
+    return () => clearTimeout(timer);
+};
+
+// Compressed size of the scripts that had started loading by `before`.
+const scriptBytesBefore = (before: number) =>
+    (performance.getEntriesByType('resource') as PerformanceResourceTiming[])
+        .filter((entry) => entry.startTime <= before && (entry.initiatorType === 'script' || /\.m?js(\?|$)/.test(entry.name)))
+        .reduce((bytes, entry) => bytes + (entry.encodedBodySize || entry.transferSize), 0);
+
+let startupMeasured = false;
+
+// Call from the first commit. Time to interactive is taken as the end of the last long task (or
+// first contentful paint) followed by TTI_QUIET_WINDOW_MS without one.
+const measureStartup = () => {
+    if (startupMeasured) return;
+    startupMeasured = true;
+    const firstRender = performance.now();
+    telemetry.record('startup.firstRender', firstRender);
+    const firstPaint = performance.getEntriesByName('first-contentful-paint')[0]?.startTime;
+    if (firstPaint !== undefined) telemetry.record('startup.firstContentfulPaint', firstPaint);
+
+    const scriptBytes = scriptBytesBefore(firstRender);
+    telemetry.record('startup.scriptBytes', scriptBytes);
+    if (scriptBytes > STARTUP_SCRIPT_BUDGET_BYTES) {
+        console.warn(`Startup scripts are ${Math.round(scriptBytes / 1024)} KiB, over the ${STARTUP_SCRIPT_BUDGET_BYTES / 1024} KiB budget`);
+    }
+
+    let lastBusy = firstPaint ?? firstRender;
+    let timer: ReturnType<typeof setTimeout>;
+    let observer: PerformanceObserver | null = null;
+    const settle = () => {
+        observer?.disconnect();
+        telemetry.record('startup.timeToInteractive', lastBusy);
+    };
+    const restart = () => {
+        clearTimeout(timer);
+        timer = setTimeout(settle, TTI_QUIET_WINDOW_MS);
+    };
+    if (typeof PerformanceObserver !== 'undefined' && PerformanceObserver.supportedEntryTypes?.includes('longtask')) {
+        observer = new PerformanceObserver((list) => {
+            for (const entry of list.getEntries()) lastBusy = Math.max(lastBusy, entry.startTime + entry.duration);
+            restart();
+        });
+        observer.observe({ type: 'longtask', buffered: true });
+    }
+    restart();
+};
+
+// Compute Worker
+// Searches over a catalog run in a dedicated worker, computeWorker.ts, which loads only the search
+// core. The worker starts with the first request, not when the catalog is handed over, and is then
+// posted the catalog once; after that, requests and results refer to tracks by their position in
+// it, so a subset is a Uint32Array and results come back as transferred buffers, without a copy.
+// Where workers aren't available (tests, SSR) the same code runs synchronously on the calling thread.
+
+// Appends unseen tracks to `catalog`; a track already there is replaced in place.
+const addToCatalog = (catalog: VideoItem[], positions: Map<string, number>, videos: VideoItem[]) => {
+    for (const video of videos) {
+        const position = positions.get(video.id);
+        if (position === undefined) positions.set(video.id, catalog.push(video) - 1);
+        else catalog[position] = video;
+    }
+};
+
+class SearchCompute {
+    private videos: VideoItem[] = [];
+    private positions = new Map<string, number>();
+    private worker: Worker | null = null;
+    private local: ComputeState | null = null;
+    private pending = new Map<number, { request: ComputeRequest; resolve: (positions: Uint32Array) => void }>();
+    private nextId = 0;
+
+    constructor(videos: VideoItem[] = [], private useWorker = typeof Worker !== 'undefined') {
+        addToCatalog(this.videos, this.positions, videos); // indexed once the first request starts a worker
+    }
+
+    get usingWorker() {
+        return this.worker !== null;
+    }
+
+    add(videos: VideoItem[]) {
+        addToCatalog(this.videos, this.positions, videos);
+        return this.run({ type: 'add', videos }).then(() => undefined);
+    }
+
+    async search(query: string, limit = Infinity) {
+        return this.toVideos(await this.run({ type: 'search', query, limit }));
+    }
+
+    // Like FuzzySearchIndex.searchWithin; tracks not added to this catalog are ignored.
+    async searchWithin(videos: VideoItem[], query: string, limit = Infinity) {
+        const positions = this.toPositions(videos);
+        return this.toVideos(await this.run({ type: 'searchWithin', positions, query, limit }));
+    }
+
+    terminate() {
+        this.worker?.terminate();
+        this.worker = null;
+        this.useWorker = false;
+    }
+
+    // Inputs are copied rather than transferred, so requests stranded by a failed worker can be
+    // replayed locally.
+    private run(request: ComputeRequest): Promise<Uint32Array> {
+        if (!this.worker && this.useWorker && this.startWorker()) {
+            // A new worker is sent the whole catalog first, which already includes any tracks being added
+            const indexed = this.post({ type: 'add', videos: this.videos });
+            if (request.type === 'add') return indexed;
+        }
+        if (!this.worker) return Promise.resolve(this.runLocally(request));
+        return this.post(request);
+    }
+
+    private post(request: ComputeRequest): Promise<Uint32Array> {
+        const id = this.nextId++;
+        return new Promise((resolve) => {
+            this.pending.set(id, { request, resolve });
+            const message: ComputeMessage = { id, request };
+            this.worker!.postMessage(message);
+        });
+    }
+
+    private runLocally(request: ComputeRequest) {
+        if (!this.local) {
+            // Starts from the whole catalog, which already includes any tracks being added
+            this.local = new ComputeState();
+            this.local.run({ type: 'add', videos: this.videos });
+            if (request.type === 'add') return new Uint32Array(0);
+        }
+        return this.local.run(request);
+    }
+
+    private startWorker() {
+        try {
+            const worker = new Worker(new URL('./computeWorker.ts', import.meta.url), { type: 'module' });
+            worker.onmessage = ({ data }: MessageEvent<ComputeReply>) => {
+                const pending = this.pending.get(data.id);
+                if (!pending) return;
+                this.pending.delete(data.id);
+                if (data.error !== undefined) {
+                    console.error('Compute worker request failed', data.error);
+                    pending.resolve(this.runLocally(pending.request));
+                } else {
+                    pending.resolve(data.positions!);
+                }
+            };
+            worker.onerror = (event) => {
+                console.error('Falling back to main-thread search', event.message);
+                this.fallBack();
+            };
+            this.worker = worker;
+        } catch (error) {
+            console.error('Falling back to main-thread search', error);
+            this.useWorker = false;
+        }
+        return this.worker;
+    }
+
+    // Once the worker fails, everything runs locally, starting with what it left unanswered.
+    private fallBack() {
+        this.terminate();
+        const stranded = [...this.pending.values()];
+        this.pending.clear();
+        for (const { request, resolve } of stranded) resolve(this.runLocally(request));
+    }
+
+    private toVideos(positions: Uint32Array) {
+        return Array.from(positions, (position) => this.videos[position]);
+    }
+
+    private toPositions(videos: VideoItem[]) {
+        const positions = new Uint32Array(videos.length);
+        let count = 0;
+        for (const video of videos) {
+            const position = this.positions.get(video.id);
+            if (position !== undefined) positions[count++] = position;
+        }
+        return count === positions.length ? positions : positions.slice(0, count);
+    }
+}
+
+// Search Scheduling
+// Keystrokes are debounced. When a query fires, an in-flight request for the same normalized query
+// is reused, anything else in flight is aborted, and only the newest query's results are delivered.
+const SEARCH_DEBOUNCE_MS = 300;
+const MOCK_API_LATENCY_MS = 200;
+
+interface SearchSchedulerStats {
+    issued: number;
+    cancelled: number;
+    coalesced: number;
+    debounced: number; // pending queries a newer one replaced before they fired
+    stale: number;
+}
+
+interface SearchSchedulerOptions<T> {
+    run: (query: string, signal: AbortSignal) => Promise<T>;
+    onResult: (query: string, result: T) => void;
+    onError?: (query: string, error: unknown) => void;
+    debounceMs?: number;
+}
+
+interface InFlightSearch {
+    key: string;
+    controller: AbortController;
+    sequence: number;
+}
+
+const isAbortError = (error: unknown) => error instanceof DOMException && error.name === 'AbortError';
+
+const abortableDelay = (ms: number, signal: AbortSignal) =>
+    new Promise<void>((resolve, reject) => {
+        const abort = () => reject(new DOMException('Aborted', 'AbortError'));
+        if (signal.aborted) {
+            abort();
+            return;
+        }
+        const timer = setTimeout(resolve, ms);
+        signal.addEventListener('abort', () => {
+            clearTimeout(timer);
+            abort();
+        }, { once: true });
+    });
+
+class SearchScheduler<T> {
+    private sequence = 0;
+    private timer: ReturnType<typeof setTimeout> | null = null;
+    private inFlight: InFlightSearch | null = null;
+    private counters: SearchSchedulerStats = { issued: 0, cancelled: 0, coalesced: 0, debounced: 0, stale: 0 };
+
+    constructor(private options: SearchSchedulerOptions<T>) {}
+
+    get stats(): SearchSchedulerStats {
+        return { ...this.counters };
+    }
+
+    // `immediate` skips the debounce window, e.g. for an explicit press of the Search button.
+    schedule(query: string, immediate = false) {
+        const sequence = ++this.sequence;
+        if (this.clearTimer()) this.counters.debounced++;
+        if (immediate) {
+            this.execute(query, sequence);
+        } else {
+            this.timer = setTimeout(() => {
+                this.timer = null;
+                this.execute(query, sequence);
+            }, this.options.debounceMs ?? SEARCH_DEBOUNCE_MS);
+        }
+    }
+
+    // Drops any pending or in-flight query without delivering a result.
+    cancel() {
+        this.sequence++;
+        this.clearTimer();
+        this.abortInFlight();
+    }
+
+    private execute(query: string, sequence: number) {
+        const key = normalizeText(query);
+        if (this.inFlight?.key === key) {
+            this.inFlight.sequence = sequence;
+            this.counters.coalesced++;
+            return;
+        }
+
+        this.abortInFlight();
+        const request: InFlightSearch = { key, controller: new AbortController(), sequence };
+        this.inFlight = request;
+        this.counters.issued++;
+        this.options.run(query, request.controller.signal).then(
+            (result) => this.settle(request, () => this.options.onResult(query, result)),
+            (error) => {
+                if (!isAbortError(error)) this.settle(request, () => this.options.onError?.(query, error));
+            },
+        );
+    }
+
+    private settle(request: InFlightSearch, deliver: () => void) {
+        if (request.controller.signal.aborted) return;
+        if (this.inFlight === request) this.inFlight = null;
+        if (request.sequence !== this.sequence) {
+            this.counters.stale++;
+            request.controller.abort(); // releases whatever the result holds open, e.g. a PageStream's prefetch
+            return;
+        }
+        deliver();
+    }
+
+    // Returns whether a pending query was dropped.
+    private clearTimer() {
+        if (this.timer === null) return false;
+        clearTimeout(this.timer);
+        this.timer = null;
+        return true;
+    }
+
+    private abortInFlight() {
+        if (this.inFlight) {
+            this.inFlight.controller.abort();
+            this.inFlight = null;
+            this.counters.cancelled++;
+        }
+    }
+}
+
+// Query Cache
+// Search results keyed on the normalized query, bounded by entry count and approximate byte size
+// and evicted least-recently-used first. A miss on "queen b" can still be answered from a cached
+// "queen": every match of the longer query is a match of its prefix, so `refine` narrows it locally.
+// Only entries that `canRefine` accepts are refined, and `refine` must match the way the cached
+// results were found: a partial result set would lose matches, and a fuzzy matcher can match a
+// longer query where its prefix matched nothing.
+interface QueryCacheStats {
+    hits: number;
+    prefixHits: number;
+    misses: number;
+    evictions: number;
+    expirations: number;
+    entries: number;
+    bytes: number;
+}
+
+interface QueryCacheEntry<T> {
+    value: T;
+    bytes: number;
+    expiresAt: number;
+}
+
+interface PersistedQueryCacheEntry<T> {
+    key: string;
+    value: T;
+    expiresAt: number;
+}
+
+interface QueryCachePersistence<T> {
+    load: () => Promise<PersistedQueryCacheEntry<T>[]>;
+    save: (entries: PersistedQueryCacheEntry<T>[]) => Promise<void>;
+}
+
+interface QueryCacheOptions<T> {
+    maxEntries?: number;
+    maxBytes?: number;
+    ttlMs?: number;
+    refine?: (cached: T, query: string) => T;
+    canRefine?: (value: T) => boolean;
+    sizeOf?: (value: T) => number;
+    persistence?: QueryCachePersistence<T>;
+}
+
+// Rough UTF-16 footprint of the serialized value.
+const estimateBytes = (value: unknown) => (JSON.stringify(value)?.length ?? 0) * 2;
+
+// Stores a list of entries as one JSON value; usable as a QueryCache or SuggestionIndex persistence.
+const createLocalStoragePersistence = <E,>(storageKey: string) => ({
+    load: async (): Promise<E[]> => {
+        try {
+            return JSON.parse(localStorage.getItem(storageKey) ?? '[]');
+        } catch {
+            return [];
+        }
+    },
+    save: async (entries: E[]) => {
+        try {
+            localStorage.setItem(storageKey, JSON.stringify(entries));
+        } catch {
+            // Quota exceeded or storage disabled: the in-memory cache still works.
+        }
+    },
+});
+
+class QueryCache<T> {
+    private entries = new Map<string, QueryCacheEntry<T>>(); // iteration order is LRU -> MRU
+    private bytes = 0;
+    private counters = { hits: 0, prefixHits: 0, misses: 0, evictions: 0, expirations: 0 };
+    private saveTimer: ReturnType<typeof setTimeout> | null = null;
+    private maxEntries: number;
+    private maxBytes: number;
+    private ttlMs: number;
+
+    constructor(private options: QueryCacheOptions<T> = {}) {
+        this.maxEntries = options.maxEntries ?? 200;
+        this.maxBytes = options.maxBytes ?? 2 * 1024 * 1024;
+        this.ttlMs = options.ttlMs ?? 10 * 60 * 1000;
+    }
+
+    get stats(): QueryCacheStats {
+        return { ...this.counters, entries: this.entries.size, bytes: this.bytes };
+    }
+
+    get(query: string): T | undefined {
+        const key = normalizeText(query);
+        const value = this.lookup(key);
+        if (value !== undefined) {
+            this.counters.hits++;
+            return value;
+        }
+
+        if (this.options.refine) {
+            for (let length = key.length - 1; length > 0; length--) {
+                const cached = this.lookup(key.slice(0, length));
+                if (cached !== undefined && (this.options.canRefine?.(cached) ?? true)) {
+                    const refined = this.options.refine(cached, query);
+                    this.counters.prefixHits++;
+                    this.set(query, refined);
+                    return refined;
+                }
+            }
+        }
+
+        this.counters.misses++;
+        return undefined;
+    }
+
+    set(query: string, value: T, ttlMs = this.ttlMs) {
+        this.store(normalizeText(query), value, Date.now() + ttlMs);
+        this.schedulePersist();
+    }
+
+    clear() {
+        this.entries.clear();
+        this.bytes = 0;
+        this.schedulePersist();
+    }
+
+    // Warm start: restores persisted entries that haven't expired, oldest first so recency survives.
+    async hydrate() {
+        if (!this.options.persistence) return;
+        const now = Date.now();
+        for (const { key, value, expiresAt } of await this.options.persistence.load()) {
+            if (expiresAt > now && !this.entries.has(key)) this.store(key, value, expiresAt);
+        }
+    }
+
+    private lookup(key: string) {
+        const entry = this.entries.get(key);
+        if (!entry) return undefined;
+        this.entries.delete(key);
+        if (entry.expiresAt <= Date.now()) {
+            this.bytes -= entry.bytes;
+            this.counters.expirations++;
+            return undefined;
+        }
+        this.entries.set(key, entry);
+        return entry.value;
+    }
+
+    private store(key: string, value: T, expiresAt: number) {
+        const previous = this.entries.get(key);
+        if (previous) {
+            this.entries.delete(key);
+            this.bytes -= previous.bytes;
+        }
+
+        const bytes = (this.options.sizeOf ?? estimateBytes)(value);
+        if (bytes > this.maxBytes) return;
+        this.entries.set(key, { value, bytes, expiresAt });
+        this.bytes += bytes;
+
+        for (const [oldestKey, oldest] of this.entries) {
+            if (this.entries.size <= this.maxEntries && this.bytes <= this.maxBytes) break;
+            this.entries.delete(oldestKey);
+            this.bytes -= oldest.bytes;
+            this.counters.evictions++;
+        }
+    }
+
+    private schedulePersist() {
+        const { persistence } = this.options;
+        if (!persistence || this.saveTimer !== null) return;
+        this.saveTimer = setTimeout(() => {
+            this.saveTimer = null;
+            const now = Date.now();
+            const entries = [...this.entries]
+                .filter(([, entry]) => entry.expiresAt > now)
+                .map(([key, { value, expiresAt }]) => ({ key, value, expiresAt }));
+            void persistence.save(entries);
+        }, 1000);
+    }
+}
+
+// Search Suggestions
+// Completions for the search box come from a radix trie over catalog titles, artists and the user's
+// own past queries, so they show on every keystroke without waiting for the network. Each node keeps
+// the few best phrases of its subtree, ordered by weight, and a prefix's suggestions are read off
+// the node it ends in. A phrase can also be completed from any of its later words. Weights only
+// grow between compactions, which keeps those per-node lists exact as queries are recorded.
+// Compaction fades old history, drops the lightest phrases to stay within the node budget and
+// rebuilds the trie.
+const SUGGESTIONS_PER_NODE = 8;
+
+interface SuggestionNode {
+    label: string; // the edge into this node
+    children: Map<string, SuggestionNode> | null; // keyed by each child label's first character
+    top: number[]; // phraseIds, best first
+}
+
+interface SuggestionPhrase {
+    text: string;
+    key: string; // normalized tokens, space-separated
+    catalogWeight: number;
+    historyWeight: number;
+}
+
+interface SuggestionHistoryEntry {
+    text: string;
+    weight: number;
+}
+
+interface SuggestionPersistence {
+    load: () => Promise<SuggestionHistoryEntry[]>;
+    save: (entries: SuggestionHistoryEntry[]) => Promise<void>;
+}
+
+interface SuggestionIndexOptions {
+    maxNodes?: number;
+    compactEvery?: number; // recorded queries
+    historyWeight?: number; // added per recorded query
+    historyDecay?: number; // history weight kept at each periodic compaction
+    persistence?: SuggestionPersistence;
+}
+
+interface SuggestionIndexStats {
+    phrases: number;
+    nodes: number;
+    compactions: number;
+}
+
+const createSuggestionNode = (label: string, top: number[] = []): SuggestionNode => ({ label, children: null, top });
+
+// "Queen – Bohemian Rhapsody (Official Video Remastered)" -> "Queen – Bohemian Rhapsody"
+const stripTitleDecorations = (title: string) => title.replace(/\s*[([][^)\]]*[)\]]/g, '').trim();
+
+// A phrase key from each of its words on: "bohemian rhapsody", "rhapsody".
+const keySuffixes = (key: string) => {
+    const suffixes = [key];
+    for (let i = key.indexOf(' '); i >= 0; i = key.indexOf(' ', i + 1)) suffixes.push(key.slice(i + 1));
+    return suffixes;
+};
+
+class SuggestionIndex {
+    private phrases: SuggestionPhrase[] = [];
+    private phraseIds = new Map<string, number>(); // full key -> phraseId
+    private catalogIds = new Set<string>();
+    private root = createSuggestionNode('');
+    private nodes = 1;
+    private recorded = 0;
+    private compactions = 0;
+    private saveTimer: ReturnType<typeof setTimeout> | null = null;
+    private maxNodes: number;
+    private compactEvery: number;
+
+    constructor(private options: SuggestionIndexOptions = {}) {
+        this.maxNodes = options.maxNodes ?? 200_000;
+        this.compactEvery = options.compactEvery ?? 100;
+    }
+
+    get stats(): SuggestionIndexStats {
+        return { phrases: this.phraseIds.size, nodes: this.nodes, compactions: this.compactions };
+    }
+
+    // Titles and artists of tracks not seen before; an artist gains weight with every track.
+    addCatalog(videos: VideoItem[]) {
+        for (const video of videos) {
+            if (this.catalogIds.has(video.id)) continue;
+            this.catalogIds.add(video.id);
+            this.raise(stripTitleDecorations(video.title), 1, 0);
+            this.raise(video.artist, 1, 0);
+            if (this.nodes > this.maxNodes) this.compact();
+        }
+    }
+
+    // Counts a query the user actually ran, e.g. submitted or played a result of.
+    recordQuery(query: string) {
+        this.raise(query.trim(), 0, this.options.historyWeight ?? 5);
+        if (++this.recorded % this.compactEvery === 0) {
+            this.compact(this.options.historyDecay ?? 0.8);
+        } else if (this.nodes > this.maxNodes) {
+            this.compact();
+        }
+        this.schedulePersist();
+    }
+
+    // Best completions of `prefix`, best first. An empty prefix lists the heaviest phrases overall.
+    suggest(prefix: string, limit = SUGGESTIONS_PER_NODE): string[] {
+        let key = tokenize(normalizeText(prefix)).join(' ');
+        if (key && /\s$/.test(prefix)) key += ' '; // the next word has started
+        let node = this.root;
+        for (let depth = 0; depth < key.length;) {
+            const child = node.children?.get(key[depth]);
+            if (!child) return [];
+            const length = Math.min(child.label.length, key.length - depth);
+            if (child.label.slice(0, length) !== key.slice(depth, depth + length)) return [];
+            node = child;
+            depth += length;
+        }
+        return node.top.slice(0, limit).map((phraseId) => this.phrases[phraseId].text);
+    }
+
+    history(): SuggestionHistoryEntry[] {
+        return this.phrases
+            .filter((phrase) => phrase.historyWeight > 0)
+            .map(({ text, historyWeight }) => ({ text, weight: historyWeight }));
+    }
+
+    clearHistory() {
+        for (const phrase of this.phrases) phrase.historyWeight = 0;
+        this.compact();
+        this.schedulePersist();
+    }
+
+    // Restores persisted history on top of whatever was recorded since startup.
+    async hydrate() {
+        if (!this.options.persistence) return;
+        for (const { text, weight } of await this.options.persistence.load()) this.raise(text, 0, weight);
+        if (this.nodes > this.maxNodes) this.compact();
+    }
+
+    // Multiplies history weights by `historyDecay` (forgetting those that fall too low), then keeps
+    // the heaviest phrases that fit in three quarters of the node budget.
+    compact(historyDecay = 1) {
+        const kept = this.phrases
+            .map((phrase) => {
+                const historyWeight = phrase.historyWeight * historyDecay;
+                return { ...phrase, historyWeight: historyWeight >= 0.5 ? historyWeight : 0 };
+            })
+            .filter((phrase) => phrase.catalogWeight + phrase.historyWeight > 0)
+            .sort((a, b) => b.catalogWeight + b.historyWeight - (a.catalogWeight + a.historyWeight));
+
+        // Re-inserting in weight order fills every node's list best first
+        this.phrases = [];
+        this.phraseIds.clear();
+        this.root = createSuggestionNode('');
+        this.nodes = 1;
+        for (const phrase of kept) {
+            if (this.nodes > this.maxNodes * 0.75) break;
+            const phraseId = this.phrases.push(phrase) - 1;
+            this.phraseIds.set(phrase.key, phraseId);
+            this.insert(phraseId);
+        }
+        this.compactions++;
+    }
+
+    private raise(text: string, catalogWeight: number, historyWeight: number) {
+        const key = tokenize(normalizeText(text)).join(' ');
+        if (!key) return;
+        let phraseId = this.phraseIds.get(key);
+        if (phraseId === undefined) {
+            phraseId = this.phrases.push({ text, key, catalogWeight: 0, historyWeight: 0 }) - 1;
+            this.phraseIds.set(key, phraseId);
+        }
+        const phrase = this.phrases[phraseId];
+        phrase.catalogWeight += catalogWeight;
+        phrase.historyWeight += historyWeight;
+        this.insert(phraseId);
+    }
+
+    // Creates the phrase's paths as needed and moves it up each node's list to match its weight.
+    private insert(phraseId: number) {
+        for (const key of keySuffixes(this.phrases[phraseId].key)) {
+            let node = this.root;
+            this.promote(node, phraseId);
+            for (let depth = 0; depth < key.length;) {
+                node.children ??= new Map();
+                let child = node.children.get(key[depth]);
+                if (!child) {
+                    child = createSuggestionNode(key.slice(depth));
+                    node.children.set(key[depth], child);
+                    this.nodes++;
+                } else {
+                    const label = child.label;
+                    let shared = 1;
+                    while (shared < label.length && label[shared] === key[depth + shared]) shared++;
+                    if (shared < label.length) {
+                        // Split the edge; the new upper node covers the same phrases as the old one
+                        const upper = createSuggestionNode(label.slice(0, shared), child.top.slice());
+                        child.label = label.slice(shared);
+                        upper.children = new Map([[child.label[0], child]]);
+                        node.children.set(key[depth], upper);
+                        this.nodes++;
+                        child = upper;
+                    }
+                }
+                node = child;
+                depth += child.label.length;
+                this.promote(node, phraseId);
+            }
+        }
+    }
+
+    private promote(node: SuggestionNode, phraseId: number) {
+        const top = node.top;
+        let i = top.indexOf(phraseId);
+        if (i < 0) {
+            if (top.length < SUGGESTIONS_PER_NODE) {
+                i = top.push(phraseId) - 1;
+            } else if (this.ranksAbove(phraseId, top[top.length - 1])) {
+                i = top.length - 1;
+                top[i] = phraseId;
+            } else {
+                return;
+            }
+        }
+        for (; i > 0 && this.ranksAbove(top[i], top[i - 1]); i--) {
+            [top[i], top[i - 1]] = [top[i - 1], top[i]];
+        }
+    }
+
+    // Heavier first; equal weights keep insertion order.
+    private ranksAbove(a: number, b: number) {
+        const weightA = this.phrases[a].catalogWeight + this.phrases[a].historyWeight;
+        const weightB = this.phrases[b].catalogWeight + this.phrases[b].historyWeight;
+        return weightA > weightB || (weightA === weightB && a < b);
+    }
+
+    private schedulePersist() {
+        const { persistence } = this.options;
+        if (!persistence || this.saveTimer !== null) return;
+        this.saveTimer = setTimeout(() => {
+            this.saveTimer = null;
+            void persistence.save(this.history());
+        }, 1000);
+    }
+}
+
+// Search Paging
+// Results arrive page by page through an async generator. The first page is kept small so it can
+// render quickly; later pages are larger, and PageStream keeps one of them in flight ahead of the
+// consumer so scrolling near the end usually finds it already loaded.
+const FIRST_PAGE_SIZE = 12;
+const PAGE_SIZE = 48;
+
+interface SearchPage<T> {
+    items: T[];
+    nextPageToken?: string;
+}
+
+// A query's results as far as they have been fetched, and the API's token for the rest.
+interface CachedSearch {
+    videos: VideoItem[];
+    nextPageToken?: string;
+}
+
+type SearchPageFetcher<T> = (
+    query: string,
+    pageSize: number,
+    pageToken: string | undefined,
+    signal: AbortSignal,
+) => Promise<SearchPage<T>>;
+
+async function* searchPages<T>(fetchPage: SearchPageFetcher<T>, query: string, signal: AbortSignal) {
+    let pageToken: string | undefined;
+    let pageSize = FIRST_PAGE_SIZE;
+    do {
+        const page = await fetchPage(query, pageSize, pageToken, signal);
+        pageToken = page.nextPageToken;
+        pageSize = PAGE_SIZE;
+        yield page.items;
+    } while (pageToken !== undefined);
+}
+
+// Cursor over an already ranked result list; the page token is the offset of the next page. With
+// `more`, the list is known to continue past its end.
+const pageOf = <T,>(results: T[], pageSize: number, pageToken?: string, more = false): SearchPage<T> => {
+    const offset = Number(pageToken ?? 0);
+    const end = offset + pageSize;
+    return { items: results.slice(offset, end), nextPageToken: end < results.length || more ? String(end) : undefined };
+};
+
+class PageStream<T> implements AsyncIterableIterator<T[]> {
+    private controller = new AbortController();
+    private pages: AsyncIterator<T[]>;
+    private prefetched: Promise<IteratorResult<T[]>> | null = null;
+    private finished = false;
+
+    constructor(open: (signal: AbortSignal) => AsyncIterator<T[]>, signal?: AbortSignal) {
+        this.pages = open(this.controller.signal);
+        signal?.addEventListener('abort', () => this.close(), { once: true });
+    }
+
+    get done() {
+        return this.finished;
+    }
+
+    async next(): Promise<IteratorResult<T[]>> {
+        if (this.finished) return { done: true, value: undefined };
+        const pending = this.prefetched ?? this.pages.next();
+        this.prefetched = null;
+        const result = await pending;
+        if (result.done) {
+            this.finished = true;
+        } else if (!this.controller.signal.aborted) {
+            this.prefetched = this.pages.next();
+            this.prefetched.catch(() => {}); // surfaced by the next call to next()
+        }
+        return result;
+    }
+
+    async return(): Promise<IteratorResult<T[]>> {
+        this.close();
+        return { done: true, value: undefined };
+    }
+
+    close() {
+        this.finished = true;
+        this.prefetched = null;
+        this.controller.abort();
+    }
+
+    [Symbol.asyncIterator]() {
+        return this;
+    }
+}
+
+// Playlist Store
+// Each VideoItem is stored once, keyed by id; playlists hold ordered id arrays plus a membership
+// set for O(1) lookups. Every mutation replaces only the affected Playlist object, so unchanged
+// playlists keep their identity and memoized consumers can skip them. Mutation observers hear of
+// each edit as it is made (reset and applyChanges excepted), e.g. to replicate it elsewhere.
+type PlaylistMutation =
+    | { type: 'create'; playlistId: string; name: string }
+    | { type: 'rename'; playlistId: string; name: string }
+    | { type: 'delete'; playlistId: string }
+    | { type: 'add'; playlistId: string; videos: VideoItem[] }
+    | { type: 'remove'; playlistId: string; videoIds: string[] }
+    | { type: 'move'; playlistId: string; videoId: string; toIndex: number };
+
+class PlaylistStore {
+    private videos = new Map<string, VideoItem>();
+    private playlists = new Map<string, Playlist>(); // insertion order is display order
+    private members = new Map<string, Set<string>>();
+    private snapshot: Playlist[] = [];
+    private listeners = new Set<() => void>();
+    private mutationObservers = new Set<(mutation: PlaylistMutation) => void>();
+    private batchDepth = 0;
+    private dirty = false;
+
+    constructor(playlists: Playlist[] = [], videos: VideoItem[] = []) {
+        this.reset(playlists, videos);
+    }
+
+    subscribe = (listener: () => void) => {
+        this.listeners.add(listener);
+        return () => {
+            this.listeners.delete(listener);
+        };
+    };
+
+    getPlaylists = () => this.snapshot;
+
+    observeMutations(observer: (mutation: PlaylistMutation) => void) {
+        this.mutationObservers.add(observer);
+        return () => {
+            this.mutationObservers.delete(observer);
+        };
+    }
+
+    getPlaylist(playlistId: string) {
+        return this.playlists.get(playlistId);
+    }
+
+    getVideo(videoId: string) {
+        return this.videos.get(videoId);
+    }
+
+    videosOf(playlistId: string): VideoItem[] {
+        const videos: VideoItem[] = [];
+        for (const videoId of this.playlists.get(playlistId)?.videoIds ?? []) {
+            const video = this.videos.get(videoId);
+            if (video) videos.push(video);
+        }
+        return videos;
+    }
+
+    has(playlistId: string, videoId: string) {
+        return this.members.get(playlistId)?.has(videoId) ?? false;
+    }
+
+    // Applies several mutations with a single notification.
+    batch(update: () => void) {
+        this.batchDepth++;
+        try {
+            update();
+        } finally {
+            this.batchDepth--;
+            this.flush();
+        }
+    }
+
+    reset(playlists: Playlist[], videos: VideoItem[] = []) {
+        this.batch(() => {
+            this.videos.clear();
+            this.playlists.clear();
+            this.members.clear();
+            for (const video of videos) this.videos.set(video.id, video);
+            for (const playlist of playlists) {
+                const videoIds = [...new Set(playlist.videoIds)];
+                this.playlists.set(playlist.id, { ...playlist, videoIds });
+                this.members.set(playlist.id, new Set(videoIds));
+            }
+            this.dirty = true;
+        });
+    }
+
+    createPlaylist(name: string, playlistId = `p${Date.now().toString(36)}${Math.random().toString(36).slice(2, 6)}`) {
+        this.replace({ id: playlistId, name, videoIds: [] });
+        this.members.set(playlistId, new Set());
+        this.report({ type: 'create', playlistId, name });
+        return playlistId;
+    }
+
+    renamePlaylist(playlistId: string, name: string) {
+        const playlist = this.playlists.get(playlistId);
+        if (!playlist || playlist.name === name) return;
+        this.replace({ ...playlist, name });
+        this.report({ type: 'rename', playlistId, name });
+    }
+
+    deletePlaylist(playlistId: string) {
+        if (this.playlists.delete(playlistId)) {
+            this.members.delete(playlistId);
+            this.changed();
+            this.report({ type: 'delete', playlistId });
+        }
+    }
+
+    // Replaces or removes whole playlists without reporting mutations: for changes that were made
+    // elsewhere. Playlists new to the store are appended in the given order.
+    applyChanges(playlists: Playlist[], removedIds: string[] = []) {
+        this.batch(() => {
+            for (const playlistId of removedIds) {
+                if (this.playlists.delete(playlistId)) this.dirty = true;
+                this.members.delete(playlistId);
+            }
+            for (const playlist of playlists) {
+                const current = this.playlists.get(playlist.id);
+                if (
+                    current?.name === playlist.name &&
+                    current.videoIds.length === playlist.videoIds.length &&
+                    current.videoIds.every((videoId, i) => videoId === playlist.videoIds[i])
+                ) {
+                    continue;
+                }
+                this.playlists.set(playlist.id, playlist);
+                this.members.set(playlist.id, new Set(playlist.videoIds));
+                this.dirty = true;
+            }
+        });
+    }
+
+    // Refreshes the video table without touching any playlist, e.g. after lazy hydration.
+    upsertVideos(videos: VideoItem[]) {
+        for (const video of videos) this.videos.set(video.id, video);
+    }
+
+    // Videos already in the playlist are skipped; the rest are appended in order.
+    addVideos(playlistId: string, videos: VideoItem[]) {
+        const playlist = this.playlists.get(playlistId);
+        const members = this.members.get(playlistId);
+        if (!playlist || !members) return;
+
+        const added: VideoItem[] = [];
+        for (const video of videos) {
+            this.videos.set(video.id, video);
+            if (!members.has(video.id)) {
+                members.add(video.id);
+                added.push(video);
+            }
+        }
+        if (added.length > 0) {
+            this.replace({ ...playlist, videoIds: playlist.videoIds.concat(added.map((video) => video.id)) });
+            this.report({ type: 'add', playlistId, videos: added });
+        }
+    }
+
+    removeVideos(playlistId: string, videoIds: string[]) {
+        const playlist = this.playlists.get(playlistId);
+        const members = this.members.get(playlistId);
+        if (!playlist || !members) return;
+
+        const removed = new Set(videoIds.filter((videoId) => members.delete(videoId)));
+        if (removed.size > 0) {
+            this.replace({ ...playlist, videoIds: playlist.videoIds.filter((videoId) => !removed.has(videoId)) });
+            this.report({ type: 'remove', playlistId, videoIds: [...removed] });
+        }
+    }
+
+    moveVideo(playlistId: string, fromIndex: number, toIndex: number) {
+        const playlist = this.playlists.get(playlistId);
+        const length = playlist?.videoIds.length ?? 0;
+        if (!playlist || fromIndex === toIndex || fromIndex < 0 || toIndex < 0 || fromIndex >= length || toIndex >= length) {
+            return;
+        }
+        const videoIds = playlist.videoIds.slice();
+        const [videoId] = videoIds.splice(fromIndex, 1);
+        videoIds.splice(toIndex, 0, videoId);
+        this.replace({ ...playlist, videoIds });
+        this.report({ type: 'move', playlistId, videoId, toIndex });
+    }
+
+    private report(mutation: PlaylistMutation) {
+        this.mutationObservers.forEach((observer) => observer(mutation));
+    }
+
+    private replace(playlist: Playlist) {
+        this.playlists.set(playlist.id, playlist);
+        this.changed();
+    }
+
+    private changed() {
+        this.dirty = true;
+        this.flush();
+    }
+
+    private flush() {
+        if (this.batchDepth > 0 || !this.dirty) return;
+        this.dirty = false;
+        this.snapshot = [...this.playlists.values()];
+        this.listeners.forEach((listener) => listener());
+    }
+}
+
+const usePlaylists = (store: PlaylistStore) => useSyncExternalStore(store.subscribe, store.getPlaylists);
+
+// Share Links
+// A shared playlist travels in the link's fragment as base64url bytes: a version byte, a flags
+// byte, then the body, deflated when that makes it shorter. The body is the name and track count
+// as varint-prefixed fields, followed by the video ids in runs. A canonical 11-character YouTube
+// id carries 64 bits (ten 6-bit characters and a last one limited to 4), so it packs into 8 bytes;
+// any other id is stored as UTF-8. Decoding is streamed: ids come out in batches as the bytes (and
+// the decompressor) produce them, so an import can resolve and show the first tracks while the
+// rest of a long list is still being read.
+const SHARE_LINK_VERSION = 1;
+const SHARE_LINK_PARAM = 'playlist';
+const SHARE_FLAG_DEFLATE = 1;
+const PACKED_ID_BYTES = 8;
+const BASE64URL_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_';
+const BASE64URL_INDEX = new Map([...BASE64URL_ALPHABET].map((char, index) => [char, index]));
+const CANONICAL_VIDEO_ID = /^[A-Za-z0-9_-]{10}[AEIMQUYcgkosw048]$/;
+
+const textEncoder = new TextEncoder();
+const textDecoder = new TextDecoder();
+
+interface SharedPlaylistBatch {
+    name: string;
+    trackCount: number;
+    videoIds: string[];
+}
+
+const packVideoId = (videoId: string, out: Uint8Array, offset: number) => {
+    let bits = 0;
+    let width = 0;
+    for (let i = 0; i < 11; i++) {
+        const last = i === 10;
+        bits = (bits << (last ? 4 : 6)) | (BASE64URL_INDEX.get(videoId[i])! >> (last ? 2 : 0));
+        width += last ? 4 : 6;
+        if (width >= 8) {
+            width -= 8;
+            out[offset++] = bits >> width;
+            bits &= (1 << width) - 1;
+        }
+    }
+};
+
+const unpackVideoId = (bytes: Uint8Array, offset: number) => {
+    let id = '';
+    let bits = 0;
+    let width = 0;
+    for (let i = offset; i < offset + PACKED_ID_BYTES; i++) {
+        bits = (bits << 8) | bytes[i];
+        width += 8;
+        while (width >= 6) {
+            width -= 6;
+            id += BASE64URL_ALPHABET[bits >> width];
+            bits &= (1 << width) - 1;
+        }
+    }
+    return id + BASE64URL_ALPHABET[bits << 2]; // the last 4 bits
+};
+
+// Unsigned LEB128.
+class ByteWriter {
+    private bytes = new Uint8Array(256);
+    private length = 0;
+
+    varint(value: number) {
+        this.reserve(5);
+        while (value >= 0x80) {
+            this.bytes[this.length++] = (value & 0x7f) | 0x80;
+            value >>>= 7;
+        }
+        this.bytes[this.length++] = value;
+    }
+
+    raw(bytes: Uint8Array) {
+        this.reserve(bytes.length);
+        this.bytes.set(bytes, this.length);
+        this.length += bytes.length;
+    }
+
+    string(text: string) {
+        const bytes = textEncoder.encode(text);
+        this.varint(bytes.length);
+        this.raw(bytes);
+    }
+
+    // `count` bytes to fill in place.
+    slot(count: number) {
+        this.reserve(count);
+        this.length += count;
+        return { bytes: this.bytes, offset: this.length - count };
+    }
+
+    result() {
+        return this.bytes.subarray(0, this.length);
+    }
+
+    private reserve(count: number) {
+        if (this.length + count <= this.bytes.length) return;
+        const grown = new Uint8Array(Math.max(this.bytes.length * 2, this.length + count));
+        grown.set(this.bytes.subarray(0, this.length));
+        this.bytes = grown;
+    }
+}
+
+// Reads across the chunks of a stream, waiting for more only when the buffered bytes run out.
+class StreamByteReader {
+    private buffer = new Uint8Array(0);
+    private position = 0;
+
+    constructor(private chunks: AsyncIterator<Uint8Array>) {}
+
+    async varint() {
+        let value = 0;
+        for (let shift = 0; ; shift += 7) {
+            const byte = (await this.need(1))[this.position++];
+            value += (byte & 0x7f) * 2 ** shift;
+            if (byte < 0x80) return value;
+            if (shift > 28) throw new Error('Malformed share link: varint too long');
+        }
+    }
+
+    async string() {
+        const length = await this.varint();
+        const bytes = await this.need(length);
+        const text = textDecoder.decode(bytes.subarray(this.position, this.position + length));
+        this.position += length;
+        return text;
+    }
+
+    // The buffer, holding at least `count` unread bytes from this.position on.
+    async need(count: number) {
+        while (this.buffer.length - this.position < count) {
+            const { value, done } = await this.chunks.next();
+            if (done) throw new Error('Malformed share link: unexpected end of data');
+            const rest = this.buffer.subarray(this.position);
+            const joined = new Uint8Array(rest.length + value.length);
+            joined.set(rest);
+            joined.set(value, rest.length);
+            this.buffer = joined;
+            this.position = 0;
+        }
+        return this.buffer;
+    }
+
+    // Everything not read yet, as a stream.
+    rest(): ReadableStream<Uint8Array> {
+        const head = this.buffer.subarray(this.position);
+        const chunks = this.chunks;
+        return new ReadableStream({
+            start(controller) {
+                if (head.length > 0) controller.enqueue(head);
+            },
+            async pull(controller) {
+                const { value, done } = await chunks.next();
+                if (done) controller.close();
+                else controller.enqueue(value);
+            },
+        });
+    }
+
+    get offset() {
+        return this.position;
+    }
+
+    skip(count: number) {
+        this.position += count;
+    }
+}
+
+const streamChunks = (stream: ReadableStream<Uint8Array>): AsyncIterator<Uint8Array> => {
+    const reader = stream.getReader();
+    return {
+        next: async () => {
+            const { value, done } = await reader.read();
+            return done ? { value: undefined, done: true } : { value, done: false };
+        },
+    };
+};
+
+const pipeThroughCodec = (bytes: Uint8Array, codec: CompressionStream | DecompressionStream) =>
+    new Response(new Blob([bytes]).stream().pipeThrough(codec)).arrayBuffer().then((buffer) => new Uint8Array(buffer));
+
+// Runs of ids, each prefixed by (length << 1 | stored as UTF-8).
+const encodeSharedPlaylist = async (name: string, videoIds: string[], { compress = true } = {}) => {
+    const body = new ByteWriter();
+    body.string(name);
+    body.varint(videoIds.length);
+    for (let start = 0; start < videoIds.length;) {
+        const packed = CANONICAL_VIDEO_ID.test(videoIds[start]);
+        let end = start + 1;
+        while (end < videoIds.length && CANONICAL_VIDEO_ID.test(videoIds[end]) === packed) end++;
+        body.varint(((end - start) << 1) | (packed ? 0 : 1));
+        for (let i = start; i < end; i++) {
+            if (packed) {
+                const { bytes, offset } = body.slot(PACKED_ID_BYTES);
+                packVideoId(videoIds[i], bytes, offset);
+            } else {
+                body.string(videoIds[i]);
+            }
+        }
+        start = end;
+    }
+
+    let payload = body.result();
+    let flags = 0;
+    if (compress && typeof CompressionStream !== 'undefined') {
+        const deflated = await pipeThroughCodec(payload, new CompressionStream('deflate-raw'));
+        if (deflated.length < payload.length) {
+            payload = deflated;
+            flags |= SHARE_FLAG_DEFLATE;
+        }
+    }
+    const bytes = new Uint8Array(2 + payload.length);
+    bytes[0] = SHARE_LINK_VERSION;
+    bytes[1] = flags;
+    bytes.set(payload, 2);
+    return bytes;
+};
+
+// Yields the ids in order, `batchSize` at a time, together with the playlist's name and length.
+async function* decodeSharedPlaylist(source: ReadableStream<Uint8Array>, batchSize = VIDEOS_LIST_MAX_IDS): AsyncGenerator<SharedPlaylistBatch> {
+    let reader = new StreamByteReader(streamChunks(source));
+    const header = await reader.need(2);
+    const version = header[reader.offset];
+    const flags = header[reader.offset + 1];
+    reader.skip(2);
+    if (version !== SHARE_LINK_VERSION) throw new Error(`Unsupported share link version ${version}`);
+    if (flags & SHARE_FLAG_DEFLATE) {
+        reader = new StreamByteReader(streamChunks(reader.rest().pipeThrough(new DecompressionStream('deflate-raw'))));
+    }
+
+    const name = await reader.string();
+    const trackCount = await reader.varint();
+    let videoIds: string[] = [];
+    for (let read = 0; read < trackCount;) {
+        const run = await reader.varint();
+        const runLength = run >>> 1;
+        if (runLength === 0 || read + runLength > trackCount) throw new Error('Malformed share link: bad run');
+        for (let i = 0; i < runLength;) {
+            if (run & 1) {
+                videoIds.push(await reader.string());
+                i++;
+            } else {
+                // Every packed id already buffered is unpacked without waiting
+                const bytes = await reader.need(PACKED_ID_BYTES);
+                const buffered = Math.floor((bytes.length - reader.offset) / PACKED_ID_BYTES);
+                const count = Math.min(runLength - i, batchSize - videoIds.length, buffered);
+                for (let j = 0; j < count; j++) {
+                    videoIds.push(unpackVideoId(bytes, reader.offset));
+                    reader.skip(PACKED_ID_BYTES);
+                }
+                i += count;
+            }
+            if (videoIds.length === batchSize) {
+                yield { name, trackCount, videoIds };
+                videoIds = [];
+            }
+        }
+        read += runLength;
+    }
+    if (videoIds.length > 0 || trackCount === 0) yield { name, trackCount, videoIds };
+}
+
+const toBase64Url = (bytes: Uint8Array) => {
+    let binary = '';
+    for (let i = 0; i < bytes.length; i += 0x8000) {
+        binary += String.fromCharCode(...bytes.subarray(i, i + 0x8000));
+    }
+    return btoa(binary).replace(/\+/g, '-').replace(/\//g, '_').replace(/=+$/, '');
+};
+
+const fromBase64Url = (text: string) => {
+    const binary = atob(text.replace(/-/g, '+').replace(/_/g, '/'));
+    return Uint8Array.from(binary, (char) => char.charCodeAt(0));
+};
+
+const shareLinkFor = async (playlist: Playlist, baseUrl = location.href) => {
+    const url = new URL(baseUrl);
+    url.hash = `${SHARE_LINK_PARAM}=${toBase64Url(await encodeSharedPlaylist(playlist.name, playlist.videoIds))}`;
+    return url.href;
+};
+
+// The encoded playlist in `url`'s fragment, or null if it has none.
+const readShareLink = (url: string) => {
+    const encoded = new URLSearchParams(new URL(url).hash.slice(1)).get(SHARE_LINK_PARAM);
+    if (!encoded) return null;
+    try {
+        return fromBase64Url(encoded);
+    } catch {
+        return null;
+    }
+};
+
+// Creates the playlist as soon as its header is read, then appends tracks batch by batch as their
+// metadata resolves; up to `concurrency` batches resolve at once, but they are added in order.
+// Ids that don't resolve (removed or private videos) are dropped. Returns the new playlist's id.
+const importSharedPlaylist = async (
+    bytes: Uint8Array,
+    store: PlaylistStore,
+    resolve: (videoIds: string[]) => Promise<VideoItem[]>,
+    { concurrency = 4, onProgress }: { concurrency?: number; onProgress?: (read: number, total: number) => void } = {},
+) => {
+    let playlistId = '';
+    let trackCount = 0;
+    let read = 0;
+    const pending: { videoIds: string[]; resolving: Promise<VideoItem[]> }[] = [];
+    const addOldest = async () => {
+        const { videoIds, resolving } = pending.shift()!;
+        const byId = new Map((await resolving).map((video) => [video.id, video]));
+        store.addVideos(playlistId, videoIds.flatMap((videoId) => byId.get(videoId) ?? []));
+        read += videoIds.length;
+        onProgress?.(read, trackCount);
+    };
+
+    for await (const batch of decodeSharedPlaylist(new Blob([bytes]).stream())) {
+        if (!playlistId) {
+            playlistId = store.createPlaylist(batch.name);
+            trackCount = batch.trackCount;
+        }
+        const resolving = resolve(batch.videoIds);
+        resolving.catch(() => {}); // surfaced when its batch is added, unless an earlier one fails first
+        pending.push({ videoIds: batch.videoIds, resolving });
+        if (pending.length >= concurrency) await addOldest();
+    }
+    while (pending.length > 0) await addOldest();
+    return playlistId;
+};
+
+// Playlist Sync
+// Tabs keep their playlists in step by exchanging operations rather than whole playlists. Each
+// local edit becomes one or more ops, stamped with a Lamport clock and the tab's replica id, that
+// are broadcast to the other tabs and appended to a log shared through storage. The ops form a
+// CRDT, so every tab converges whatever order they arrive in:
+// - a playlist's name is last-writer-wins by stamp, and deleting a playlist is final;
+// - each (playlist, video) pair is a last-writer-wins register of whether the video is in the
+//   playlist and where. Positions are fractional keys, so a move or insert rewrites one entry;
+//   the order is by key, then video id.
+// Once the log reaches `compactAfter` ops, it is folded into a snapshot, so opening a tab reads the
+// snapshot and replays only the short tail after it.
+const PLAYLIST_SYNC_CHANNEL = 'tuneflow-playlists';
+const POSITION_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz';
+
+type PlaylistStamp = [clock: number, replica: string];
+
+type PlaylistOp = { clock: number; replica: string } & (
+    | { type: 'create' | 'rename'; playlistId: string; name: string }
+    | { type: 'delete'; playlistId: string }
+    | { type: 'place'; playlistId: string; videoId: string; position: string; video?: VideoItem }
+    | { type: 'remove'; playlistId: string; videoId: string }
+);
+
+type PlaylistSnapshotEntry = [videoId: string, present: 0 | 1, position: string, clock: number, replica: string];
+
+interface PlaylistSnapshot {
+    clock: number;
+    playlists: {
+        id: string;
+        name: string;
+        nameStamp: PlaylistStamp;
+        created: PlaylistStamp;
+        deleted: boolean;
+        entries: PlaylistSnapshotEntry[];
+    }[];
+}
+
+interface PlaylistSyncStorage {
+    load: () => { snapshot: PlaylistSnapshot | null; log: PlaylistOp[] };
+    append: (ops: PlaylistOp[]) => number; // the log's new length
+    compact: (snapshot: PlaylistSnapshot) => void; // replaces the snapshot and empties the log
+    // Runs `task` while no other tab runs one: a load and the write it leads to don't interleave.
+    exclusive: <T>(task: () => T) => Promise<T>;
+}
+
+interface PlaylistSyncChannel {
+    postMessage: (message: PlaylistOp[]) => void;
+    onmessage: ((event: MessageEvent<PlaylistOp[]>) => void) | null;
+    close: () => void;
+}
+
+interface PlaylistSyncOptions {
+    storage: PlaylistSyncStorage;
+    createChannel?: () => PlaylistSyncChannel | null;
+    replicaId?: string;
+    compactAfter?: number; // ops in the persisted log
+}
+
+const compareStamps = ([clockA, replicaA]: PlaylistStamp, [clockB, replicaB]: PlaylistStamp) =>
+    clockA - clockB || (replicaA < replicaB ? -1 : replicaA > replicaB ? 1 : 0);
+
+// The lexicographic midpoint of a < b, where '' for b means no upper bound. Keys never end in the
+// lowest digit, so there is always room for another between two of them.
+const positionBetween = (a: string, b: string): string => {
+    if (b) {
+        let common = 0;
+        while ((a[common] ?? POSITION_DIGITS[0]) === b[common]) common++;
+        if (common > 0) return b.slice(0, common) + positionBetween(a.slice(common), b.slice(common));
+    }
+    const low = a ? POSITION_DIGITS.indexOf(a[0]) : 0;
+    const high = b ? POSITION_DIGITS.indexOf(b[0]) : POSITION_DIGITS.length;
+    if (high - low > 1) return POSITION_DIGITS[Math.round((low + high) / 2)];
+    if (b.length > 1) return b[0];
+    return POSITION_DIGITS[low] + positionBetween(a.slice(1), '');
+};
+
+// A short key after `a`, for appending: keys grow by one digit per 35 appends, not per 5.
+const positionAfter = (a: string): string => {
+    const digit = a ? POSITION_DIGITS.indexOf(a[0]) : 0;
+    return digit < POSITION_DIGITS.length - 1 ? POSITION_DIGITS[digit + 1] : a[0] + positionAfter(a.slice(1));
+};
+
+// `count` ascending keys between a and b, bisecting so their length grows with log(count).
+const positionsBetween = (a: string, b: string, count: number): string[] => {
+    if (count === 0) return [];
+    if (!b) {
+        const last = positionAfter(a);
+        return [...positionsBetween(a, last, count - 1), last];
+    }
+    const middle = positionBetween(a, b);
+    const before = Math.floor((count - 1) / 2);
+    return [...positionsBetween(a, middle, before), middle, ...positionsBetween(middle, b, count - 1 - before)];
+};
+
+interface SyncedEntry {
+    present: boolean;
+    position: string;
+    stamp: PlaylistStamp;
+}
+
+interface SyncedPlaylist {
+    name: string;
+    nameStamp: PlaylistStamp;
+    created: PlaylistStamp;
+    deleted: boolean;
+    entries: Map<string, SyncedEntry>;
+}
+
+// The replicated state. apply() is idempotent and commutative, so replaying an op or receiving
+// ops out of order is harmless.
+class PlaylistCrdt {
+    clock = 0;
+    private playlists = new Map<string, SyncedPlaylist>();
+
+    static fromSnapshot(snapshot: PlaylistSnapshot) {
+        const crdt = new PlaylistCrdt();
+        crdt.clock = snapshot.clock;
+        for (const { id, entries, ...playlist } of snapshot.playlists) {
+            crdt.playlists.set(id, {
+                ...playlist,
+                entries: new Map<string, SyncedEntry>(entries.map(([videoId, present, position, clock, replica]) =>
+                    [videoId, { present: present === 1, position, stamp: [clock, replica] }]
+                )),
+            });
+        }
+        return crdt;
+    }
+
+    // Deterministic, so tabs seeding the same playlists at once agree on the result.
+    static seed(playlists: Playlist[]) {
+        const crdt = new PlaylistCrdt();
+        const stamp: PlaylistStamp = [0, ''];
+        playlists.forEach((playlist, i) => {
+            const positions = positionsBetween('', '', playlist.videoIds.length);
+            crdt.playlists.set(playlist.id, {
+                name: playlist.name,
+                nameStamp: stamp,
+                created: [0, String(i).padStart(6, '0')],
+                deleted: false,
+                entries: new Map(playlist.videoIds.map((videoId, j) => [videoId, { present: true, position: positions[j], stamp }])),
+            });
+        });
+        return crdt;
+    }
+
+    toSnapshot(): PlaylistSnapshot {
+        return {
+            clock: this.clock,
+            playlists: [...this.playlists].map(([id, { entries, ...playlist }]) => ({
+                id,
+                ...playlist,
+                // A deleted playlist's entries can't show again, so only its tombstone is kept
+                entries: playlist.deleted ? [] : [...entries].map(([videoId, { present, position, stamp }]): PlaylistSnapshotEntry =>
+                    [videoId, present ? 1 : 0, position, ...stamp]
+                ),
+            })),
+        };
+    }
+
+    // Returns whether the op changed anything.
+    apply(op: PlaylistOp) {
+        this.clock = Math.max(this.clock, op.clock);
+        const stamp: PlaylistStamp = [op.clock, op.replica];
+        let playlist = this.playlists.get(op.playlistId);
+        if (!playlist) {
+            // Ops can arrive before the create they follow; the create's stamp still wins below
+            playlist = { name: '', nameStamp: [0, ''], created: stamp, deleted: false, entries: new Map() };
+            this.playlists.set(op.playlistId, playlist);
+        }
+
+        switch (op.type) {
+            case 'create':
+            case 'rename': {
+                let changed = false;
+                if (op.type === 'create' && compareStamps(stamp, playlist.created) < 0) {
+                    playlist.created = stamp;
+                    changed = true;
+                }
+                if (compareStamps(stamp, playlist.nameStamp) > 0) {
+                    playlist.name = op.name;
+                    playlist.nameStamp = stamp;
+                    changed = true;
+                }
+                return changed;
+            }
+            case 'delete':
+                if (playlist.deleted) return false;
+                playlist.deleted = true;
+                return true;
+            case 'place':
+            case 'remove': {
+                const entry = playlist.entries.get(op.videoId);
+                if (entry && compareStamps(stamp, entry.stamp) <= 0) return false;
+                const present = op.type === 'place';
+                playlist.entries.set(op.videoId, {
+                    present,
+                    position: op.type === 'place' ? op.position : entry?.position ?? '',
+                    stamp,
+                });
+                return true;
+            }
+        }
+    }
+
+    positionOf(playlistId: string, videoId: string | undefined) {
+        const entry = videoId === undefined ? undefined : this.playlists.get(playlistId)?.entries.get(videoId);
+        return entry?.present ? entry.position : undefined;
+    }
+
+    // The playlist as the store shows it, or null once deleted (or if never created).
+    view(playlistId: string): Playlist | null {
+        const playlist = this.playlists.get(playlistId);
+        if (!playlist || playlist.deleted) return null;
+        const videoIds = [...playlist.entries]
+            .filter(([, entry]) => entry.present)
+            .sort(([videoA, a], [videoB, b]) =>
+                a.position < b.position ? -1 : a.position > b.position ? 1 : videoA < videoB ? -1 : 1
+            )
+            .map(([videoId]) => videoId);
+        return { id: playlistId, name: playlist.name, videoIds };
+    }
+
+    // Every live playlist, in creation order.
+    views() {
+        return [...this.playlists]
+            .filter(([, playlist]) => !playlist.deleted)
+            .sort(([, a], [, b]) => compareStamps(a.created, b.created))
+            .flatMap(([playlistId]) => this.view(playlistId) ?? []);
+    }
+}
+
+// Snapshot and log under two keys. Across tabs, Web Locks make a load and its write atomic.
+const createLocalStorageSyncStorage = (storageKey: string): PlaylistSyncStorage => {
+    const read = <T,>(key: string, fallback: T): T => {
+        try {
+            return JSON.parse(localStorage.getItem(key) ?? 'null') ?? fallback;
+        } catch {
+            return fallback;
+        }
+    };
+    const write = (key: string, value: unknown) => {
+        try {
+            localStorage.setItem(key, JSON.stringify(value));
+        } catch (error) {
+            console.warn('Could not save playlist changes', error); // the other tabs still have them
+        }
+    };
+    const snapshotKey = `${storageKey}.snapshot`;
+    const logKey = `${storageKey}.log`;
+    return {
+        load: () => ({ snapshot: read<PlaylistSnapshot | null>(snapshotKey, null), log: read<PlaylistOp[]>(logKey, []) }),
+        append: (ops) => {
+            const log = read<PlaylistOp[]>(logKey, []).concat(ops);
+            write(logKey, log);
+            return log.length;
+        },
+        compact: (snapshot) => {
+            write(snapshotKey, snapshot);
+            write(logKey, []);
+        },
+        exclusive: (task) =>
+            typeof navigator !== 'undefined' && navigator.locks
+                ? navigator.locks.request(storageKey, () => task())
+                : Promise.resolve().then(task),
+    };
+};
+
+// Shared by replicas in one page, e.g. to check convergence without real tabs.
+const createMemorySyncStorage = (): PlaylistSyncStorage => {
+    let snapshot: PlaylistSnapshot | null = null;
+    let log: PlaylistOp[] = [];
+    let queue = Promise.resolve();
+    return {
+        load: () => ({ snapshot, log: log.slice() }),
+        append: (ops) => log.push(...ops),
+        compact: (next) => {
+            snapshot = next;
+            log = [];
+        },
+        exclusive: <T,>(task: () => T) => {
+            const result = queue.then(task);
+            queue = result.then(() => undefined, () => undefined);
+            return result;
+        },
+    };
+};
+
+const createBroadcastSyncChannel = () =>
+    typeof BroadcastChannel === 'undefined' ? null : (new BroadcastChannel(PLAYLIST_SYNC_CHANNEL) as PlaylistSyncChannel);
+
+// Connects a PlaylistStore to the other tabs. Between open() and close(), the store's edits are
+// sent out and persisted, and edits from other tabs are applied to the store as they arrive.
+// Open it as soon as the store exists, so no edit goes unrecorded.
+class PlaylistSync {
+    readonly replicaId: string;
+    private crdt = new PlaylistCrdt();
+    private fresh = false; // no tab has recorded anything yet, so seed() may still replace the start
+    private channel: PlaylistSyncChannel | null = null;
+    private stopObserving: (() => void) | null = null;
+    private persisting = Promise.resolve();
+    private counters = { localOps: 0, remoteOps: 0, compactions: 0, logLength: 0 };
+    private compactAfter: number;
+
+    constructor(private store: PlaylistStore, private options: PlaylistSyncOptions) {
+        this.replicaId = options.replicaId ?? `${Date.now().toString(36)}${Math.random().toString(36).slice(2, 8)}`;
+        this.compactAfter = options.compactAfter ?? 200;
+    }
+
+    get stats() {
+        return { replica: this.replicaId, clock: this.crdt.clock, ...this.counters };
+    }
+
+    // Loads the snapshot, replays the log after it and shows the result in the store. With no
+    // history yet, starts from what the store holds now; it is persisted with the first op.
+    open() {
+        this.close();
+        // Ops are broadcast only once they are in storage, so with the channel open before the load,
+        // each op another tab records is either loaded here or received afterwards
+        this.channel = (this.options.createChannel ?? createBroadcastSyncChannel)();
+        if (this.channel) this.channel.onmessage = ({ data }) => this.receive(data);
+
+        const { snapshot, log } = this.options.storage.load();
+        this.fresh = !snapshot && log.length === 0;
+        if (this.fresh) {
+            this.crdt = PlaylistCrdt.seed(this.store.getPlaylists());
+        } else {
+            this.crdt = snapshot ? PlaylistCrdt.fromSnapshot(snapshot) : PlaylistCrdt.seed([]);
+            for (const op of log) this.crdt.apply(op);
+        }
+        this.counters.logLength = log.length;
+        this.showAllInStore();
+        this.stopObserving = this.store.observeMutations(this.record);
+    }
+
+    // Replaces the starting playlists, e.g. with ones saved before syncing existed, unless some tab
+    // has already recorded an edit: history then starts from what that tab had.
+    seed(playlists: Playlist[]) {
+        if (!this.fresh) return;
+        this.crdt = PlaylistCrdt.seed(playlists);
+        this.showAllInStore();
+    }
+
+    // Deletes every playlist, in every tab and in storage. PlaylistStore.reset() isn't reported as
+    // edits, so resetting the app's data goes through here.
+    reset() {
+        const ops: PlaylistOp[] = this.crdt.views().map(({ id }) => ({
+            clock: ++this.crdt.clock,
+            replica: this.replicaId,
+            type: 'delete',
+            playlistId: id,
+        }));
+        this.send(ops);
+        this.showAllInStore();
+    }
+
+    close() {
+        this.stopObserving?.();
+        this.stopObserving = null;
+        this.channel?.close();
+        this.channel = null;
+    }
+
+    // Settles once every op recorded so far is in storage.
+    flushed() {
+        return this.persisting;
+    }
+
+    private record = (mutation: PlaylistMutation) => {
+        const { playlistId } = mutation;
+        const ops: PlaylistOp[] = [];
+        const stamp = () => ({ clock: ++this.crdt.clock, replica: this.replicaId });
+        let resync = false;
+
+        switch (mutation.type) {
+            case 'create':
+            case 'rename':
+                ops.push({ ...stamp(), type: mutation.type, playlistId, name: mutation.name });
+                break;
+            case 'delete':
+                ops.push({ ...stamp(), type: 'delete', playlistId });
+                break;
+            case 'remove':
+                for (const videoId of mutation.videoIds) ops.push({ ...stamp(), type: 'remove', playlistId, videoId });
+                break;
+            case 'add': {
+                // The store appended them, after what is now the video before the first of them
+                const videoIds = this.store.getPlaylist(playlistId)?.videoIds ?? [];
+                const last = this.crdt.positionOf(playlistId, videoIds[videoIds.length - mutation.videos.length - 1]);
+                const positions = positionsBetween(last ?? '', '', mutation.videos.length);
+                mutation.videos.forEach((video, i) =>
+                    ops.push({ ...stamp(), type: 'place', playlistId, videoId: video.id, position: positions[i], video })
+                );
+                break;
+            }
+            case 'move': {
+                const videoIds = this.store.getPlaylist(playlistId)?.videoIds ?? [];
+                const before = this.crdt.positionOf(playlistId, videoIds[mutation.toIndex - 1]) ?? '';
+                let after = this.crdt.positionOf(playlistId, videoIds[mutation.toIndex + 1]) ?? '';
+                if (after && after <= before) {
+                    // Neighbours that tie (from concurrent appends): go after every video sharing the key
+                    after = videoIds.slice(mutation.toIndex + 1)
+                        .map((videoId) => this.crdt.positionOf(playlistId, videoId) ?? '')
+                        .find((position) => position > before) ?? '';
+                    resync = true;
+                }
+                ops.push({ ...stamp(), type: 'place', playlistId, videoId: mutation.videoId, position: positionBetween(before, after) });
+                break;
+            }
+        }
+
+        this.send(ops);
+        if (resync) this.showInStore([playlistId]);
+    };
+
+    private send(ops: PlaylistOp[]) {
+        if (this.fresh) this.persistSeed();
+        for (const op of ops) this.crdt.apply(op);
+        this.counters.localOps += ops.length;
+        this.persist(ops);
+    }
+
+    private receive(ops: PlaylistOp[]) {
+        this.fresh = false; // the sender has persisted its start, the same as this tab's
+        const changed = new Set<string>();
+        let created = false;
+        for (const op of ops) {
+            if (!this.crdt.apply(op)) continue;
+            changed.add(op.playlistId);
+            created ||= op.type === 'create';
+        }
+        this.counters.remoteOps += ops.length;
+        this.store.upsertVideos(ops.flatMap((op) => (op.type === 'place' && op.video ? [op.video] : [])));
+        if (created) this.showAllInStore(); // a new playlist may sort before existing ones
+        else this.showInStore(changed);
+    }
+
+    private showAllInStore() {
+        this.store.applyChanges(this.crdt.views(), this.store.getPlaylists().map((playlist) => playlist.id));
+    }
+
+    private showInStore(playlistIds: Iterable<string>) {
+        const changed: Playlist[] = [];
+        const removed: string[] = [];
+        for (const playlistId of playlistIds) {
+            const playlist = this.crdt.view(playlistId);
+            if (playlist) changed.push(playlist);
+            else removed.push(playlistId);
+        }
+        this.store.applyChanges(changed, removed);
+    }
+
+    // Unless another tab got there first, the start becomes the first snapshot.
+    private persistSeed() {
+        this.fresh = false;
+        const { storage } = this.options;
+        const snapshot = this.crdt.toSnapshot();
+        this.persisting = this.persisting.then(() => storage.exclusive(() => {
+            const stored = storage.load();
+            if (!stored.snapshot && stored.log.length === 0) storage.compact(snapshot);
+        })).catch((error) => console.error('Could not persist playlist changes', error));
+    }
+
+    // Appends to the shared log, then broadcasts. The tab whose append fills the log folds what
+    // storage holds, rather than its own state, into the snapshot: ops another tab persisted but
+    // hasn't yet broadcast are kept.
+    private persist(ops: PlaylistOp[]) {
+        const { storage } = this.options;
+        this.persisting = this.persisting
+            .then(() => storage.exclusive(() => {
+                this.counters.logLength = storage.append(ops);
+                this.channel?.postMessage(ops);
+                if (this.counters.logLength < this.compactAfter) return;
+                const { snapshot, log } = storage.load();
+                const folded = snapshot ? PlaylistCrdt.fromSnapshot(snapshot) : PlaylistCrdt.seed([]);
+                for (const op of log) folded.apply(op);
+                storage.compact(folded.toSnapshot());
+                this.counters.logLength = 0;
+                this.counters.compactions++;
+            }))
+            .catch((error) => console.error('Could not persist playlist changes', error));
+    }
+}
+
+// Offline Cache
+// Track metadata, lyrics, saved playlists and, in a cache of their own, thumbnails persist across
+// reloads in IndexedDB (or an in-memory stand-in). Only the small per-entry metadata index is read
+// at startup; values are read on demand. Once the byte budget is exceeded, unpinned entries are
+// evicted by LRU or LFU order.
+type OfflineCacheKind = 'track' | 'thumbnail' | 'lyrics' | 'playlists';
+
+interface OfflineCacheEntryMeta {
+    key: string;
+    bytes: number;
+    lastAccess: number;
+    hits: number;
+}
+
+interface OfflineStorageBackend {
+    loadMeta: () => Promise<OfflineCacheEntryMeta[]>;
+    read: (key: string) => Promise<unknown>;
+    write: (meta: OfflineCacheEntryMeta, value: unknown) => Promise<void>;
+    touch: (metas: OfflineCacheEntryMeta[]) => Promise<void>;
+    remove: (keys: string[]) => Promise<void>;
+}
+
+interface OfflineCacheOptions {
+    backend: OfflineStorageBackend;
+    budgetBytes?: number;
+    policy?: 'lru' | 'lfu';
+}
+
+const requestResult = <T,>(request: IDBRequest<T>) =>
+    new Promise<T>((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+
+class IndexedDbStorageBackend implements OfflineStorageBackend {
+    private db: Promise<IDBDatabase> | null = null;
+
+    constructor(private dbName = 'tuneflow-offline') {}
+
+    async loadMeta() {
+        const db = await this.open();
+        return requestResult<OfflineCacheEntryMeta[]>(db.transaction('meta').objectStore('meta').getAll());
+    }
+
+    async read(key: string) {
+        const db = await this.open();
+        return requestResult(db.transaction('values').objectStore('values').get(key));
+    }
+
+    write(meta: OfflineCacheEntryMeta, value: unknown) {
+        return this.transaction(['values', 'meta'], (tx) => {
+            tx.objectStore('values').put(value, meta.key);
+            tx.objectStore('meta').put(meta);
+        });
+    }
+
+    touch(metas: OfflineCacheEntryMeta[]) {
+        return this.transaction(['meta'], (tx) => {
+            for (const meta of metas) tx.objectStore('meta').put(meta);
+        });
+    }
+
+    remove(keys: string[]) {
+        return this.transaction(['values', 'meta'], (tx) => {
+            for (const key of keys) {
+                tx.objectStore('values').delete(key);
+                tx.objectStore('meta').delete(key);
+            }
+        });
+    }
+
+    private open() {
+        return (this.db ??= new Promise((resolve, reject) => {
+            const request = indexedDB.open(this.dbName, 1);
+            request.onupgradeneeded = () => {
+                request.result.createObjectStore('values');
+                request.result.createObjectStore('meta', { keyPath: 'key' });
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        }));
+    }
+
+    private async transaction(storeNames: string[], run: (tx: IDBTransaction) => void) {
+        const db = await this.open();
+        return new Promise<void>((resolve, reject) => {
+            const tx = db.transaction(storeNames, 'readwrite');
+            run(tx);
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => reject(tx.error);
+            tx.onabort = () => reject(tx.error);
+        });
+    }
+}
+
+class MemoryStorageBackend implements OfflineStorageBackend {
+    private values = new Map<string, unknown>();
+    private metas = new Map<string, OfflineCacheEntryMeta>();
+
+    async loadMeta() {
+        return [...this.metas.values()].map((meta) => ({ ...meta }));
+    }
+
+    async read(key: string) {
+        return this.values.get(key);
+    }
+
+    async write(meta: OfflineCacheEntryMeta, value: unknown) {
+        this.values.set(meta.key, value);
+        this.metas.set(meta.key, { ...meta });
+    }
+
+    async touch(metas: OfflineCacheEntryMeta[]) {
+        for (const meta of metas) {
+            if (this.metas.has(meta.key)) this.metas.set(meta.key, { ...meta });
+        }
+    }
+
+    async remove(keys: string[]) {
+        for (const key of keys) {
+            this.values.delete(key);
+            this.metas.delete(key);
+        }
+    }
+}
+
+// Epoch-based like Date.now(), but sub-millisecond so accesses within one tick still order.
+const accessTime = () => performance.timeOrigin + performance.now();
+
+const sizeOfValue = (value: unknown) => (value instanceof Blob ? value.size : estimateBytes(value));
+
+class OfflineCache {
+    private meta = new Map<string, OfflineCacheEntryMeta>();
+    private pinned = new Map<OfflineCacheKind, Set<string>>();
+    private bytes = 0;
+    private counters = { hits: 0, misses: 0, evictions: 0 };
+    private opened: Promise<void> | null = null;
+    private touched = new Set<OfflineCacheEntryMeta>();
+    private touchTimer: ReturnType<typeof setTimeout> | null = null;
+    private budgetBytes: number;
+
+    constructor(private options: OfflineCacheOptions) {
+        this.budgetBytes = options.budgetBytes ?? 50 * 1024 * 1024;
+    }
+
+    get stats() {
+        return { ...this.counters, entries: this.meta.size, bytes: this.bytes, budgetBytes: this.budgetBytes };
+    }
+
+    // Reads only the metadata index; safe to call repeatedly.
+    open() {
+        return (this.opened ??= this.options.backend.loadMeta().then((metas) => {
+            for (const meta of metas) {
+                this.meta.set(meta.key, meta);
+                this.bytes += meta.bytes;
+            }
+        }));
+    }
+
+    has(kind: OfflineCacheKind, id: string) {
+        return this.meta.has(`${kind}:${id}`);
+    }
+
+    async get<T>(kind: OfflineCacheKind, id: string): Promise<T | undefined> {
+        await this.open();
+        const meta = this.meta.get(`${kind}:${id}`);
+        if (!meta) {
+            this.counters.misses++;
+            return undefined;
+        }
+        meta.lastAccess = accessTime();
+        meta.hits++;
+        this.scheduleTouch(meta);
+        this.counters.hits++;
+        return (await this.options.backend.read(meta.key)) as T | undefined;
+    }
+
+    async put(kind: OfflineCacheKind, id: string, value: unknown, bytes = sizeOfValue(value)) {
+        await this.open();
+        if (bytes > this.budgetBytes) return;
+        const key = `${kind}:${id}`;
+        const previous = this.meta.get(key);
+        const meta = { key, bytes, lastAccess: accessTime(), hits: previous?.hits ?? 0 };
+        this.bytes += bytes - (previous?.bytes ?? 0);
+        this.meta.set(key, meta);
+        await this.options.backend.write(meta, value);
+        await this.evict();
+    }
+
+    async clear() {
+        await this.open();
+        const keys = [...this.meta.keys()];
+        this.meta.clear();
+        this.bytes = 0;
+        await this.options.backend.remove(keys);
+    }
+
+    // Replaces the pinned ids for a kind; pinned entries are never evicted (e.g. playlist members).
+    setPinned(kind: OfflineCacheKind, ids: Iterable<string>) {
+        this.pinned.set(kind, new Set(ids));
+    }
+
+    private isPinned(key: string) {
+        const separator = key.indexOf(':');
+        return this.pinned.get(key.slice(0, separator) as OfflineCacheKind)?.has(key.slice(separator + 1)) ?? false;
+    }
+
+    // Evicts down to 90% of the budget so a run of puts doesn't evict on every call.
+    private async evict() {
+        if (this.bytes <= this.budgetBytes) return;
+        const byPolicy = this.options.policy === 'lfu'
+            ? (a: OfflineCacheEntryMeta, b: OfflineCacheEntryMeta) => a.hits - b.hits || a.lastAccess - b.lastAccess
+            : (a: OfflineCacheEntryMeta, b: OfflineCacheEntryMeta) => a.lastAccess - b.lastAccess;
+        const candidates = [...this.meta.values()].filter((meta) => !this.isPinned(meta.key)).sort(byPolicy);
+
+        const evicted: string[] = [];
+        for (const meta of candidates) {
+            if (this.bytes <= this.budgetBytes * 0.9) break;
+            this.meta.delete(meta.key);
+            this.bytes -= meta.bytes;
+            evicted.push(meta.key);
+        }
+        this.counters.evictions += evicted.length;
+        await this.options.backend.remove(evicted);
+    }
+
+    // Access statistics are written back in batches rather than on every read.
+    private scheduleTouch(meta: OfflineCacheEntryMeta) {
+        this.touched.add(meta);
+        if (this.touchTimer !== null) return;
+        this.touchTimer = setTimeout(() => {
+            this.touchTimer = null;
+            const metas = [...this.touched].filter((touched) => this.meta.get(touched.key) === touched);
+            this.touched.clear();
+            void this.options.backend.touch(metas);
+        }, 2000);
+    }
+}
+
+// Tracks, lyrics and playlists share one budget. Thumbnails have a cache of their own (see
+// Thumbnails), so a scroll through many results can't evict them.
+const offlineCache = new OfflineCache({
+    backend: typeof indexedDB === 'undefined' ? new MemoryStorageBackend() : new IndexedDbStorageBackend(),
+});
+
+// Restores saved playlists on startup and keeps them, and their tracks' metadata, in the offline
+// cache. Track metadata for restored playlists is read back in small chunks while the app is idle;
+// tracks the cache doesn't have are looked up with `fetchVideos`, if given. With an open `sync`,
+// the playlists themselves persist through it: ones saved here before only seed its history, and
+// only track metadata is written. Returns whether the playlists have been restored: without sync,
+// edits made before then would be replaced.
+const useOfflinePlaylists = (
+    store: PlaylistStore,
+    cache: OfflineCache,
+    fetchVideos?: (videoIds: string[]) => Promise<VideoItem[]>,
+    sync?: PlaylistSync,
+) => {
+    const [restored, setRestored] = useState(false);
+    useEffect(() => {
+        let active = true;
+        const save = () => {
+            const playlists = store.getPlaylists();
+            const memberIds = new Set(playlists.flatMap((playlist) => playlist.videoIds));
+            cache.setPinned('track', memberIds);
+            if (!sync) {
+                cache.setPinned('playlists', ['all']);
+                void cache.put('playlists', 'all', playlists);
+            }
+            for (const videoId of memberIds) {
+                const video = store.getVideo(videoId);
+                if (video && !cache.has('track', videoId)) void cache.put('track', videoId, video);
+            }
+        };
+
+        const restore = async () => {
+            const saved = await cache.get<Playlist[]>('playlists', 'all');
+            if (!active) return;
+            if (saved && sync) sync.seed(saved);
+            else if (saved) store.reset(saved, mockSearchResults);
+            save();
+            follow();
+
+            const missing = [...new Set(store.getPlaylists().flatMap((playlist) => playlist.videoIds))]
+                .filter((videoId) => !store.getVideo(videoId));
+            for (let i = 0; i < missing.length && active; i += 50) {
+                await new Promise((resolve) => setTimeout(resolve, 0));
+                const chunk = missing.slice(i, i + 50);
+                const cached = await Promise.all(chunk.map((videoId) => cache.get<VideoItem>('track', videoId)));
+                const videos = cached.filter((video): video is VideoItem => video !== undefined);
+                const uncached = chunk.filter((_, j) => cached[j] === undefined);
+                if (fetchVideos && uncached.length > 0 && active) {
+                    try {
+                        videos.push(...await fetchVideos(uncached));
+                    } catch (error) {
+                        console.error('Failed to load playlist tracks', error);
+                    }
+                }
+                if (active) store.upsertVideos(videos);
+            }
+        };
+
+        // From here on, edits are saved as they are made
+        let unsubscribe: (() => void) | null = null;
+        const follow = () => {
+            if (!active || unsubscribe) return;
+            unsubscribe = store.subscribe(save);
+            setRestored(true);
+        };
+        restore().finally(follow); // even if reading them back failed
+        return () => {
+            active = false;
+            unsubscribe?.();
+        };
+    }, [store, cache, fetchVideos, sync]);
+    return restored;
+};
+
+// Thumbnails
+// Thumbnails load only once their slot nears the viewport, at the smallest YouTube size that covers
+// the slot's rendered width. Fetched images are decoded off the render path and kept as object URLs
+// in a bounded LRU, backed by an offline cache with its own byte budget, so re-searching shows them
+// without a refetch. A host that refuses the CORS fetch is remembered, and its images go straight
+// to a plain <img> load from then on instead of being downloaded twice.
+const THUMBNAIL_OFFLINE_BUDGET_BYTES = 20 * 1024 * 1024;
+const THUMBNAIL_WIDTHS = { default: 120, mqdefault: 320, hqdefault: 480 };
+type ThumbnailSize = keyof typeof THUMBNAIL_WIDTHS;
+
+const thumbnailUrl = (videoId: string, size: ThumbnailSize) => `https://img.youtube.com/vi/${videoId}/${size}.jpg`;
+
+const pickThumbnailSize = (slotWidth: number, pixelRatio = window.devicePixelRatio || 1): ThumbnailSize => {
+    const sizes = Object.keys(THUMBNAIL_WIDTHS) as ThumbnailSize[];
+    return sizes.find((size) => THUMBNAIL_WIDTHS[size] >= slotWidth * pixelRatio) ?? 'hqdefault';
+};
+
+class ThumbnailCache {
+    private objectUrls = new Map<string, string>(); // source URL -> object URL, LRU -> MRU
+    private pending = new Map<string, Promise<string>>();
+    private noCorsHosts = new Set<string>();
+
+    constructor(private maxEntries = 300, private offline?: OfflineCache) {}
+
+    peek(url: string) {
+        const objectUrl = this.objectUrls.get(url);
+        if (objectUrl !== undefined) {
+            this.objectUrls.delete(url);
+            this.objectUrls.set(url, objectUrl);
+        }
+        return objectUrl;
+    }
+
+    // Resolves to a decoded object URL; concurrent requests for one URL share a single fetch.
+    load(url: string): Promise<string> {
+        const cached = this.peek(url);
+        if (cached !== undefined) return Promise.resolve(cached);
+        let pending = this.pending.get(url);
+        if (!pending) {
+            pending = this.fetchDecoded(url).finally(() => this.pending.delete(url));
+            this.pending.set(url, pending);
+        }
+        return pending;
+    }
+
+    private async fetchDecoded(url: string) {
+        const host = new URL(url).host;
+        if (this.noCorsHosts.has(host)) throw new Error(`${host} does not allow CORS thumbnail requests`);
+        let blob = await this.offline?.get<Blob>('thumbnail', url);
+        if (!blob) {
+            let response: Response;
+            try {
+                response = await fetch(url);
+            } catch (error) {
+                // A CORS refusal surfaces only as a failed fetch. Offline, every fetch fails, so the host isn't marked
+                if (typeof navigator === 'undefined' || navigator.onLine) this.noCorsHosts.add(host);
+                throw error;
+            }
+            if (!response.ok) throw new Error(`Thumbnail request failed: ${response.status}`);
+            blob = await response.blob();
+            void this.offline?.put('thumbnail', url, blob);
+        }
+
+        const objectUrl = URL.createObjectURL(blob);
+        try {
+            const image = new Image();
+            image.src = objectUrl;
+            await image.decode();
+        } catch (error) {
+            URL.revokeObjectURL(objectUrl);
+            throw error;
+        }
+
+        this.objectUrls.set(url, objectUrl);
+        for (const [oldestUrl, oldestObjectUrl] of this.objectUrls) {
+            if (this.objectUrls.size <= this.maxEntries) break;
+            this.objectUrls.delete(oldestUrl);
+            URL.revokeObjectURL(oldestObjectUrl);
+        }
+        return objectUrl;
+    }
+}
+
+const thumbnailOfflineCache = new OfflineCache({
+    backend: typeof indexedDB === 'undefined' ? new MemoryStorageBackend() : new IndexedDbStorageBackend('tuneflow-thumbnails'),
+    budgetBytes: THUMBNAIL_OFFLINE_BUDGET_BYTES,
+});
+
+const thumbnailCache = new ThumbnailCache(300, thumbnailOfflineCache);
+
+// Where thumbnails come from; null renders them as empty placeholders and loads nothing, as the
+// render benchmark does so that it times rendering rather than image downloads.
+const ThumbnailCacheContext = createContext<ThumbnailCache | null>(thumbnailCache);
+
+// One observer shared by every thumbnail; each element is reported once, as it nears the viewport.
+const visibilityCallbacks = new WeakMap<Element, () => void>();
+let visibilityObserver: IntersectionObserver | null = null;
+
+const observeVisibility = (element: Element, onVisible: () => void) => {
+    if (typeof IntersectionObserver === 'undefined') {
+        onVisible(); // e.g. a headless DOM: treat everything as visible
+        return () => {};
+    }
+    const observer = (visibilityObserver ??= new IntersectionObserver((entries) => {
+        for (const entry of entries) {
+            if (!entry.isIntersecting) continue;
+            visibilityObserver?.unobserve(entry.target);
+            visibilityCallbacks.get(entry.target)?.();
+            visibilityCallbacks.delete(entry.target);
+        }
+    }, { rootMargin: '200px' }));
+    visibilityCallbacks.set(element, onVisible);
+    observer.observe(element);
+    return () => {
+        visibilityCallbacks.delete(element);
+        observer.unobserve(element);
+    };
+};
+
+// Synced Lyrics
+// LRC text is parsed once into parallel arrays sorted by start time, so the line being sung at
+// any playback position is a binary search away. Lyrics without timestamps keep only their text.
+// The view that highlights the current line is in syncedLyrics.tsx.
+export interface ParsedLyrics {
+    text: string;
+    times: Float64Array; // seconds, ascending
+    lines: string[]; // lines[i] starts at times[i]
+}
+
+const LRC_TIMESTAMP = /\[(\d+):(\d{1,2}(?:\.\d{1,3})?)\]/g;
+const LRC_OFFSET = /^\[offset:\s*([+-]?\d+)\]/im;
+
+const parseLyrics = (text: string): ParsedLyrics => {
+    // A positive offset (in ms) makes every line appear earlier
+    const offset = Number(text.match(LRC_OFFSET)?.[1] ?? 0) / 1000;
+    const entries: { time: number; line: string }[] = [];
+    for (const rawLine of text.split(/\r?\n/)) {
+        const stamps = [...rawLine.matchAll(LRC_TIMESTAMP)];
+        if (stamps.length === 0) continue;
+        const line = rawLine.replace(LRC_TIMESTAMP, '').trim();
+        for (const [, minutes, seconds] of stamps) {
+            entries.push({ time: Math.max(0, Number(minutes) * 60 + Number(seconds) - offset), line });
+        }
+    }
+    entries.sort((a, b) => a.time - b.time); // stable, so repeated stamps keep file order
+
+    const times = new Float64Array(entries.length);
+    const lines = new Array<string>(entries.length);
+    entries.forEach((entry, i) => {
+        times[i] = entry.time;
+        lines[i] = entry.line;
+    });
+    return { text: text.trim(), times, lines };
+};
+
+// Index of the last line starting at or before `time`, or -1 before the first line.
+export const lineIndexAt = (times: Float64Array, time: number) => {
+    let low = 0;
+    let high = times.length;
+    while (low < high) {
+        const mid = (low + high) >>> 1;
+        if (times[mid] <= time) low = mid + 1;
+        else high = mid;
+    }
+    return low - 1;
+};
+
+// Lyrics
+// Lyrics are looked up by video id and kept parsed: first in a bounded in-memory LRU, then in the offline cache,
+// then from the network. Concurrent requests for one id share a single fetch, which is aborted
+// only once every caller waiting on it has gone away. Prefetches run one at a time in the background.
+const LYRICS_PREFETCH_COUNT = 2;
+
+type LyricsFetcher = (videoId: string, signal: AbortSignal) => Promise<string>;
+
+interface LyricsRequest {
+    promise: Promise<ParsedLyrics>;
+    controller: AbortController;
+    waiters: number;
+}
+
+// Rejects with an AbortError as soon as `signal` aborts, without cancelling `promise` itself.
+const untilAborted = <T,>(promise: Promise<T>, signal?: AbortSignal) => {
+    if (!signal) return promise;
+    return new Promise<T>((resolve, reject) => {
+        const abort = () => reject(new DOMException('Aborted', 'AbortError'));
+        if (signal.aborted) abort();
+        signal.addEventListener('abort', abort, { once: true });
+        promise.then(resolve, reject).finally(() => signal.removeEventListener('abort', abort));
+    });
+};
+
+class LyricsService {
+    private lyrics = new Map<string, ParsedLyrics>(); // LRU -> MRU
+    private inFlight = new Map<string, LyricsRequest>();
+    private prefetchQueue: string[] = [];
+    private prefetching = false;
+    private counters = { lookups: 0, memoryHits: 0, offlineHits: 0, shared: 0, requests: 0, cancelled: 0, prefetched: 0 };
+
+    constructor(private fetchLyrics: LyricsFetcher, private maxEntries = 50, private offline?: OfflineCache) {}
+
+    get stats() {
+        const { lookups, memoryHits, offlineHits, shared } = this.counters;
+        return {
+            ...this.counters,
+            hitRate: lookups === 0 ? 0 : (memoryHits + offlineHits) / lookups,
+            requestsAvoided: memoryHits + offlineHits + shared,
+        };
+    }
+
+    // Aborting `signal` only stops this caller from waiting; see the section comment.
+    get(videoId: string, signal?: AbortSignal): Promise<ParsedLyrics> {
+        this.counters.lookups++;
+        const cached = this.lyrics.get(videoId);
+        if (cached !== undefined) {
+            this.counters.memoryHits++;
+            this.remember(videoId, cached);
+            return Promise.resolve(cached);
+        }
+
+        let request = this.inFlight.get(videoId);
+        if (request) {
+            this.counters.shared++;
+        } else {
+            request = this.load(videoId);
+        }
+
+        const joined = request;
+        joined.waiters++;
+        signal?.addEventListener('abort', () => {
+            if (--joined.waiters === 0 && this.inFlight.get(videoId) === joined) {
+                joined.controller.abort();
+                this.inFlight.delete(videoId);
+                this.counters.cancelled++;
+            }
+        }, { once: true });
+        return untilAborted(joined.promise, signal);
+    }
+
+    // Queues ids for background loading; ids already cached or in flight are skipped.
+    prefetch(videoIds: string[]) {
+        for (const videoId of videoIds) {
+            if (!this.lyrics.has(videoId) && !this.inFlight.has(videoId) && !this.prefetchQueue.includes(videoId)) {
+                this.prefetchQueue.push(videoId);
+            }
+        }
+        void this.drainPrefetchQueue();
+    }
+
+    private load(videoId: string): LyricsRequest {
+        const controller = new AbortController();
+        const request: LyricsRequest = { controller, waiters: 0, promise: Promise.resolve(parseLyrics('')) };
+        request.promise = (async () => {
+            try {
+                let lyrics = await this.offline?.get<string>('lyrics', videoId);
+                if (lyrics !== undefined) {
+                    this.counters.offlineHits++;
+                } else {
+                    if (controller.signal.aborted) throw new DOMException('Aborted', 'AbortError');
+                    this.counters.requests++;
+                    lyrics = await telemetry.time('lyrics.fetch', () => this.fetchLyrics(videoId, controller.signal));
+                    void this.offline?.put('lyrics', videoId, lyrics);
+                }
+                const parsed = parseLyrics(lyrics);
+                this.remember(videoId, parsed);
+                return parsed;
+            } finally {
+                if (this.inFlight.get(videoId) === request) this.inFlight.delete(videoId);
+            }
+        })();
+        request.promise.catch(() => {}); // each caller handles its own rejection
+        this.inFlight.set(videoId, request);
+        return request;
+    }
+
+    private remember(videoId: string, lyrics: ParsedLyrics) {
+        this.lyrics.delete(videoId);
+        this.lyrics.set(videoId, lyrics);
+        for (const oldestId of this.lyrics.keys()) {
+            if (this.lyrics.size <= this.maxEntries) break;
+            this.lyrics.delete(oldestId);
+        }
+    }
+
+    private async drainPrefetchQueue() {
+        if (this.prefetching) return;
+        this.prefetching = true;
+        try {
+            let videoId: string | undefined;
+            while ((videoId = this.prefetchQueue.shift()) !== undefined) {
+                if (this.lyrics.has(videoId) || this.inFlight.has(videoId)) continue;
+                this.counters.prefetched++;
+                await this.load(videoId).promise.catch(() => {});
+            }
+        } finally {
+            this.prefetching = false;
+        }
+    }
+}
+
+// Simulates the lyrics API
+const fetchMockLyrics: LyricsFetcher = async (_videoId, signal) => {
+    await abortableDelay(750, signal);
+    return mockLyrics;
+};
+
+const lyricsService = new LyricsService(fetchMockLyrics, 50, offlineCache);
+
+// YouTube Data API
+// Every Data API call goes through one client. videos.list lookups made in the same tick are merged
+// and sent 50 ids per request. A small pool caps concurrent requests, so they reuse the browser's
+// warm connections to the API origin instead of opening new ones. Quota units are counted per
+// method, and rate-limit responses are retried with exponential backoff and full jitter.
+const YOUTUBE_API_BASE_URL = 'https://www.googleapis.com/youtube/v3';
+const VIDEOS_LIST_MAX_IDS = 50;
+const SEARCH_MAX_RESULTS = 50;
+
+// Units charged per call; see https://developers.google.com/youtube/v3/determine_quota_cost
+const QUOTA_COST = { 'search.list': 100, 'videos.list': 1 } as const;
+type ApiMethod = keyof typeof QUOTA_COST;
+
+const RATE_LIMIT_REASONS = new Set(['rateLimitExceeded', 'userRateLimitExceeded']);
+
+type FetchFunction = (input: string, init?: RequestInit) => Promise<Response>;
+
+interface ApiVideoSnippet {
+    title: string;
+    channelTitle: string;
+    thumbnails?: { medium?: { url: string } };
+}
+
+interface ApiVideoResource {
+    id: string;
+    snippet: ApiVideoSnippet;
+    contentDetails: { duration: string };
+}
+
+interface ApiSearchResponse {
+    items: { id: { videoId: string }; snippet: ApiVideoSnippet }[];
+    nextPageToken?: string;
+}
+
+class YouTubeApiError extends Error {
+    constructor(readonly method: ApiMethod, readonly status: number, readonly reason = '') {
+        super(`${method} failed with ${status}${reason ? ` (${reason})` : ''}`);
+        this.name = 'YouTubeApiError';
+    }
+}
+
+// Runs at most `concurrency` tasks at once; the rest wait in arrival order.
+class RequestPool {
+    private active = 0;
+    private waiting: (() => void)[] = [];
+
+    constructor(private concurrency: number) {}
+
+    async run<T>(task: () => Promise<T>): Promise<T> {
+        if (this.active < this.concurrency) {
+            this.active++;
+        } else {
+            await new Promise<void>((resolve) => this.waiting.push(resolve));
+        }
+        try {
+            return await task();
+        } finally {
+            const next = this.waiting.shift();
+            if (next) next(); // hand the slot straight over
+            else this.active--;
+        }
+    }
+}
+
+// "PT1H2M3S" -> "1:02:03", "PT3M32S" -> "3:32"
+const formatIsoDuration = (duration: string) => {
+    const match = duration.match(/^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$/);
+    const [days, hours, minutes, seconds] = match ? match.slice(1).map((part) => Number(part ?? 0)) : [0, 0, 0, 0];
+    return formatDuration(((days * 24 + hours) * 60 + minutes) * 60 + seconds);
+};
+
+// "3:32" -> "PT3M32S"
+const toIsoDuration = (duration: string) => {
+    const [seconds = 0, minutes = 0, hours = 0] = duration.split(':').map(Number).reverse();
+    return `PT${hours ? `${hours}H` : ''}${minutes ? `${minutes}M` : ''}${seconds}S`;
+};
+
+const toVideoItem = ({ id, snippet, contentDetails }: ApiVideoResource): VideoItem => ({
+    id,
+    title: snippet.title,
+    artist: snippet.channelTitle,
+    thumbnail: snippet.thumbnails?.medium?.url ?? thumbnailUrl(id, 'mqdefault'),
+    duration: formatIsoDuration(contentDetails.duration),
+    url: watchUrl(id),
+});
+
+const errorReason = async (response: Response): Promise<string> => {
+    const body = await response.json().catch(() => null);
+    return body?.error?.errors?.[0]?.reason ?? '';
+};
+
+interface VideoLookup {
+    resolve: (video: VideoItem | undefined) => void;
+    reject: (error: unknown) => void;
+}
+
+interface YouTubeApiClientOptions {
+    baseUrl?: string;
+    apiKey?: string;
+    fetch?: FetchFunction;
+    concurrency?: number;
+    maxRetries?: number;
+    baseDelayMs?: number;
+    dailyQuota?: number;
+}
+
+class YouTubeApiClient {
+    private fetch: FetchFunction;
+    private pool: RequestPool;
+    private dailyQuota: number;
+    private queuedLookups = new Map<string, VideoLookup>(); // sent together on the next microtask
+    private videoLookups = new Map<string, Promise<VideoItem | undefined>>();
+    private quotaByMethod: Record<ApiMethod, number> = { 'search.list': 0, 'videos.list': 0 };
+    private counters = { requests: 0, retries: 0, videoLookups: 0, videoBatches: 0 };
+
+    constructor(private options: YouTubeApiClientOptions = {}) {
+        this.fetch = options.fetch ?? ((input, init) => globalThis.fetch(input, init));
+        this.pool = new RequestPool(options.concurrency ?? 4);
+        this.dailyQuota = options.dailyQuota ?? 10_000;
+    }
+
+    private get quotaUsed() {
+        return this.quotaByMethod['search.list'] + this.quotaByMethod['videos.list'];
+    }
+
+    get stats() {
+        return {
+            ...this.counters,
+            quotaByMethod: { ...this.quotaByMethod },
+            quotaUsed: this.quotaUsed,
+            quotaRemaining: this.dailyQuota - this.quotaUsed,
+        };
+    }
+
+    // Music videos matching `query`, with durations filled in through videos.list.
+    async search(query: string, signal?: AbortSignal, pageToken?: string): Promise<SearchPage<VideoItem>> {
+        const response = await this.request<ApiSearchResponse>('search.list', 'search', {
+            part: 'snippet',
+            type: 'video',
+            videoCategoryId: '10', // Music
+            q: query,
+            maxResults: String(SEARCH_MAX_RESULTS),
+            ...(pageToken ? { pageToken } : {}),
+        }, signal);
+        const items = await this.getVideos(response.items.map((item) => item.id.videoId), signal);
+        return { items, nextPageToken: response.nextPageToken };
+    }
+
+    // Videos for `videoIds`, in that order; unknown ids are left out. Aborting `signal` only stops
+    // this caller from waiting, since the underlying batch may be shared.
+    async getVideos(videoIds: string[], signal?: AbortSignal): Promise<VideoItem[]> {
+        const videos = await untilAborted(Promise.all(videoIds.map((videoId) => this.getVideo(videoId))), signal);
+        return videos.filter((video): video is VideoItem => video !== undefined);
+    }
+
+    private getVideo(videoId: string) {
+        let video = this.videoLookups.get(videoId);
+        if (!video) {
+            this.counters.videoLookups++;
+            video = new Promise<VideoItem | undefined>((resolve, reject) => {
+                if (this.queuedLookups.size === 0) queueMicrotask(() => this.flushLookups());
+                this.queuedLookups.set(videoId, { resolve, reject });
+            });
+            const forget = () => this.videoLookups.delete(videoId);
+            video.then(forget, forget);
+            this.videoLookups.set(videoId, video);
+        }
+        return video;
+    }
+
+    private flushLookups() {
+        const lookups = [...this.queuedLookups];
+        this.queuedLookups.clear();
+        for (let i = 0; i < lookups.length; i += VIDEOS_LIST_MAX_IDS) {
+            const chunk = lookups.slice(i, i + VIDEOS_LIST_MAX_IDS);
+            this.counters.videoBatches++;
+            this.request<{ items: ApiVideoResource[] }>('videos.list', 'videos', {
+                part: 'snippet,contentDetails',
+                id: chunk.map(([videoId]) => videoId).join(','),
+                maxResults: String(VIDEOS_LIST_MAX_IDS),
+            }).then(
+                (response) => {
+                    const found = new Map(response.items.map((item) => [item.id, toVideoItem(item)]));
+                    for (const [videoId, lookup] of chunk) lookup.resolve(found.get(videoId));
+                },
+                (error) => {
+                    for (const [, lookup] of chunk) lookup.reject(error);
+                },
+            );
+        }
+    }
+
+    private async request<T>(method: ApiMethod, path: string, params: Record<string, string>, signal?: AbortSignal): Promise<T> {
+        const { baseUrl = YOUTUBE_API_BASE_URL, apiKey, maxRetries = 4, baseDelayMs = 500 } = this.options;
+        const url = `${baseUrl}/${path}?${new URLSearchParams(apiKey ? { ...params, key: apiKey } : params)}`;
+        for (let attempt = 0; ; attempt++) {
+            const response = await this.pool.run(async () => {
+                if (signal?.aborted) throw new DOMException('Aborted', 'AbortError');
+                if (this.quotaUsed + QUOTA_COST[method] > this.dailyQuota) {
+                    throw new YouTubeApiError(method, 403, 'quotaExceeded');
+                }
+                this.quotaByMethod[method] += QUOTA_COST[method]; // failed calls are charged too
+                this.counters.requests++;
+                return this.fetch(url, { signal });
+            });
+            if (response.ok) return response.json();
+
+            const reason = await errorReason(response);
+            const retryable = response.status === 429 || response.status >= 500 ||
+                (response.status === 403 && RATE_LIMIT_REASONS.has(reason));
+            if (!retryable || attempt >= maxRetries) throw new YouTubeApiError(method, response.status, reason);
+            this.counters.retries++;
+            const retryAfterMs = Number(response.headers.get('Retry-After')) * 1000 || 0;
+            const backoffMs = Math.random() * baseDelayMs * 2 ** attempt;
+            await abortableDelay(Math.max(retryAfterMs, backoffMs), signal ?? new AbortController().signal);
+        }
+    }
+}
+
+// Serves `fixture` over the Data API's URLs and response shapes, for use as a client's `fetch`
+// in place of the real backend. `rateLimitEvery` makes every nth request fail with a
+// rateLimitExceeded 403.
+const createMockYouTubeServer = (
+    fixture: VideoItem[],
+    { latencyMs = MOCK_API_LATENCY_MS, rateLimitEvery = 0 } = {},
+): FetchFunction => {
+    let compute: SearchCompute | null = null; // created, with its worker, by the first search
+    const videosById = new Map(fixture.map((video) => [video.id, video]));
+    const snippetOf = (video: VideoItem): ApiVideoSnippet => ({
+        title: video.title,
+        channelTitle: video.artist,
+        thumbnails: { medium: { url: video.thumbnail } },
+    });
+    const respond = (status: number, body: unknown) =>
+        new Response(JSON.stringify(body), { status, headers: { 'Content-Type': 'application/json' } });
+    const fail = (status: number, reason: string) => respond(status, { error: { code: status, errors: [{ reason }] } });
+    let requests = 0;
+
+    return async (input, init) => {
+        await abortableDelay(latencyMs, init?.signal ?? new AbortController().signal);
+        if (rateLimitEvery > 0 && ++requests % rateLimitEvery === 0) return fail(403, 'rateLimitExceeded');
+
+        const url = new URL(input);
+        const params = url.searchParams;
+        if (url.pathname.endsWith('/search')) {
+            const offset = Number(params.get('pageToken') ?? 0);
+            const end = offset + Number(params.get('maxResults') ?? 5);
+            // One extra match tells whether there is a next page
+            compute ??= new SearchCompute(fixture);
+            const matches = await compute.search(params.get('q') ?? '', end + 1);
+            return respond(200, {
+                items: matches.slice(offset, end).map((video) => ({ id: { videoId: video.id }, snippet: snippetOf(video) })),
+                nextPageToken: end < matches.length ? String(end) : undefined,
+            });
+        }
+        if (url.pathname.endsWith('/videos')) {
+            const ids = (params.get('id') ?? '').split(',');
+            if (ids.length > VIDEOS_LIST_MAX_IDS) return fail(400, 'invalidFilters');
+            const items: ApiVideoResource[] = ids.flatMap((id) => {
+                const video = videosById.get(id);
+                return video ? [{ id, snippet: snippetOf(video), contentDetails: { duration: toIsoDuration(video.duration) } }] : [];
+            });
+            return respond(200, { items });
+        }
+        return fail(404, 'notFound');
+    };
+};
+
+// Talks to the mock server until the app is given an API key
+const youTubeApi = new YouTubeApiClient({ fetch: createMockYouTubeServer(mockSearchResults), dailyQuota: Infinity });
+
+const fetchPlaylistVideos = (videoIds: string[]) => youTubeApi.getVideos(videoIds);
+
+// Service Worker
+// The worker is its own entry, sw.ts, built to /sw.js: see there for what it caches and how. The
+// page registers it once idle and asks it for hit and miss counts to show in Settings.
+const registerServiceWorker = async () => {
+    if (typeof navigator === 'undefined' || !('serviceWorker' in navigator)) return;
+    try {
+        await navigator.serviceWorker.register('/sw.js', { scope: '/' });
+    } catch (error) {
+        console.warn('Service worker registration failed', error);
+    }
+};
+
+// Hit and miss counts from the controlling service worker; empty when there is none.
+export const fetchServiceWorkerStats = (timeoutMs = 1000): Promise<ServiceWorkerCacheStats[]> => {
+    const worker = typeof navigator === 'undefined' ? null : navigator.serviceWorker?.controller;
+    if (!worker) return Promise.resolve([]);
+    return new Promise((resolve) => {
+        const channel = new MessageChannel();
+        const timer = setTimeout(() => resolve([]), timeoutMs);
+        channel.port1.onmessage = ({ data }: MessageEvent<ServiceWorkerCacheStats[]>) => {
+            clearTimeout(timer);
+            channel.port1.close();
+            resolve(data);
+        };
+        const message: ServiceWorkerMessage = { type: 'stats' };
+        worker.postMessage(message, [channel.port2]);
+    });
+};
+
+// Player
+// One YouTube IFrame Player lives for the whole session in a host element on <body>. Views render
+// a PlayerSlot and the host is positioned over the most recently mounted slot, so moving between
+// the mini and full-screen players never reloads the embed. Track switches reuse the player.
+const PLAYER_TIMING_SAMPLES = 50;
+const PLAYER_SETTLE_FRAMES = 20; // frames the slot must stay put before the host stops following it
+
+const pushSample = (samples: number[], value: number) => {
+    samples.push(value);
+    if (samples.length > PLAYER_TIMING_SAMPLES) samples.shift();
+};
+
+// YT.PlayerState
+const PLAYER_STATE = { ended: 0, playing: 1, paused: 2 } as const;
+
+interface YouTubePlayer {
+    loadVideoById(videoId: string): void;
+    cueVideoById(videoId: string): void;
+    playVideo(): void;
+    pauseVideo(): void;
+    stopVideo(): void;
+    seekTo(seconds: number, allowSeekAhead: boolean): void;
+    getCurrentTime(): number;
+    getDuration(): number;
+}
+
+interface YouTubeIframeApi {
+    Player: new (
+        element: HTMLElement,
+        options: {
+            videoId: string;
+            width: string;
+            height: string;
+            playerVars: Record<string, number>;
+            events: { onReady: () => void; onStateChange: (event: { data: number }) => void };
+        },
+    ) => YouTubePlayer;
+}
+
+type YouTubeWindow = Window & { YT?: YouTubeIframeApi; onYouTubeIframeAPIReady?: () => void };
+
+let youTubeIframeApi: Promise<YouTubeIframeApi> | null = null;
+
+const loadYouTubeIframeApi = () => {
+    youTubeIframeApi ??= new Promise<YouTubeIframeApi>((resolve, reject) => {
+        const scope = window as YouTubeWindow;
+        if (scope.YT?.Player) return resolve(scope.YT);
+        const previousReady = scope.onYouTubeIframeAPIReady;
+        scope.onYouTubeIframeAPIReady = () => {
+            previousReady?.();
+            resolve(scope.YT!);
+        };
+        const script = document.createElement('script');
+        script.src = 'https://www.youtube.com/iframe_api';
+        script.async = true;
+        script.onerror = () => {
+            youTubeIframeApi = null;
+            reject(new Error('Failed to load the YouTube IFrame API'));
+        };
+        document.head.appendChild(script);
+    });
+    return youTubeIframeApi;
+};
+
+class PlayerController {
+    private host: HTMLDivElement | null = null;
+    private player: YouTubePlayer | null = null;
+    private creating = false;
+    private videoId: string | null = null;
+    private wantsPlaying = false;
+    private playing = false;
+    private slots: HTMLElement[] = [];
+    private frame = 0;
+    private stableFrames = 0;
+    private lastRect = '';
+    private resizeObserver: ResizeObserver | null = null;
+    private switchStartedAt: number | null = null;
+    private endedAt: number | null = null;
+    private timeToFirstAudioMs: number[] = [];
+    private trackGapMs: number[] = [];
+    private listeners = new Set<() => void>();
+    private endedListeners = new Set<() => void>();
+    private audioStartListeners = new Set<() => void>();
+
+    subscribe = (listener: () => void) => {
+        this.listeners.add(listener);
+        return () => {
+            this.listeners.delete(listener);
+        };
+    };
+
+    get isPlaying() {
+        return this.playing;
+    }
+
+    get currentVideoId() {
+        return this.videoId;
+    }
+
+    // Listeners may start the next track; if none does, playback stops.
+    onEnded = (listener: () => void) => {
+        this.endedListeners.add(listener);
+        return () => {
+            this.endedListeners.delete(listener);
+        };
+    };
+
+    // Audio starts after a switch, a restart or a resume, unlike isPlaying, which stays true
+    // through a switch between tracks.
+    onAudioStart = (listener: () => void) => {
+        this.audioStartListeners.add(listener);
+        return () => {
+            this.audioStartListeners.delete(listener);
+        };
+    };
+
+    getCurrentTime = () => this.player?.getCurrentTime() ?? 0;
+
+    getDuration = () => this.player?.getDuration() ?? 0;
+
+    // Over recent switches: time from asking for a track until it plays, and for tracks that
+    // followed one that ended, the silence between the two.
+    get stats() {
+        const firstAudio = [...this.timeToFirstAudioMs].sort((a, b) => a - b);
+        const gaps = [...this.trackGapMs].sort((a, b) => a - b);
+        return {
+            switches: firstAudio.length,
+            timeToFirstAudioP50Ms: percentile(firstAudio, 0.5),
+            timeToFirstAudioP95Ms: percentile(firstAudio, 0.95),
+            transitions: gaps.length,
+            trackGapP50Ms: percentile(gaps, 0.5),
+            trackGapP95Ms: percentile(gaps, 0.95),
+        };
+    }
+
+    // Switches tracks; `autoplay` false only cues the video.
+    load(videoId: string, autoplay = true) {
+        if (videoId === this.videoId) {
+            if (autoplay && !this.playing) {
+                this.switchStartedAt ??= performance.now(); // starting a cued track counts as a switch
+                this.play();
+            }
+            return;
+        }
+        this.videoId = videoId;
+        this.wantsPlaying = autoplay;
+        this.switchStartedAt = autoplay ? performance.now() : null;
+        if (!this.player) {
+            void this.create();
+        } else if (autoplay) {
+            this.player.loadVideoById(videoId);
+        } else {
+            this.player.cueVideoById(videoId);
+        }
+    }
+
+    play() {
+        this.wantsPlaying = true;
+        this.player?.playVideo();
+    }
+
+    // Plays the current track again from the start, e.g. when it ended and repeats. load() can't:
+    // for the current track it only resumes, and an ended track still counts as playing.
+    restart() {
+        this.wantsPlaying = true;
+        this.player?.seekTo(0, true);
+        this.player?.playVideo();
+    }
+
+    pause() {
+        this.wantsPlaying = false;
+        this.endedAt = null;
+        this.player?.pauseVideo();
+    }
+
+    stop() {
+        this.wantsPlaying = false;
+        this.videoId = null;
+        this.switchStartedAt = null;
+        this.endedAt = null;
+        this.player?.stopVideo();
+        this.setPlaying(false);
+    }
+
+    attach(slot: HTMLElement) {
+        if (this.slots.length === 0) {
+            window.addEventListener('scroll', this.reposition, { capture: true, passive: true });
+            window.addEventListener('resize', this.reposition);
+        }
+        this.slots.push(slot);
+        this.ensureHost(slot).style.borderRadius = getComputedStyle(slot).borderRadius;
+        this.observeActiveSlot();
+    }
+
+    detach(slot: HTMLElement) {
+        this.slots = this.slots.filter((other) => other !== slot);
+        const active = this.slots[this.slots.length - 1];
+        if (active) {
+            this.ensureHost().style.borderRadius = getComputedStyle(active).borderRadius;
+        } else {
+            window.removeEventListener('scroll', this.reposition, { capture: true });
+            window.removeEventListener('resize', this.reposition);
+        }
+        this.observeActiveSlot();
+    }
+
+    private observeActiveSlot() {
+        const slot = this.slots[this.slots.length - 1];
+        if (typeof ResizeObserver !== 'undefined') {
+            this.resizeObserver ??= new ResizeObserver(this.reposition);
+            this.resizeObserver.disconnect();
+            if (slot) this.resizeObserver.observe(slot);
+        }
+        this.reposition();
+    }
+
+    // Called whenever the active slot may have moved: it was mounted or resized, or the page
+    // scrolled or resized. The host then follows it frame by frame, through any enter or exit
+    // animation, until it has stayed put for PLAYER_SETTLE_FRAMES.
+    private reposition = () => {
+        this.stableFrames = 0;
+        if (!this.frame) this.frame = requestAnimationFrame(this.follow);
+    };
+
+    // With no slot, the player is parked off-screen and keeps playing.
+    private follow = () => {
+        const host = this.ensureHost();
+        const slot = this.slots[this.slots.length - 1];
+        const rect = slot?.getBoundingClientRect();
+        const key = rect ? `${rect.left},${rect.top},${rect.width},${rect.height}` : 'parked';
+        if (key !== this.lastRect) {
+            this.lastRect = key;
+            this.stableFrames = 0;
+            Object.assign(host.style, rect
+                ? { left: `${rect.left}px`, top: `${rect.top}px`, width: `${rect.width}px`, height: `${rect.height}px` }
+                : { left: '-10000px', top: '0px', width: '320px', height: '180px' });
+        } else {
+            this.stableFrames++;
+        }
+        this.frame = slot && this.stableFrames < PLAYER_SETTLE_FRAMES ? requestAnimationFrame(this.follow) : 0;
+    };
+
+    // The host shares the overlays' z-index (z-50) and sits right after the app's root element,
+    // so it covers the player views, while sheets, menus and dialogs, which are portalled to the
+    // end of <body>, cover it. It is never moved afterwards: moving an iframe reloads it.
+    private ensureHost(slot?: HTMLElement) {
+        if (!this.host) {
+            this.host = document.createElement('div');
+            this.host.style.cssText = 'position:fixed;left:-10000px;top:0;width:320px;height:180px;z-index:50;overflow:hidden;';
+            this.host.appendChild(document.createElement('div'));
+            let root: HTMLElement | null = slot ?? null;
+            while (root && root.parentElement !== document.body) root = root.parentElement;
+            if (root) root.after(this.host);
+            else document.body.appendChild(this.host);
+        }
+        return this.host;
+    }
+
+    private async create() {
+        if (this.creating) return;
+        this.creating = true;
+        try {
+            const api = await loadYouTubeIframeApi();
+            const initialId = this.videoId;
+            if (initialId === null) return;
+            const player = new api.Player(this.ensureHost().firstElementChild as HTMLElement, {
+                videoId: initialId,
+                width: '100%',
+                height: '100%',
+                playerVars: { playsinline: 1 },
+                events: {
+                    onReady: () => {
+                        // Apply whatever was asked for while the player was loading
+                        this.player = player;
+                        if (this.videoId === null) {
+                            player.stopVideo();
+                        } else if (this.videoId !== initialId && this.wantsPlaying) {
+                            player.loadVideoById(this.videoId);
+                        } else if (this.videoId !== initialId) {
+                            player.cueVideoById(this.videoId);
+                        } else if (this.wantsPlaying) {
+                            player.playVideo();
+                        }
+                    },
+                    onStateChange: ({ data }) => this.handleStateChange(data),
+                },
+            });
+        } catch (error) {
+            console.error('Failed to create the player', error);
+        } finally {
+            this.creating = false;
+        }
+    }
+
+    private handleStateChange(state: number) {
+        if (state === PLAYER_STATE.playing) {
+            const now = performance.now();
+            const audioStarts = this.switchStartedAt !== null || this.endedAt !== null || !this.playing;
+            if (this.switchStartedAt !== null) pushSample(this.timeToFirstAudioMs, now - this.switchStartedAt);
+            if (this.endedAt !== null) pushSample(this.trackGapMs, now - this.endedAt);
+            this.switchStartedAt = null;
+            this.endedAt = null;
+            this.setPlaying(true);
+            if (audioStarts) this.audioStartListeners.forEach((listener) => listener());
+        } else if (state === PLAYER_STATE.paused) {
+            this.setPlaying(false);
+        } else if (state === PLAYER_STATE.ended) {
+            this.endedAt = performance.now();
+            this.wantsPlaying = false;
+            this.endedListeners.forEach((listener) => listener());
+            if (!this.wantsPlaying) {
+                this.endedAt = null;
+                this.setPlaying(false);
+            }
+        }
+    }
+
+    private setPlaying(playing: boolean) {
+        if (playing === this.playing) return;
+        this.playing = playing;
+        this.listeners.forEach((listener) => listener());
+    }
+}
+
+export const playerController = new PlayerController();
+
+// Playback Queue
+// Plays through a context (search results or a playlist) in list or shuffled order. Tracks the user
+// queues with "Play next" sit in a ring buffer ahead of the context. Shortly before a track ends,
+// whatever plays next is warmed up so the switch only waits for the video stream.
+const TRACK_PRELOAD_LEAD_SECONDS = 10;
+const QUEUE_HISTORY_LIMIT = 100;
+
+type RepeatMode = 'off' | 'all' | 'one';
+
+// FIFO over a circular array; doubles its capacity when full.
+class RingBuffer<T> {
+    private items: (T | undefined)[];
+    private head = 0;
+    private count = 0;
+
+    constructor(capacity = 16) {
+        this.items = new Array(capacity);
+    }
+
+    get size() {
+        return this.count;
+    }
+
+    push(item: T) {
+        if (this.count === this.items.length) {
+            this.items = [...this, ...new Array<T | undefined>(this.items.length)];
+            this.head = 0;
+        }
+        this.items[(this.head + this.count) % this.items.length] = item;
+        this.count++;
+    }
+
+    shift(): T | undefined {
+        if (this.count === 0) return undefined;
+        const item = this.items[this.head];
+        this.items[this.head] = undefined;
+        this.head = (this.head + 1) % this.items.length;
+        this.count--;
+        return item;
+    }
+
+    at(offset: number): T | undefined {
+        return offset < this.count ? this.items[(this.head + offset) % this.items.length] : undefined;
+    }
+
+    clear() {
+        this.items.fill(undefined);
+        this.head = 0;
+        this.count = 0;
+    }
+
+    *[Symbol.iterator]() {
+        for (let i = 0; i < this.count; i++) yield this.items[(this.head + i) % this.items.length] as T;
+    }
+}
+
+export interface QueueState {
+    current: VideoItem | null;
+    shuffle: boolean;
+    repeat: RepeatMode;
+    hasNext: boolean;
+    hasPrevious: boolean;
+}
+
+class PlaybackQueue {
+    private context: VideoItem[] = [];
+    private order: number[] = []; // indices into `context`, in play order
+    private position = -1; // of the last context track played, in `order`
+    private upNext = new RingBuffer<VideoItem>();
+    private history: { video: VideoItem; position: number }[] = [];
+    private current: VideoItem | null = null;
+    private shuffle = false;
+    private repeat: RepeatMode = 'off';
+    private listeners = new Set<() => void>();
+    private snapshot: QueueState = this.createSnapshot();
+
+    constructor(private random: () => number = Math.random) {}
+
+    subscribe = (listener: () => void) => {
+        this.listeners.add(listener);
+        return () => {
+            this.listeners.delete(listener);
+        };
+    };
+
+    getSnapshot = () => this.snapshot;
+
+    // Starts playing `videos` from `startIndex`; "Play next" tracks already queued are kept.
+    playList(videos: VideoItem[], startIndex = 0) {
+        this.context = videos;
+        this.order = this.buildOrder(startIndex);
+        this.position = this.order.indexOf(startIndex);
+        this.history = [];
+        this.current = videos[startIndex] ?? null;
+        this.emit();
+        return this.current;
+    }
+
+    playNext(video: VideoItem) {
+        this.upNext.push(video);
+        this.emit();
+    }
+
+    // `ended` is true when the current track finished on its own, so "repeat one" replays it.
+    next(ended = false) {
+        if (ended && this.repeat === 'one' && this.current) return this.current;
+        const queued = this.upNext.shift();
+        let video = queued;
+        let position = this.position;
+        if (!video) {
+            position = this.nextPosition();
+            if (position === null) return null;
+            video = this.context[this.order[position]];
+        }
+        if (this.current) {
+            this.history.push({ video: this.current, position: this.position });
+            if (this.history.length > QUEUE_HISTORY_LIMIT) this.history.shift();
+        }
+        this.position = position;
+        this.current = video;
+        this.emit();
+        return video;
+    }
+
+    previous() {
+        const entry = this.history.pop();
+        if (!entry) return null;
+        this.current = entry.video;
+        this.position = entry.position;
+        this.emit();
+        return entry.video;
+    }
+
+    // What `next()` would return, without advancing.
+    peekNext() {
+        return this.upcoming(1)[0] ?? null;
+    }
+
+    upcoming(count: number) {
+        const videos: VideoItem[] = [];
+        for (const video of this.upNext) {
+            if (videos.length === count) return videos;
+            videos.push(video);
+        }
+        const length = this.order.length;
+        const laps = this.repeat === 'all' ? length : length - this.position - 1;
+        for (let step = 1; step <= laps && videos.length < count; step++) {
+            videos.push(this.context[this.order[(this.position + step) % length]]);
+        }
+        return videos;
+    }
+
+    setShuffle(shuffle: boolean) {
+        this.shuffle = shuffle;
+        const currentIndex = this.position >= 0 ? this.order[this.position] : 0;
+        this.order = this.buildOrder(currentIndex);
+        this.position = this.order.indexOf(currentIndex);
+        this.emit();
+    }
+
+    setRepeat(repeat: RepeatMode) {
+        this.repeat = repeat;
+        this.emit();
+    }
+
+    clear() {
+        this.context = [];
+        this.order = [];
+        this.position = -1;
+        this.upNext.clear();
+        this.history = [];
+        this.current = null;
+        this.emit();
+    }
+
+    // List order, or a shuffle with `firstIndex` moved to the front.
+    private buildOrder(firstIndex: number) {
+        const order = this.context.map((_, i) => i);
+        if (!this.shuffle) return order;
+        for (let i = order.length - 1; i > 0; i--) {
+            const j = Math.floor(this.random() * (i + 1));
+            [order[i], order[j]] = [order[j], order[i]];
+        }
+        const first = order.indexOf(firstIndex);
+        if (first > 0) [order[0], order[first]] = [order[first], order[0]];
+        return order;
+    }
+
+    private nextPosition() {
+        if (this.position + 1 < this.order.length) return this.position + 1;
+        return this.repeat === 'all' && this.order.length > 0 ? 0 : null;
+    }
+
+    private createSnapshot(): QueueState {
+        return {
+            current: this.current,
+            shuffle: this.shuffle,
+            repeat: this.repeat,
+            hasNext: this.upNext.size > 0 || this.nextPosition() !== null,
+            hasPrevious: this.history.length > 0,
+        };
+    }
+
+    private emit() {
+        this.snapshot = this.createSnapshot();
+        this.listeners.forEach((listener) => listener());
+    }
+}
+
+let preconnected = false;
+
+// Warms up what the next track needs: connections to the player's origin, its thumbnail, lyrics
+// and offline metadata. Safe to call repeatedly.
+const preloadTrack = (video: VideoItem) => {
+    if (!preconnected) {
+        preconnected = true;
+        // The embed navigates without CORS, so only thumbnails, fetched with it, want an anonymous connection
+        const connections = [
+            { origin: 'https://www.youtube.com', cors: false },
+            { origin: new URL(thumbnailUrl(video.id, 'default')).origin, cors: true },
+        ];
+        for (const { origin, cors } of connections) {
+            const link = document.createElement('link');
+            link.rel = 'preconnect';
+            link.href = origin;
+            if (cors) link.crossOrigin = 'anonymous';
+            document.head.appendChild(link);
+        }
+    }
+    thumbnailCache.load(thumbnailUrl(video.id, pickThumbnailSize(112))).catch(() => {});
+    lyricsService.prefetch([video.id]);
+    void offlineCache.put('track', video.id, video);
+};
+
+// App State
+// UI state lives in small external stores, one per concern, rather than in useState calls at the
+// top of TuneFlowApp. Components read just the values they render through useStoreSelector and
+// re-render only when those change, so pausing playback, for example, leaves the results alone.
+// Handlers read the stores when they run instead of closing over state, so they stay stable.
+class StateStore<S extends object> {
+    private listeners = new Set<() => void>();
+
+    constructor(private state: S) {}
+
+    subscribe = (listener: () => void) => {
+        this.listeners.add(listener);
+        return () => {
+            this.listeners.delete(listener);
+        };
+    };
+
+    getSnapshot = () => this.state;
+
+    // Shallow-merges `update`; listeners run only if some value actually changed.
+    set(update: Partial<S> | ((state: S) => Partial<S>)) {
+        const patch = typeof update === 'function' ? update(this.state) : update;
+        const changed = (Object.keys(patch) as (keyof S)[]).some((key) => !Object.is(patch[key], this.state[key]));
+        if (!changed) return;
+        this.state = { ...this.state, ...patch };
+        this.listeners.forEach((listener) => listener());
+    }
+}
+
+// `selector` must return a primitive or a reference already held in the state, never a new object.
+const useStoreSelector = <S extends object, T>(store: StateStore<S>, selector: (state: S) => T) =>
+    useSyncExternalStore(store.subscribe, () => selector(store.getSnapshot()));
+
+interface SearchState {
+    term: string;
+    results: VideoItem[];
+    loading: boolean;
+}
+
+interface PlayerViewState {
+    isPlaying: boolean;
+    isFullScreen: boolean;
+    lyrics: ParsedLyrics | null;
+}
+
+interface UiPrefs {
+    isDarkMode: boolean;
+    isListView: boolean;
+    showSettingsSheet: boolean;
+    showPlaylistSheet: boolean;
+}
+
+const initialSearchState: SearchState = { term: '', results: [], loading: false };
+const initialPlayerViewState: PlayerViewState = { isPlaying: false, isFullScreen: false, lyrics: null };
+const initialUiPrefs: UiPrefs = { isDarkMode: false, isListView: false, showSettingsSheet: false, showPlaylistSheet: false };
+
+// The one action menu shared by every result card: the video it is open for and the element it
+// hangs from, or nulls while closed.
+interface ActionMenuState {
+    videoId: string | null;
+    anchor: HTMLElement | null;
+}
+
+const initialActionMenuState: ActionMenuState = { videoId: null, anchor: null };
+
+// Render Profiling
+// Components report their commits under a name. measure() runs one interaction and returns how
+// many commits each name saw until the next frame, e.g. to check that a toggle stays local.
+class RenderProfiler {
+    private counts = new Map<string, number>();
+
+    get commits(): Record<string, number> {
+        return Object.fromEntries(this.counts);
+    }
+
+    record(name: string) {
+        this.counts.set(name, (this.counts.get(name) ?? 0) + 1);
+    }
+
+    async measure(interact: () => void): Promise<Record<string, number>> {
+        const before = new Map(this.counts);
+        interact();
+        await new Promise(requestAnimationFrame);
+        const delta: Record<string, number> = {};
+        for (const [name, count] of this.counts) {
+            const commits = count - (before.get(name) ?? 0);
+            if (commits > 0) delta[name] = commits;
+        }
+        return delta;
+    }
+}
+
+const renderProfiler = new RenderProfiler();
+
+// Counts every commit of the calling component (renders React throws away are not counted).
+const useRenderCount = (name: string) => {
+    useEffect(() => renderProfiler.record(name));
+};
+
+// Benchmarks
+const createSeededRandom = (seed: number) => () => {
+    // mulberry32
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+};
+
+const syntheticWords = [
+    'love', 'night', 'dance', 'heart', 'fire', 'summer', 'dream', 'lights', 'blue', 'wild',
+    'forever', 'girl', 'city', 'rain', 'gold', 'shadow', 'river', 'electric', 'midnight', 'star',
+    'queen', 'rhapsody', 'thunder', 'paradise', 'broken', 'sweet', 'road', 'lonely', 'fever', 'echo',
+];
+
+const syntheticSyllables = ['ka', 'lo', 'mi', 'ra', 'ven', 'do', 'sel', 'tor', 'an', 'bri', 'zu', 'mel', 'ost', 'ne', 'vi', 'gar'];
+
+// Scales `mockSearchResults` up to `size` items with deterministic, unique ids. Titles mix a few
+// common words with a lexicon of made-up ones so the vocabulary grows like a real catalog's.
+const generateSyntheticCatalog = (size: number, seed = 1): VideoItem[] => {
+    const random = createSeededRandom(seed);
+    const choose = <T,>(items: T[]) => items[Math.floor(random() * items.length)];
+    const lexicon = Array.from({ length: Math.max(1, Math.ceil(size / 10)) }, () =>
+        Array.from({ length: 2 + Math.floor(random() * 3) }, () => choose(syntheticSyllables)).join('')
+    );
+    const pick = () => (random() < 0.3 ? choose(syntheticWords) : choose(lexicon));
+    const artists = Array.from({ length: Math.max(1, Math.ceil(size / 20)) }, (_, i) =>
+        i < mockSearchResults.length ? mockSearchResults[i].artist : `${pick()} ${pick()}`
+    );
+
+    return Array.from({ length: size }, (_, i) => {
+        if (i < mockSearchResults.length) return mockSearchResults[i];
+        const id = `syn${i.toString(36).padStart(8, '0')}`;
+        const artist = choose(artists);
+        return {
+            id,
+            title: `${artist} - ${pick()} ${pick()} ${pick()} (Official Music Video)`,
+            artist,
+            thumbnail: `https://img.youtube.com/vi/${id}/mqdefault.jpg`,
+            duration: `${1 + Math.floor(random() * 6)}:${String(Math.floor(random() * 60)).padStart(2, '0')}`,
+            url: `https://www.youtube.com/watch?v=${id}`,
+        };
+    });
+};
+
+const linearSearch = (videos: VideoItem[], query: string) =>
+    videos.filter((video) =>
+        video.title.toLowerCase().includes(query.toLowerCase()) ||
+        video.artist.toLowerCase().includes(query.toLowerCase())
+    );
+
+const averageMs = (queries: string[], iterations: number, run: (query: string) => unknown) => {
+    const start = performance.now();
+    for (let i = 0; i < iterations; i++) {
+        for (const query of queries) run(query);
+    }
+    return (performance.now() - start) / (iterations * queries.length);
+};
+
+// Per-query latency of the index against the linear filter it replaced, e.g. from the devtools console.
+export const benchmarkSearchIndex = (
+    sizes = [10_000, 100_000, 1_000_000],
+    queries = ['queen', 'bohemian rhap', 'ravenmi', 'midnight fev', 'the weeknd', 'zzz'],
+) =>
+    sizes.map((size) => {
+        const catalog = generateSyntheticCatalog(size);
+        const buildStart = performance.now();
+        const index = new SearchIndex(catalog);
+        const buildMs = performance.now() - buildStart;
+        const iterations = Math.max(1, Math.round(100_000 / size));
+        return {
+            size,
+            buildMs,
+            indexedQueryMs: averageMs(queries, iterations, (query) => index.search(query)),
+            linearQueryMs: averageMs(queries, iterations, (query) => linearSearch(catalog, query)),
+        };
+    });
+
+// Build time and per-query latency of the fuzzy index, with misspelled and partial queries.
+export const benchmarkFuzzySearch = (
+    sizes = [10_000, 100_000],
+    queries = ['bohemain rapsody', 'weeknd blindng', 'queen', 'midnite fever', 'ravenmi', 'zzz'],
+    limit = 50,
+) =>
+    sizes.map((size) => {
+        const catalog = generateSyntheticCatalog(size);
+        const buildStart = performance.now();
+        const index = new FuzzySearchIndex(catalog);
+        const buildMs = performance.now() - buildStart;
+        const samples: number[] = [];
+        const iterations = Math.max(1, Math.round(100_000 / size));
+        for (let i = 0; i < iterations; i++) {
+            for (const query of queries) {
+                const start = performance.now();
+                index.search(query, limit);
+                samples.push(performance.now() - start);
+            }
+        }
+        samples.sort((a, b) => a - b);
+        return {
+            size,
+            buildMs,
+            queryMs: samples.reduce((sum, sample) => sum + sample, 0) / samples.length,
+            queryP95Ms: percentile(samples, 0.95),
+        };
+    });
+
+// Checks that fuzzy search still finds every track the original `includes()` filter did, typos
+// aside: each of its hits must be among the results. Throws on the first query that misses one.
+export const checkFuzzySearchKeepsSubstringMatches = (
+    size = 5_000,
+    queries = ['queen', 'psody', 'rap', 'mi', 'bohemian rhap', 'the w', 'a b', 'eek', 'zzz'],
+) => {
+    const catalog = generateSyntheticCatalog(size);
+    const index = new FuzzySearchIndex(catalog);
+    return queries.map((query) => {
+        const found = new Set(index.search(query).map((video) => video.id));
+        const expected = linearSearch(catalog, query);
+        const missed = expected.filter((video) => !found.has(video.id));
+        if (missed.length > 0) {
+            throw new Error(`Search for "${query}" missed ${missed.length} substring matches, e.g. "${missed[0].title}"`);
+        }
+        return { query, substringMatches: expected.length, results: found.size };
+    });
+};
+
+// Build time, per-prefix lookup latency in microseconds and compaction time of the suggestion trie,
+// with a history of `historySize` queries recorded on top of the catalog. Larger catalogs are
+// trimmed to the default node budget as they are added.
+export const benchmarkSuggestions = (
+    sizes = [10_000, 100_000],
+    prefixes = ['q', 'que', 'bohemian r', 'mid', 'the w', 'zz'],
+    historySize = 1_000,
+) =>
+    sizes.map((size) => {
+        const catalog = generateSyntheticCatalog(size);
+        const random = createSeededRandom(size);
+        const index = new SuggestionIndex({ compactEvery: Infinity });
+        const buildStart = performance.now();
+        index.addCatalog(catalog);
+        for (let i = 0; i < historySize; i++) {
+            index.recordQuery(catalog[Math.floor(random() * size)].title.split(' ').slice(0, 3).join(' '));
+        }
+        const buildMs = performance.now() - buildStart;
+        const { phrases, nodes } = index.stats;
+        const lookupUs = averageMs(prefixes, 1_000, (prefix) => index.suggest(prefix)) * 1000;
+        const compactStart = performance.now();
+        index.compact();
+        return { size, buildMs, phrases, nodes, lookupUs, compactMs: performance.now() - compactStart };
+    });
+
+// Chromium's `performance.memory`, or the process heap when running under Node (e.g. with jsdom).
+const usedHeapBytes = () =>
+    (performance as Performance & { memory?: { usedJSHeapSize: number } }).memory?.usedJSHeapSize ??
+    (globalThis as { process?: { memoryUsage?: () => { heapUsed: number } } }).process?.memoryUsage?.().heapUsed;
+
+// Adds `size` tracks one click at a time to one of several playlists, comparing the old
+// `prevPlaylists.map` update (full VideoItem arrays, copied per insert) with PlaylistStore.
+// Heap deltas are only reported where usedHeapBytes() can read the heap.
+export const benchmarkPlaylistStore = (sizes = [1_000, 10_000], playlistCount = 5) =>
+    sizes.map((size) => {
+        const catalog = generateSyntheticCatalog(size);
+        const emptyPlaylists = Array.from({ length: playlistCount }, (_, i) => ({ id: `p${i}`, name: `Playlist ${i}` }));
+
+        let heapBefore = usedHeapBytes();
+        let start = performance.now();
+        let legacyPlaylists = emptyPlaylists.map((playlist) => ({ ...playlist, videos: [] as VideoItem[] }));
+        catalog.forEach((video, i) => {
+            const playlistId = `p${i % playlistCount}`;
+            legacyPlaylists = legacyPlaylists.map((playlist) =>
+                playlist.id === playlistId ? { ...playlist, videos: [...playlist.videos, video] } : playlist
+            );
+        });
+        const legacyAddMs = (performance.now() - start) / size;
+        const legacyHeapBytes = heapBefore === undefined ? undefined : usedHeapBytes()! - heapBefore;
+
+        heapBefore = usedHeapBytes();
+        start = performance.now();
+        const store = new PlaylistStore(emptyPlaylists.map((playlist) => ({ ...playlist, videoIds: [] })));
+        catalog.forEach((video, i) => store.addVideos(`p${i % playlistCount}`, [video]));
+        const storeAddMs = (performance.now() - start) / size;
+        const storeHeapBytes = heapBefore === undefined ? undefined : usedHeapBytes()! - heapBefore;
+
+        start = performance.now();
+        store.batch(() => {
+            for (let i = 0; i < playlistCount; i++) store.addVideos(`p${i}`, catalog);
+        });
+        const storeBatchAddMs = performance.now() - start;
+
+        start = performance.now();
+        let members = 0;
+        for (const video of catalog) {
+            if (store.has('p0', video.id)) members++;
+        }
+        const storeHasMs = (performance.now() - start) / size;
+
+        return { size, legacyAddMs, storeAddMs, storeBatchAddMs, storeHasMs, members, legacyHeapBytes, storeHeapBytes };
+    });
+
+const percentile = (sortedValues: ArrayLike<number>, p: number) =>
+    sortedValues.length === 0 ? 0 : sortedValues[Math.min(sortedValues.length - 1, Math.floor(p * sortedValues.length))];
+
+// Mounts `size` result cards into `container` (virtualized or as the old full grid), then scrolls
+// the page to the bottom over `frames` animation frames. Must run in a real browser tab.
+export const benchmarkResultsRendering = async (
+    container: HTMLElement,
+    { sizes = [1_000, 10_000], virtualized = true, frames = 120 } = {},
+) => {
+    const frameBudgetMs = 1000 / 60;
+    const results = [];
+    for (const size of sizes) {
+        const catalog = generateSyntheticCatalog(size);
+        const renderCard = (video: VideoItem) => (
+            <VideoCard video={video} onPlay={() => {}} onOpenActions={() => {}} />
+        );
+        const root = createRoot(container);
+
+        const mountStart = performance.now();
+        flushSync(() =>
+            root.render(
+                virtualized ? (
+                    <VirtualizedResults items={catalog} isListView={false} renderItem={renderCard} />
+                ) : (
+                    <div className="grid gap-6 grid-cols-1 md:grid-cols-2 lg:grid-cols-3">
+                        {catalog.map((video) => <React.Fragment key={video.id}>{renderCard(video)}</React.Fragment>)}
+                    </div>
+                )
+            )
+        );
+        void container.offsetHeight; // include style and layout in the mount time
+        const mountMs = performance.now() - mountStart;
+        const domNodes = container.getElementsByTagName('*').length;
+
+        const frameTimes = new Float64Array(frames);
+        const scrollStep = (document.documentElement.scrollHeight - window.innerHeight) / frames;
+        let last = performance.now();
+        for (let frame = 0; frame < frames; frame++) {
+            window.scrollTo(0, scrollStep * (frame + 1));
+            await new Promise(requestAnimationFrame);
+            const now = performance.now();
+            frameTimes[frame] = now - last;
+            last = now;
+        }
+        frameTimes.sort();
+
+        root.unmount();
+        window.scrollTo(0, 0);
+        results.push({
+            size,
+            virtualized,
+            mountMs,
+            domNodes,
+            frameP50Ms: percentile(frameTimes, 0.5),
+            frameP95Ms: percentile(frameTimes, 0.95),
+            frameMaxMs: frameTimes[frames - 1],
+            droppedFrames: frameTimes.filter((ms) => ms > frameBudgetMs * 1.5).length,
+        });
+    }
+    return results;
+};
+
+// Render-isolation regression check: mounts the results view, the action menu and the player, then
+// toggles play/pause and edits a playlist, and throws if any result card or the results view
+// committed as a result. Returns the commits per component for each toggle. Needs a DOM: a browser
+// tab, or jsdom through checks.ts.
+export const checkPlayPauseRenders = async (container: HTMLElement, size = 100) => {
+    const searchStore = new StateStore({ ...initialSearchState, results: generateSyntheticCatalog(size) });
+    const uiStore = new StateStore(initialUiPrefs);
+    const playerStore = new StateStore(initialPlayerViewState);
+    const playbackQueue = new PlaybackQueue();
+    const playlistStore = new PlaylistStore(mockPlaylists, mockSearchResults);
+    const menuStore = new StateStore(initialActionMenuState);
+    const root = createRoot(container);
+    flushSync(() =>
+        root.render(
+            <>
+                <SearchResultsView
+                    searchStore={searchStore}
+                    uiStore={uiStore}
+                    onPlay={(video) => playbackQueue.playList([video])}
+                    onOpenActions={(videoId, anchor) => menuStore.set({ videoId, anchor })}
+                    onLoadMore={() => {}}
+                />
+                <ActionMenu
+                    menuStore={menuStore}
+                    playlistStore={playlistStore}
+                    getVideo={(videoId) => searchStore.getSnapshot().results.find((video) => video.id === videoId)}
+                    onPlayNext={(video) => playbackQueue.playNext(video)}
+                    onAddToPlaylist={(video, playlistId) => playlistStore.addVideos(playlistId, [video])}
+                />
+                <PlayerDock playerStore={playerStore} playbackQueue={playbackQueue} />
+            </>
+        )
+    );
+
+    try {
+        await renderProfiler.measure(() => {
+            playbackQueue.playList(searchStore.getSnapshot().results);
+            playerStore.set({ isPlaying: true });
+        });
+        const toggles = [];
+        for (const isPlaying of [false, true, false]) {
+            const commits = await renderProfiler.measure(() => playerStore.set({ isPlaying }));
+            if (commits.VideoCard || commits.SearchResults) {
+                throw new Error(`Toggling play/pause re-rendered the results: ${JSON.stringify(commits)}`);
+            }
+            toggles.push({ isPlaying, commits });
+        }
+        const [video] = searchStore.getSnapshot().results;
+        const commits = await renderProfiler.measure(() => playlistStore.addVideos(mockPlaylists[0].id, [video]));
+        if (commits.VideoCard || commits.SearchResults) {
+            throw new Error(`Editing a playlist re-rendered the results: ${JSON.stringify(commits)}`);
+        }
+        return toggles;
+    } finally {
+        root.unmount();
+        playerController.stop();
+    }
+};
+
+// Makes `operations` random edits across `replicas` stores synced over one in-memory log and their
+// own BroadcastChannel, delivering messages only every few edits so many of them are concurrent.
+// Throws unless every store, and a store freshly opened from the log, ends with the same playlists.
+// Returns the replicas' sync stats.
+export const checkPlaylistSyncConvergence = async ({ replicas = 3, operations = 500, seed = 1 } = {}) => {
+    const random = createSeededRandom(seed);
+    const pick = <T,>(items: T[]) => items[Math.floor(random() * items.length)];
+    const catalog = generateSyntheticCatalog(200, seed);
+    const storage = createMemorySyncStorage();
+    const channelName = `${PLAYLIST_SYNC_CHANNEL}-check-${seed}-${Date.now()}`;
+    const open = (replicaId: string) => {
+        const store = new PlaylistStore(mockPlaylists, catalog);
+        const sync = new PlaylistSync(store, {
+            storage,
+            replicaId,
+            compactAfter: 50,
+            createChannel: () => new BroadcastChannel(channelName) as PlaylistSyncChannel,
+        });
+        sync.open();
+        return { store, sync };
+    };
+    const tabs = Array.from({ length: replicas }, (_, i) => open(`r${i}`));
+    const delivered = () => new Promise((resolve) => setTimeout(resolve, 0));
+    const describe = (store: PlaylistStore) => JSON.stringify(store.getPlaylists());
+
+    try {
+        for (let i = 0; i < operations; i++) {
+            const { store } = pick(tabs);
+            const playlists = store.getPlaylists();
+            const playlist = playlists.length > 0 ? pick(playlists) : undefined;
+            const action = random();
+            if (!playlist || action < 0.05) store.createPlaylist(`Playlist ${i}`);
+            else if (action < 0.08) store.deletePlaylist(playlist.id);
+            else if (action < 0.12) store.renamePlaylist(playlist.id, `Renamed ${i}`);
+            else if (action < 0.5) store.addVideos(playlist.id, [pick(catalog), pick(catalog)]);
+            else if (action < 0.7 && playlist.videoIds.length > 0) store.removeVideos(playlist.id, [pick(playlist.videoIds)]);
+            else {
+                const length = playlist.videoIds.length;
+                store.moveVideo(playlist.id, Math.floor(random() * length), Math.floor(random() * length));
+            }
+            if (random() < 0.2) await delivered();
+        }
+        const converge = async (expected?: string) => {
+            await Promise.all(tabs.map(({ sync }) => sync.flushed()));
+            await delivered(); // ops are broadcast once persisted
+            expected ??= describe(tabs[0].store);
+            const fresh = open('fresh');
+            fresh.sync.close();
+            for (const { store } of [...tabs, fresh]) {
+                if (describe(store) !== expected) {
+                    throw new Error(`Playlists diverged:\n${expected}\n${describe(store)}`);
+                }
+            }
+        };
+        await converge();
+        const stats = tabs.map(({ sync }) => sync.stats);
+
+        // Resetting in one tab empties every tab and what a new tab loads
+        pick(tabs).sync.reset();
+        await converge('[]');
+        return stats;
+    } finally {
+        tabs.forEach(({ sync }) => sync.close());
+    }
+};
+
+const formatLrcTime = (seconds: number) =>
+    `${String(Math.floor(seconds / 60)).padStart(2, '0')}:${(seconds % 60).toFixed(2).padStart(5, '0')}`;
+
+// An LRC file of `lineCount` lines, one every two to five seconds.
+const generateSyntheticLrc = (lineCount: number, seed = 1) => {
+    const random = createSeededRandom(seed);
+    const lines = ['[ar:Synthetic]', '[ti:Benchmark]'];
+    let time = 0;
+    for (let i = 0; i < lineCount; i++) {
+        time += 2 + random() * 3;
+        const words = Array.from({ length: 3 + Math.floor(random() * 5) }, () =>
+            syntheticWords[Math.floor(random() * syntheticWords.length)]
+        );
+        lines.push(`[${formatLrcTime(time)}]${words.join(' ')}`);
+    }
+    return lines.join('\n');
+};
+
+// Parses long synthetic LRC files and times the per-frame line lookup, then mounts SyncedLyrics
+// into `container` with a clock that moves the highlight on every 60Hz frame (the worst case).
+// Must run in a real browser tab.
+export const benchmarkSyncedLyrics = async (
+    container: HTMLElement,
+    { lineCounts = [1_000, 10_000], frames = 240 } = {},
+) => {
+    const frameBudgetMs = 1000 / 60;
+    const results = [];
+    for (const lineCount of lineCounts) {
+        const text = generateSyntheticLrc(lineCount);
+        const parseStart = performance.now();
+        const lyrics = parseLyrics(text);
+        const parseMs = performance.now() - parseStart;
+
+        const random = createSeededRandom(lineCount);
+        const duration = lyrics.times[lineCount - 1];
+        const lookups = 100_000;
+        const lookupStart = performance.now();
+        for (let i = 0; i < lookups; i++) lineIndexAt(lyrics.times, random() * duration);
+        const lookupMs = (performance.now() - lookupStart) / lookups;
+
+        const { SyncedLyrics } = await syncedLyricsView.load();
+        let tick = 0;
+        const getCurrentTime = () => lyrics.times[Math.min(tick, lineCount - 1)];
+        const root = createRoot(container);
+        const mountStart = performance.now();
+        flushSync(() => root.render(<SyncedLyrics lyrics={lyrics} getCurrentTime={getCurrentTime} />));
+        const mountMs = performance.now() - mountStart;
+
+        const frameTimes = new Float64Array(frames);
+        let last = performance.now();
+        for (let frame = 0; frame < frames; frame++) {
+            tick = frame + 1;
+            await new Promise(requestAnimationFrame);
+            const now = performance.now();
+            frameTimes[frame] = now - last;
+            last = now;
+        }
+        frameTimes.sort();
+
+        root.unmount();
+        results.push({
+            lineCount,
+            parseMs,
+            lookupMs,
+            mountMs,
+            frameP50Ms: percentile(frameTimes, 0.5),
+            frameP95Ms: percentile(frameTimes, 0.95),
+            frameMaxMs: frameTimes[frames - 1],
+            droppedFrames: frameTimes.filter((ms) => ms > frameBudgetMs * 1.5).length,
+        });
+    }
+    return results;
+};
+
+// Runs `run` and reports how long the main thread was blocked meanwhile, from 'longtask' entries
+// (Chromium). Elsewhere the long-task fields are undefined.
+const measureLongTasks = async <T,>(run: () => Promise<T>) => {
+    const supported = typeof PerformanceObserver !== 'undefined' &&
+        PerformanceObserver.supportedEntryTypes?.includes('longtask');
+    const entries: PerformanceEntry[] = [];
+    const observer = supported ? new PerformanceObserver((list) => entries.push(...list.getEntries())) : null;
+    observer?.observe({ type: 'longtask' });
+    const start = performance.now();
+    const result = await run();
+    const elapsedMs = performance.now() - start;
+    await new Promise((resolve) => setTimeout(resolve, 0)); // let the last entries arrive
+    entries.push(...(observer?.takeRecords() ?? []));
+    observer?.disconnect();
+    return {
+        result,
+        elapsedMs,
+        longTasks: supported ? entries.length : undefined,
+        longTaskMs: supported ? entries.reduce((total, entry) => total + entry.duration, 0) : undefined,
+    };
+};
+
+// Heavy searches against a large catalog, on the main thread and then in the compute worker,
+// with the main-thread long-task time each one caused. Must run in a real browser tab.
+export const benchmarkSearchCompute = async (
+    sizes = [100_000, 1_000_000],
+    queries = ['a', 'lo', 'love', 'mi', 'ra', 'night fire', 'zzz'],
+) => {
+    const results = [];
+    for (const size of sizes) {
+        const catalog = generateSyntheticCatalog(size);
+        for (const useWorker of [false, true]) {
+            const compute = new SearchCompute([], useWorker);
+            const indexing = await measureLongTasks(() => compute.add(catalog));
+            const searching = await measureLongTasks(async () => {
+                for (const query of queries) await compute.search(query);
+            });
+            results.push({
+                size,
+                backend: compute.usingWorker ? 'worker' : 'main thread',
+                indexMs: indexing.elapsedMs,
+                indexLongTaskMs: indexing.longTaskMs,
+                queryMs: searching.elapsedMs / queries.length,
+                queryLongTasks: searching.longTasks,
+                queryLongTaskMs: searching.longTaskMs,
+            });
+            compute.terminate();
+        }
+    }
+    return results;
+};
+
+// Heap retained by `build()`'s result. Accurate only with an exposed gc() (Chromium started with
+// --js-flags=--expose-gc); without one, garbage made while building is counted too.
+const retainedHeapBytes = <T,>(build: () => T) => {
+    const gc = (globalThis as { gc?: () => void }).gc;
+    gc?.();
+    const before = usedHeapBytes();
+    const value = build();
+    gc?.();
+    const after = usedHeapBytes();
+    return { value, bytes: before === undefined || after === undefined ? undefined : after - before };
+};
+
+// Heap and duration-sort cost of a catalog held as VideoItem objects versus a TrackTable.
+export const benchmarkTrackTable = (sizes = [100_000, 500_000]) =>
+    sizes.map((size) => {
+        const objects = retainedHeapBytes(() => generateSyntheticCatalog(size));
+        let start = performance.now();
+        [...objects.value].sort((a, b) => durationSeconds(a.duration) - durationSeconds(b.duration));
+        const objectSortMs = performance.now() - start;
+        const objectHeapBytes = objects.bytes;
+        objects.value.length = 0;
+
+        const table = retainedHeapBytes(() => new TrackTable(generateSyntheticCatalog(size)));
+        const rows = Uint32Array.from({ length: size }, (_, row) => row);
+        start = performance.now();
+        rows.sort((a, b) => table.value.secondsAt(a) - table.value.secondsAt(b));
+        const tableSortMs = performance.now() - start;
+
+        return {
+            size,
+            artists: table.value.artistCount,
+            objectHeapBytes,
+            tableHeapBytes: table.bytes,
+            objectSortMs,
+            tableSortMs,
+        };
+    });
+
+// Benchmark Suite
+// Runs the benchmarks that need no real browser (the render case only needs a DOM, so jsdom on
+// Node will do) and gathers them into one JSON report. Metrics are keyed
+// "<benchmark>/<size>/<metric>". Comparing against a stored baseline flags timings (…Ms) and heap
+// sizes (…Bytes) that grew past a tolerance. Everything runs offline on synthetic data. In a tab,
+// the baseline is kept in localStorage; benchmark.ts runs the suite under Node and keeps the report
+// and baseline as JSON files.
+const BENCHMARK_BASELINE_KEY = 'tuneflow.benchmarkBaseline.v1';
+
+export interface BenchmarkReport {
+    createdAt: string;
+    environment: string;
+    heapHighWaterBytes?: number; // sampled between benchmarks
+    metrics: Record<string, number>;
+}
+
+interface BenchmarkSuiteOptions {
+    container?: HTMLElement; // enables the render benchmark
+    catalogSizes?: number[];
+    playlistSizes?: number[];
+    renderSizes?: number[];
+}
+
+interface BenchmarkChange {
+    key: string;
+    baseline: number;
+    current: number;
+    change: number; // relative, e.g. 0.25 for 25% slower
+}
+
+// `count` playlists of `length` tracks each, drawn from `catalog` without repeats within a playlist.
+export const generateSyntheticPlaylists = (catalog: VideoItem[], count: number, length: number, seed = 1): Playlist[] => {
+    const random = createSeededRandom(seed);
+    return Array.from({ length: count }, (_, i) => {
+        const videoIds = new Set<string>();
+        const target = Math.min(length, catalog.length);
+        while (videoIds.size < target) videoIds.add(catalog[Math.floor(random() * catalog.length)].id);
+        return { id: `p${i}`, name: `Playlist ${i}`, videoIds: [...videoIds] };
+    });
+};
+
+// Per-operation cost of editing playlists that already hold `size` tracks.
+export const benchmarkPlaylistMutations = (sizes = [1_000, 10_000], playlistCount = 5, operations = 1_000) =>
+    sizes.map((size) => {
+        const catalog = generateSyntheticCatalog(size * 2);
+        const store = new PlaylistStore(generateSyntheticPlaylists(catalog, playlistCount, size), catalog);
+        const extra = catalog.slice(size, size + operations);
+        const time = (run: (i: number) => void) => {
+            const start = performance.now();
+            for (let i = 0; i < operations; i++) run(i);
+            return (performance.now() - start) / operations;
+        };
+
+        return {
+            size,
+            addMs: time((i) => store.addVideos(`p${i % playlistCount}`, [extra[i % extra.length]])),
+            hasMs: time((i) => store.has(`p${i % playlistCount}`, catalog[i].id)),
+            moveMs: time((i) => store.moveVideo(`p${i % playlistCount}`, 0, size - 1)),
+            removeMs: time((i) => store.removeVideos(`p${i % playlistCount}`, [extra[i % extra.length].id])),
+        };
+    });
+
+// Share-link encode and streamed decode times for playlists of random, canonical YouTube ids, with
+// the link length, against JSON of the same playlist's VideoItems.
+export const benchmarkShareLinks = async (sizes = [1_000, 10_000], rounds = 5) => {
+    const results = [];
+    for (const size of sizes) {
+        const random = createSeededRandom(size);
+        const packed = Uint8Array.from({ length: size * PACKED_ID_BYTES }, () => Math.floor(random() * 256));
+        const videos = generateSyntheticCatalog(size).map((video, i) => ({ ...video, id: unpackVideoId(packed, i * PACKED_ID_BYTES) }));
+        const videoIds = videos.map((video) => video.id);
+
+        let bytes = new Uint8Array(0);
+        let start = performance.now();
+        for (let round = 0; round < rounds; round++) bytes = await encodeSharedPlaylist('Benchmark', videoIds);
+        const encodeMs = (performance.now() - start) / rounds;
+
+        start = performance.now();
+        let decoded = 0;
+        for (let round = 0; round < rounds; round++) {
+            for await (const batch of decodeSharedPlaylist(new Blob([bytes]).stream())) decoded += batch.videoIds.length;
+        }
+        const decodeMs = (performance.now() - start) / rounds;
+        if (decoded !== size * rounds) throw new Error(`Decoded ${decoded / rounds} of ${size} tracks`);
+
+        const json = JSON.stringify({ name: 'Benchmark', videos });
+        start = performance.now();
+        for (let round = 0; round < rounds; round++) JSON.parse(json);
+        const jsonParseMs = (performance.now() - start) / rounds;
+
+        results.push({
+            size,
+            encodeMs,
+            decodeMs,
+            bytes: bytes.length,
+            compressed: bytes[1] & SHARE_FLAG_DEFLATE,
+            linkChars: toBase64Url(bytes).length,
+            jsonChars: json.length,
+            jsonParseMs,
+        });
+    }
+    return results;
+};
+
+// Commit cost of the results view: first mount, appending a page and switching to list view.
+// Wall time covers render, commit and layout effects; render time is React Profiler's figure.
+// Thumbnails are turned off: without an IntersectionObserver (e.g. jsdom) every one would count as
+// visible and start a real download.
+export const benchmarkResultsCommit = (container: HTMLElement, sizes = [1_000, 10_000], pageSize = 50) =>
+    sizes.map((size) => {
+        const catalog = generateSyntheticCatalog(size + pageSize);
+        const searchStore = new StateStore({ ...initialSearchState, results: catalog.slice(0, size) });
+        const uiStore = new StateStore(initialUiPrefs);
+        let renderMs = 0;
+        const onRender: React.ProfilerOnRenderCallback = (_, __, actualDuration) => {
+            renderMs += actualDuration;
+        };
+        const measure = (update: () => void) => {
+            renderMs = 0;
+            const start = performance.now();
+            flushSync(update);
+            return [performance.now() - start, renderMs];
+        };
+
+        const root = createRoot(container);
+        try {
+            const [mountMs, mountRenderMs] = measure(() =>
+                root.render(
+                    <ThumbnailCacheContext.Provider value={null}>
+                        <Profiler id="results" onRender={onRender}>
+                            <SearchResultsView
+                                searchStore={searchStore}
+                                uiStore={uiStore}
+                                onPlay={() => {}}
+                                onOpenActions={() => {}}
+                                onLoadMore={() => {}}
+                            />
+                        </Profiler>
+                    </ThumbnailCacheContext.Provider>
+                )
+            );
+            const [appendMs, appendRenderMs] = measure(() => searchStore.set({ results: catalog }));
+            const [listViewMs, listViewRenderMs] = measure(() => uiStore.set({ isListView: true }));
+            return { size, mountMs, mountRenderMs, appendMs, appendRenderMs, listViewMs, listViewRenderMs };
+        } finally {
+            root.unmount();
+        }
+    });
+
+const describeEnvironment = () =>
+    typeof navigator !== 'undefined' && navigator.userAgent
+        ? navigator.userAgent
+        : `node ${(globalThis as { process?: { version?: string } }).process?.version ?? 'unknown'}`;
+
+export const runBenchmarkSuite = async ({
+    container,
+    catalogSizes = [10_000, 100_000],
+    playlistSizes = [1_000, 10_000],
+    renderSizes = [1_000, 10_000],
+}: BenchmarkSuiteOptions = {}): Promise<BenchmarkReport> => {
+    type BenchmarkRows = Record<string, number | undefined>[];
+    const runs: [string, () => BenchmarkRows | Promise<BenchmarkRows>][] = [
+        ['searchIndex', () => benchmarkSearchIndex(catalogSizes)],
+        ['fuzzySearch', () => benchmarkFuzzySearch(catalogSizes)],
+        ['suggestions', () => benchmarkSuggestions(catalogSizes)],
+        ['playlistStore', () => benchmarkPlaylistStore(playlistSizes)],
+        ['playlistMutations', () => benchmarkPlaylistMutations(playlistSizes)],
+        ['shareLinks', () => benchmarkShareLinks(playlistSizes)],
+        ['trackTable', () => benchmarkTrackTable(catalogSizes)],
+    ];
+    if (container) runs.push(['resultsCommit', () => benchmarkResultsCommit(container, renderSizes)]);
+
+    const metrics: Record<string, number> = {};
+    let heapHighWaterBytes = usedHeapBytes();
+    for (const [name, run] of runs) {
+        for (const { size, ...values } of await run()) {
+            for (const [metric, value] of Object.entries(values)) {
+                if (value !== undefined && Number.isFinite(value)) metrics[`${name}/${size}/${metric}`] = value;
+            }
+        }
+        const heap = usedHeapBytes();
+        if (heap !== undefined) heapHighWaterBytes = Math.max(heapHighWaterBytes ?? 0, heap);
+        await new Promise((resolve) => setTimeout(resolve, 0)); // let the page breathe between runs
+    }
+    return { createdAt: new Date().toISOString(), environment: describeEnvironment(), heapHighWaterBytes, metrics };
+};
+
+// Timings and heap sizes that moved by more than `tolerance` relative to `baseline`. Changes
+// smaller than `minMs` (for timings) are ignored as noise.
+export const compareBenchmarks = (current: BenchmarkReport, baseline: BenchmarkReport, tolerance = 0.1, minMs = 0.01) => {
+    const regressions: BenchmarkChange[] = [];
+    const improvements: BenchmarkChange[] = [];
+    for (const [key, value] of Object.entries(current.metrics)) {
+        const base = baseline.metrics[key];
+        if (base === undefined || !/(Ms|Bytes)$/.test(key) || base <= 0) continue;
+        if (key.endsWith('Ms') && Math.abs(value - base) < minMs) continue;
+        const change = value / base - 1;
+        if (change > tolerance) regressions.push({ key, baseline: base, current: value, change });
+        else if (change < -tolerance) improvements.push({ key, baseline: base, current: value, change });
+    }
+    return { regressions, improvements };
+};
+
+export const saveBenchmarkBaseline = (report: BenchmarkReport) => {
+    localStorage.setItem(BENCHMARK_BASELINE_KEY, JSON.stringify(report));
+};
+
+export const loadBenchmarkBaseline = (): BenchmarkReport | null => {
+    try {
+        return JSON.parse(localStorage.getItem(BENCHMARK_BASELINE_KEY) ?? 'null');
+    } catch {
+        return null;
+    }
+};
+
+// Helper Components
+// motion.div once the motion runtime has loaded; until then a plain div, shown in its final state.
+// Switching over remounts the subtree, which only happens once per session. An element that was
+// already on screen switches with initial={false}, so it stays put rather than entering again.
+export const MotionDiv: React.FC<Pick<HTMLMotionProps<'div'>, 'initial' | 'animate' | 'exit' | 'transition'> & {
+    className?: string;
+    children?: React.ReactNode;
+}> = ({ initial, animate, exit, transition, className, children }) => {
+    const runtime = useLazyModule(motionRuntime, false);
+    const mountedPlain = useRef(runtime === null);
+    if (!runtime) return <div className={className}>{children}</div>;
+    return (
+        <runtime.motion.div initial={mountedPlain.current ? false : initial} animate={animate} exit={exit} transition={transition} className={className}>
+            {children}
+        </runtime.motion.div>
+    );
+};
+
+// AnimatePresence once the motion runtime has loaded; children render as they are until then.
+// Switching over remounts the children, so those already shown skip their entrance, as in MotionDiv.
+export const Presence: React.FC<{ children?: React.ReactNode }> = ({ children }) => {
+    const runtime = useLazyModule(motionRuntime, false);
+    const mountedPlain = useRef(runtime === null);
+    return runtime ? (
+        <runtime.AnimatePresence initial={!mountedPlain.current}>{children}</runtime.AnimatePresence>
+    ) : (
+        <>{children}</>
+    );
+};
+
+// Shows a blurred low-resolution placeholder until the sized thumbnail is decoded. If the image
+// can't be fetched directly (e.g. no CORS headers), it falls back to a plain <img> load.
+const Thumbnail: React.FC<{
+    videoId: string;
+    alt: string;
+    className?: string;
+}> = ({ videoId, alt, className }) => {
+    const thumbnails = useContext(ThumbnailCacheContext);
+    const containerRef = useRef<HTMLDivElement>(null);
+    const [size, setSize] = useState<ThumbnailSize | null>(null);
+    const [src, setSrc] = useState<string | null>(null);
+
+    useEffect(() => {
+        const element = containerRef.current;
+        if (!element || !thumbnails) return;
+        return observeVisibility(element, () => setSize(pickThumbnailSize(element.clientWidth)));
+    }, [thumbnails]);
+
+    useEffect(() => {
+        if (!size || !thumbnails) return;
+        const url = thumbnailUrl(videoId, size);
+        const cached = thumbnails.peek(url);
+        setSrc(cached ?? null);
+        if (cached) return;
+
+        let active = true;
+        thumbnails.load(url).then(
+            (objectUrl) => active && setSrc(objectUrl),
+            () => active && setSrc(url),
+        );
+        return () => {
+            active = false;
+        };
+    }, [videoId, size, thumbnails]);
+
+    return (
+        <div ref={containerRef} className={cn('relative overflow-hidden bg-gray-300 dark:bg-gray-700', className)}>
+            {size && !src && size !== 'default' && (
+                <img
+                    src={thumbnailUrl(videoId, 'default')}
+                    alt=""
+                    aria-hidden="true"
+                    className="absolute inset-0 h-full w-full object-cover blur-md scale-110"
+                />
+            )}
+            {src && <img src={src} alt={alt} className="absolute inset-0 h-full w-full object-cover" />}
+        </div>
+    );
+};
+
+// Memoized so that a card re-renders only when its video or the view mode change. Its actions open
+// the shared ActionMenu, so playlist edits never reach the cards.
+const VideoCard = React.memo<{
+    video: VideoItem;
+    onPlay: (video: VideoItem) => void;
+    onOpenActions?: (videoId: string, anchor: HTMLElement) => void;
+    isListView?: boolean;
+}>(({ video, onPlay, onOpenActions, isListView }) => {
+    useRenderCount('VideoCard');
+
+    return (
+        <Card
+            className={cn(
+                'group relative overflow-hidden transition-all duration-300',
+                isListView
+                    ? 'flex flex-row items-center gap-4 p-4'
+                    : 'hover:scale-[1.02] hover:shadow-lg',
+            )}
+            onClick={() => onPlay(video)}
+        >
+            {isListView ? (
+                <>
+                    <Thumbnail
+                        videoId={video.id}
+                        alt={video.title}
+                        className="w-24 h-24 shrink-0 rounded-md"
+                    />
+                    <div className="flex-1">
+                        <CardTitle className="text-sm font-semibold">{video.title}</CardTitle>
+                        <CardDescription className="text-xs text-gray-400">
+                            {video.artist} - {video.duration}
+                        </CardDescription>
+                    </div>
+                </>
+            ) : (
+                <>
+                    <Thumbnail
+                        videoId={video.id}
+                        alt={video.title}
+                        className="w-full h-48 rounded-t-lg"
+                    />
+                    <CardHeader>
+                        <CardTitle className="text-sm font-semibold">{video.title}</CardTitle>
+                        <CardDescription className="text-xs text-gray-400">
+                            {video.artist} - {video.duration}
+                        </CardDescription>
+                    </CardHeader>
+                </>
+            )}
+
+            {onOpenActions && (
+                <div className="absolute top-2 right-2 opacity-0 group-hover:opacity-100 focus-within:opacity-100 transition-opacity">
+                    <Button
+                        variant="ghost"
+                        size="icon"
+                        className="text-white hover:bg-white/20"
+                        aria-label="Track actions"
+                        aria-haspopup="menu"
+                        onPointerEnter={dropdownMenuUi.prefetch}
+                        onClick={(e) => {
+                            e.stopPropagation();
+                            onOpenActions(video.id, e.currentTarget);
+                        }}
+                    >
+                        <ListMusic className="h-4 w-4" />
+                    </Button>
+                </div>
+            )}
+        </Card>
+    );
+});
+
+// Subscribes to the playlists only while the menu is open.
+const ActionMenuItems: React.FC<{
+    video: VideoItem;
+    playlistStore: PlaylistStore;
+    onPlayNext: (video: VideoItem) => void;
+    onAddToPlaylist: (video: VideoItem, playlistId: string) => void;
+}> = ({ video, playlistStore, onPlayNext, onAddToPlaylist }) => {
+    const playlists = usePlaylists(playlistStore);
+    const dropdown = useLazyModule(dropdownMenuUi);
+    if (!dropdown) return null;
+
+    return (
+        <>
+            <dropdown.DropdownMenuItem onSelect={() => onPlayNext(video)}>Play Next</dropdown.DropdownMenuItem>
+            <dropdown.DropdownMenuSeparator />
+            <dropdown.DropdownMenuLabel>Add to Playlist</dropdown.DropdownMenuLabel>
+            <dropdown.DropdownMenuSeparator />
+            {playlists.length > 0 ? (
+                playlists.map((playlist) => (
+                    <dropdown.DropdownMenuItem key={playlist.id} onSelect={() => onAddToPlaylist(video, playlist.id)}>
+                        {playlist.name}
+                    </dropdown.DropdownMenuItem>
+                ))
+            ) : (
+                <dropdown.DropdownMenuItem disabled>No playlists</dropdown.DropdownMenuItem>
+            )}
+            <dropdown.DropdownMenuSeparator />
+            <dropdown.DropdownMenuItem
+                onSelect={() => {
+                    // Handle create new playlist
+                }}
+            >
+                + New Playlist
+            </dropdown.DropdownMenuItem>
+        </>
+    );
+};
+
+// The shared action menu, portalled to <body> and anchored to the card button that opened it
+// through an invisible trigger laid over that button. Its items, one per playlist, exist only
+// while it is open. The menu module is modal, so the page can't scroll out from under the anchor;
+// on close, focus returns to the card's button.
+const ActionMenu: React.FC<{
+    menuStore: StateStore<ActionMenuState>;
+    playlistStore: PlaylistStore;
+    getVideo: (videoId: string) => VideoItem | undefined;
+    onPlayNext: (video: VideoItem) => void;
+    onAddToPlaylist: (video: VideoItem, playlistId: string) => void;
+}> = ({ menuStore, playlistStore, getVideo, onPlayNext, onAddToPlaylist }) => {
+    const videoId = useStoreSelector(menuStore, (state) => state.videoId);
+    const anchor = useStoreSelector(menuStore, (state) => state.anchor);
+    const dropdown = useLazyModule(dropdownMenuUi, videoId !== null);
+    if (!dropdown || videoId === null || !anchor) return null;
+
+    const video = getVideo(videoId);
+    const close = () => menuStore.set(initialActionMenuState);
+    const rect = anchor.getBoundingClientRect();
+
+    return createPortal(
+        <dropdown.DropdownMenu open onOpenChange={(open) => !open && close()}>
+            <dropdown.DropdownMenuTrigger asChild>
+                <span
+                    aria-hidden
+                    className="pointer-events-none fixed"
+                    style={{ left: rect.left, top: rect.top, width: rect.width, height: rect.height }}
+                />
+            </dropdown.DropdownMenuTrigger>
+            <dropdown.DropdownMenuContent
+                align="end"
+                className="min-w-[200px]"
+                onCloseAutoFocus={(e) => {
+                    e.preventDefault();
+                    if (anchor.isConnected) anchor.focus();
+                }}
+            >
+                {video && (
+                    <ActionMenuItems
+                        video={video}
+                        playlistStore={playlistStore}
+                        onPlayNext={onPlayNext}
+                        onAddToPlaylist={onAddToPlaylist}
+                    />
+                )}
+            </dropdown.DropdownMenuContent>
+        </dropdown.DropdownMenu>,
+        document.body,
+    );
+};
+
+// Only the rows in (or near) the viewport are mounted. Rows start at an estimated height and are
+// re-positioned once a ResizeObserver reports their real size.
+const GRID_GAP_PX = 24; // gap-6
+const OVERSCAN_ROWS = 3;
+const ESTIMATED_ROW_HEIGHT_PX = { grid: 320, list: 130 };
+
+// Mirrors the md/lg breakpoints of the grid classes below.
+const columnsFor = (viewportWidth: number, isListView: boolean) =>
+    isListView ? 1 : viewportWidth >= 1024 ? 3 : viewportWidth >= 768 ? 2 : 1;
+
+const VirtualizedResults: React.FC<{
+    items: VideoItem[];
+    isListView: boolean;
+    renderItem: (video: VideoItem) => React.ReactNode;
+    onEndReached?: () => void;
+}> = ({ items, isListView, renderItem, onEndReached }) => {
+    const containerRef = useRef<HTMLDivElement>(null);
+    const resizeObserver = useRef<ResizeObserver | null>(null);
+    const anchorIndex = useRef(0); // first visible item of the last committed layout
+    const [layoutVersion, setLayoutVersion] = useState(0);
+    const [viewport, setViewport] = useState({ top: 0, height: window.innerHeight, width: window.innerWidth });
+
+    const columns = columnsFor(viewport.width, isListView);
+    const rowCount = Math.ceil(items.length / columns);
+    const estimatedHeight = isListView ? ESTIMATED_ROW_HEIGHT_PX.list : ESTIMATED_ROW_HEIGHT_PX.grid;
+
+    // Measurements belong to a particular row composition and result set. Appending a page keeps
+    // the first result, so the rows measured so far keep their heights; a new search starts over.
+    const layoutKey = `${isListView ? 'list' : 'grid'}:${columns}`;
+    const resultSet = items[0];
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+    const rowHeights = useMemo(() => new Map<number, number>(), [layoutKey, resultSet]);
+    const measuredHeights = useRef(rowHeights); // the map the observer writes to
+
+    const offsets = useMemo(() => {
+        const rowOffsets = new Float64Array(rowCount + 1);
+        for (let row = 0; row < rowCount; row++) {
+            rowOffsets[row + 1] = rowOffsets[row] + (rowHeights.get(row) ?? estimatedHeight) + GRID_GAP_PX;
+        }
+        return rowOffsets;
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [rowCount, rowHeights, layoutVersion]);
+
+    const rowAt = (offset: number) => {
+        let low = 0;
+        let high = rowCount;
+        while (low < high) {
+            const mid = (low + high) >>> 1;
+            if (offsets[mid + 1] <= offset) low = mid + 1;
+            else high = mid;
+        }
+        return low;
+    };
+
+    const firstVisibleRow = rowAt(Math.max(0, viewport.top));
+    const firstRow = Math.max(0, firstVisibleRow - OVERSCAN_ROWS);
+    const lastRow = Math.min(rowCount, rowAt(viewport.top + viewport.height) + 1 + OVERSCAN_ROWS);
+
+    useEffect(() => {
+        let frame = 0;
+        const update = () => {
+            frame = 0;
+            const container = containerRef.current;
+            if (!container) return;
+            setViewport({
+                top: -container.getBoundingClientRect().top,
+                height: window.innerHeight,
+                width: window.innerWidth,
+            });
+        };
+        const schedule = () => {
+            if (!frame) frame = requestAnimationFrame(update);
+        };
+        update();
+        window.addEventListener('scroll', schedule, { passive: true });
+        window.addEventListener('resize', schedule);
+        return () => {
+            cancelAnimationFrame(frame);
+            window.removeEventListener('scroll', schedule);
+            window.removeEventListener('resize', schedule);
+        };
+    }, []);
+
+    // Created on first use: row refs are attached before any effect runs.
+    const observedRows = useRef(new Set<HTMLDivElement>());
+    const measureRow = useCallback((element: HTMLDivElement | null) => {
+        if (!element || observedRows.current.has(element) || typeof ResizeObserver === 'undefined') return;
+        resizeObserver.current ??= new ResizeObserver((entries) => {
+            let changed = false;
+            for (const entry of entries) {
+                const row = Number((entry.target as HTMLElement).dataset.row);
+                const height = entry.borderBoxSize?.[0]?.blockSize ?? entry.contentRect.height;
+                if (measuredHeights.current.get(row) !== height) {
+                    measuredHeights.current.set(row, height);
+                    changed = true;
+                }
+            }
+            if (changed) setLayoutVersion((version) => version + 1);
+        });
+        observedRows.current.add(element);
+        resizeObserver.current.observe(element);
+    }, []);
 
-            {playlists && (
-                <div className="absolute top-2 right-2 opacity-0 group-hover:opacity-100 transition-opacity">
-                    <DropdownMenu open={isMenuOpen} onOpenChange={setIsMenuOpen}>
-                        <DropdownMenuTrigger asChild>
-                            <Button
-                                variant="ghost"
-                                size="icon"
-                                className="text-white hover:bg-white/20"
-                            >
-                                <ListMusic className="h-4 w-4" />
-                            </Button>
-                        </DropdownMenuTrigger>
-                        <DropdownMenuContent align="end" className="min-w-[200px]">
-                            <DropdownMenuLabel>Add to Playlist</DropdownMenuLabel>
-                            <DropdownMenuSeparator />
-                            {playlists.length > 0 ? (
-                                playlists.map((playlist) => (
-                                    <DropdownMenuItem
-                                        key={playlist.id}
-                                        onClick={(e) => {
-                                            e.stopPropagation();
-                                            onAddToPlaylist?.(video, playlist.id);
-                                            setIsMenuOpen(false);
-                                        }}
-                                    >
-                                        {playlist.name}
-                                    </DropdownMenuItem>
-                                ))
-                            ) : (
-                                <DropdownMenuItem disabled>No playlists</DropdownMenuItem>
-                            )}
-                            <DropdownMenuSeparator />
-                            <DropdownMenuItem
-                                onClick={(e) => {
-                                    e.stopPropagation();
-                                    // Handle create new playlist
-                                    setIsMenuOpen(false);
-                                }}
-                            >
-                                + New Playlist
-                            </DropdownMenuItem>
-                        </DropdownMenuContent>
-                    </DropdownMenu>
-                </div>
-            )}
-        </Card>
+    useEffect(() => () => resizeObserver.current?.disconnect(), []);
+
+    // Point the observer at a fresh map and have it report the mounted rows again: it only
+    // reports sizes that change, and these rows may keep theirs.
+    useLayoutEffect(() => {
+        if (measuredHeights.current === rowHeights) return;
+        measuredHeights.current = rowHeights;
+        for (const element of observedRows.current) {
+            resizeObserver.current?.unobserve(element);
+            resizeObserver.current?.observe(element);
+        }
+    }, [rowHeights]);
+
+    // Stop observing rows that scrolled out and were unmounted.
+    useEffect(() => {
+        for (const element of observedRows.current) {
+            if (!element.isConnected) {
+                resizeObserver.current?.unobserve(element);
+                observedRows.current.delete(element);
+            }
+        }
+    });
+
+    // Ask for more once the overscan reaches the last row; fires again after each append while
+    // the viewport still isn't full.
+    useEffect(() => {
+        if (rowCount > 0 && lastRow >= rowCount) onEndReached?.();
+    }, [lastRow, rowCount, onEndReached]);
+
+    // Keep the first visible item in view when switching between grid and list. The layout effect
+    // below runs before this one, so it still sees the anchor from the previous layout.
+    useEffect(() => {
+        anchorIndex.current = firstVisibleRow * columns;
+    });
+
+    const previousListView = useRef(isListView);
+    useLayoutEffect(() => {
+        if (previousListView.current === isListView) return;
+        previousListView.current = isListView;
+        const container = containerRef.current;
+        if (!container) return;
+        const containerTop = container.getBoundingClientRect().top + window.scrollY;
+        const row = Math.floor(anchorIndex.current / columns);
+        window.scrollTo(0, containerTop + offsets[row]);
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [isListView]);
+
+    const rows: React.ReactNode[] = [];
+    for (let row = firstRow; row < lastRow; row++) {
+        rows.push(
+            <div
+                key={row}
+                ref={measureRow}
+                data-row={row}
+                className={cn(
+                    'absolute left-0 right-0 grid gap-6',
+                    isListView ? 'grid-cols-1' : 'grid-cols-1 md:grid-cols-2 lg:grid-cols-3',
+                )}
+                style={{ top: offsets[row] }}
+            >
+                {items.slice(row * columns, (row + 1) * columns).map((video) => (
+                    <React.Fragment key={video.id}>{renderItem(video)}</React.Fragment>
+                ))}
+            </div>
+        );
+    }
+
+    return (
+        <div ref={containerRef} className="relative" style={{ height: Math.max(0, offsets[rowCount] - GRID_GAP_PX) }}>
+            {rows}
+        </div>
+    );
+};
+
+// Marks where the shared player should be shown while this is mounted.
+export const PlayerSlot: React.FC<{ className?: string; children?: React.ReactNode }> = ({ className, children }) => {
+    const slotRef = useRef<HTMLDivElement>(null);
+
+    useLayoutEffect(() => {
+        const slot = slotRef.current!;
+        playerController.attach(slot);
+        return () => playerController.detach(slot);
+    }, []);
+
+    return (
+        <div ref={slotRef} className={className}>
+            {children}
+        </div>
     );
 };
 
-const MiniPlayer: React.FC<{
+// Memoized so that only playback changes re-render it, not lyrics or search activity.
+const MiniPlayer = React.memo<{
     currentVideo: VideoItem | null;
     onPause: () => void;
     onPlay: () => void;
     isPlaying: boolean;
+    hasNext: boolean;
+    onNext: () => void;
+    onExpand: () => void;
     onClose: () => void;
-}> = ({ currentVideo, onPause, onPlay, isPlaying, onClose }) => {
+}>(({ currentVideo, onPause, onPlay, isPlaying, hasNext, onNext, onExpand, onClose }) => {
+    useRenderCount('MiniPlayer');
     if (!currentVideo) return null;
 
     return (
-        <motion.div
+        <MotionDiv
             initial={{ y: '100%', opacity: 0 }}
             animate={{ y: 0, opacity: 1 }}
             exit={{ y: '100%', opacity: 0 }}
@@ -255,15 +5078,13 @@ const MiniPlayer: React.FC<{
             className="fixed bottom-0 left-0 right-0 bg-gray-900/90 backdrop-blur-md border-t border-gray-800 p-4 flex items-center justify-between z-50"
         >
             <div className="flex items-center gap-4">
-                <img
-                    src={currentVideo.thumbnail}
-                    alt={currentVideo.title}
-                    className="w-16 h-16 rounded-md object-cover"
-                />
-                <div>
+                <PlayerSlot className="w-28 aspect-video shrink-0 rounded-md overflow-hidden">
+                    <Thumbnail videoId={currentVideo.id} alt={currentVideo.title} className="w-full h-full" />
+                </PlayerSlot>
+                <button type="button" className="text-left" onClick={onExpand}>
                     <h3 className="text-sm font-semibold text-white">{currentVideo.title}</h3>
                     <p className="text-xs text-gray-400">{currentVideo.artist}</p>
-                </div>
+                </button>
             </div>
             <div className="flex items-center gap-4">
                 <Button
@@ -278,35 +5099,11 @@ const MiniPlayer: React.FC<{
                     variant="ghost"
                     size="icon"
                     className="text-white hover:bg-white/20"
-                    onClick={onClose}
+                    onClick={onNext}
+                    disabled={!hasNext}
                 >
-                    <X className="h-6 w-6" />
+                    <SkipForward className="h-6 w-6" />
                 </Button>
-            </div>
-        </motion.div>
-    );
-};
-
-const FullScreenPlayer: React.FC<{
-    currentVideo: VideoItem | null;
-    onPause: () => void;
-    onPlay: () => void;
-    isPlaying: boolean;
-    onClose: () => void;
-    lyrics: string | null;
-}> = ({ currentVideo, onPause, onPlay, isPlaying, onClose, lyrics }) => {
-    const [showLyrics, setShowLyrics] = useState(false);
-    if (!currentVideo) return null;
-
-    return (
-        <motion.div
-            initial={{ opacity: 0 }}
-            animate={{ opacity: 1 }}
-            exit={{ opacity: 0 }}
-            transition={{ duration: 0.2 }}
-            className="fixed inset-0 bg-black z-50 flex flex-col"
-        >
-            <div className="absolute top-4 left-4">
                 <Button
                     variant="ghost"
                     size="icon"
@@ -316,406 +5113,390 @@ const FullScreenPlayer: React.FC<{
                     <X className="h-6 w-6" />
                 </Button>
             </div>
+        </MotionDiv>
+    );
+});
 
-            <div className="flex-grow flex items-center justify-center">
-                {/* eslint-disable-next-line jsx-a11y/media-has-caption */}
-                <iframe
-                    className="w-full aspect-video"
-                    src={`https://www.youtube.com/embed/${currentVideo.id}?autoplay=1`}
-                    title={currentVideo.title}
-                    allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture; web-share"
-                    allowFullScreen
-                />
-            </div>
+// The search field with its suggestion list. Suggestions are computed on every keystroke from the
+// local index; picking one, or pressing Enter, submits the query right away.
+const SearchInput: React.FC<{
+    value: string;
+    suggest: (prefix: string) => string[];
+    onChange: (query: string) => void;
+    onSubmit: (query: string) => void;
+}> = ({ value, suggest, onChange, onSubmit }) => {
+    const [isOpen, setIsOpen] = useState(false);
+    const [activeIndex, setActiveIndex] = useState(-1);
+    const suggestions = useMemo(
+        () => (isOpen ? suggest(value).filter((suggestion) => suggestion !== value) : []),
+        [isOpen, suggest, value]
+    );
 
-            <div className="absolute bottom-20 left-0 right-0 p-4 flex items-center justify-center gap-4">
-                <Button
-                    variant="ghost"
-                    size="icon"
-                    className="text-white hover:bg-white/20"
-                    onClick={isPlaying ? onPause : onPlay}
-                >
-                    {isPlaying ? <Pause className="h-8 w-8" /> : <Play className="h-8 w-8" />}
-                </Button>
-                <Button
-                    variant="ghost"
-                    size="icon"
-                    className="text-white hover:bg-white/20"
-                    onClick={() => setShowLyrics(!showLyrics)}
-                >
-                    <Music className="h-6 w-6" />
-                </Button>
-            </div>
+    const submit = (query: string) => {
+        setIsOpen(false);
+        setActiveIndex(-1);
+        onSubmit(query);
+    };
 
-            <AnimatePresence>
-                {showLyrics && lyrics && (
-                    <motion.div
-                        initial={{ y: '100%' }}
-                        animate={{ y: '0%' }}
-                        exit={{ y: '100%' }}
-                        transition={{ type: 'spring', stiffness: 200, damping: 25 }}
-                        className="absolute bottom-0 left-0 right-0 bg-black/80 backdrop-blur-md p-4 max-h-48 overflow-y-auto"
-                    >
-                        <h4 className="text-lg font-semibold text-white mb-2">Lyrics</h4>
-                        <p className="text-gray-200 whitespace-pre-line">{lyrics}</p>
-                    </motion.div>
-                )}
-            </AnimatePresence>
-        </motion.div>
-    );
-};
+    const handleKeyDown = (e: React.KeyboardEvent<HTMLInputElement>) => {
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            setIsOpen(true);
+            if (suggestions.length > 0) {
+                // -1 (the typed text) and the suggestions form one cycle
+                const step = e.key === 'ArrowDown' ? 1 : -1;
+                const positions = suggestions.length + 1;
+                setActiveIndex(((activeIndex + 1 + step + positions) % positions) - 1);
+            }
+        } else if (e.key === 'Enter') {
+            submit(activeIndex >= 0 ? suggestions[activeIndex] : value);
+        } else if (e.key === 'Escape') {
+            setIsOpen(false);
+            setActiveIndex(-1);
+        }
+    };
 
-const PlaylistSheet: React.FC<{
-    playlists: Playlist[];
-    onSelectPlaylist: (playlistId: string) => void;
-    onClose: () => void;
-}> = ({ playlists, onSelectPlaylist, onClose }) => {
     return (
-        <SheetContent side="bottom" className="bg-gray-900 text-white border-gray-800">
-            <SheetHeader>
-                <SheetTitle>Playlists</SheetTitle>
-                <SheetDescription>
-                    Add to an existing playlist or create a new one.
-                </SheetDescription>
-            </SheetHeader>
-            <div className="space-y-4">
-                {playlists.length > 0 ? (
-                    playlists.map((playlist) => (
-                        <Button
-                            key={playlist.id}
-                            variant="ghost"
-                            className="w-full justify-start text-white hover:bg-white/10"
-                            onClick={() => {
-                                onSelectPlaylist(playlist.id);
-                                onClose();
+        <div className="relative w-full md:w-96">
+            <Input
+                type="text"
+                placeholder="Search for songs, artists..."
+                value={value}
+                onChange={(e) => {
+                    setIsOpen(true);
+                    setActiveIndex(-1);
+                    onChange(e.target.value);
+                }}
+                onFocus={() => setIsOpen(true)}
+                onBlur={() => setIsOpen(false)}
+                onKeyDown={handleKeyDown}
+                role="combobox"
+                aria-expanded={suggestions.length > 0}
+                aria-autocomplete="list"
+                className="w-full bg-white dark:bg-gray-800 text-gray-900 dark:text-white border-gray-300 dark:border-gray-700"
+            />
+            {suggestions.length > 0 && (
+                <ul
+                    role="listbox"
+                    className="absolute left-0 right-0 top-full mt-1 z-40 rounded-md border border-gray-300 dark:border-gray-700 bg-white dark:bg-gray-800 shadow-lg overflow-hidden"
+                >
+                    {suggestions.map((suggestion, index) => (
+                        <li
+                            key={suggestion}
+                            role="option"
+                            aria-selected={index === activeIndex}
+                            // mousedown, so the input keeps focus until the click lands
+                            onMouseDown={(e) => {
+                                e.preventDefault();
+                                submit(suggestion);
                             }}
+                            onMouseEnter={() => setActiveIndex(index)}
+                            className={cn(
+                                "flex items-center gap-2 px-3 py-2 text-sm cursor-pointer text-gray-900 dark:text-white",
+                                index === activeIndex && "bg-gray-100 dark:bg-gray-700"
+                            )}
                         >
-                            {playlist.name} ({playlist.videos.length} tracks)
-                        </Button>
-                    ))
+                            <Search className="h-4 w-4 text-gray-400 shrink-0" />
+                            <span className="truncate">{suggestion}</span>
+                        </li>
+                    ))}
+                </ul>
+            )}
+        </div>
+    );
+};
+
+// Search field, search button, view toggle and settings. Subscribes to the search term, loading
+// flag and UI preferences only.
+const SearchBar: React.FC<{
+    searchStore: StateStore<SearchState>;
+    uiStore: StateStore<UiPrefs>;
+    suggest: (prefix: string) => string[];
+    onSearch: (query: string) => void;
+    onSubmit: (query: string) => void;
+    onResetData: () => void;
+}> = ({ searchStore, uiStore, suggest, onSearch, onSubmit, onResetData }) => {
+    useRenderCount('SearchBar');
+    const searchTerm = useStoreSelector(searchStore, (state) => state.term);
+    const loading = useStoreSelector(searchStore, (state) => state.loading);
+    const isDarkMode = useStoreSelector(uiStore, (state) => state.isDarkMode);
+    const showSettingsSheet = useStoreSelector(uiStore, (state) => state.showSettingsSheet);
+    const [viewMenuOpen, setViewMenuOpen] = useState(false);
+    const dropdown = useLazyModule(dropdownMenuUi, viewMenuOpen);
+    const settings = useLazyModule(settingsSheetView, showSettingsSheet);
+
+    return (
+        <div className="mb-8">
+            <div className="flex items-center gap-4">
+                <SearchInput
+                    value={searchTerm}
+                    suggest={suggest}
+                    onChange={onSearch}
+                    onSubmit={onSubmit}
+                />
+                <Button
+                    variant="outline"
+                    className="bg-white dark:bg-gray-800 text-gray-900 dark:text-white border-gray-300 dark:border-gray-700"
+                    onClick={() => onSubmit(searchTerm)}
+                    disabled={loading}
+                >
+                    {loading ? (
+                        <Loader2 className="animate-spin h-5 w-5" />
+                    ) : (
+                        <Search className="h-5 w-5" />
+                    )}
+                </Button>
+                {dropdown ? (
+                    <dropdown.DropdownMenu open={viewMenuOpen} onOpenChange={setViewMenuOpen}>
+                        <dropdown.DropdownMenuTrigger asChild>
+                            <Button
+                                variant="outline"
+                                className="bg-white dark:bg-gray-800 text-gray-900 dark:text-white border-gray-300 dark:border-gray-700"
+                            >
+                                <LayoutList className="h-5 w-5" />
+                                <ChevronDown className="ml-2 h-4 w-4" />
+                            </Button>
+                        </dropdown.DropdownMenuTrigger>
+                        <dropdown.DropdownMenuContent align="end">
+                            <dropdown.DropdownMenuItem onClick={() => uiStore.set({ isListView: false })}>
+                                Grid View
+                            </dropdown.DropdownMenuItem>
+                            <dropdown.DropdownMenuItem onClick={() => uiStore.set({ isListView: true })}>
+                                List View
+                            </dropdown.DropdownMenuItem>
+                        </dropdown.DropdownMenuContent>
+                    </dropdown.DropdownMenu>
                 ) : (
-                    <p className="text-gray-400">No playlists yet.</p>
+                    <Button
+                        variant="outline"
+                        className="bg-white dark:bg-gray-800 text-gray-900 dark:text-white border-gray-300 dark:border-gray-700"
+                        onPointerEnter={dropdownMenuUi.prefetch}
+                        onClick={() => setViewMenuOpen(true)}
+                    >
+                        <LayoutList className="h-5 w-5" />
+                        <ChevronDown className="ml-2 h-4 w-4" />
+                    </Button>
                 )}
                 <Button
                     variant="outline"
-                    className="w-full text-white hover:bg-white/10 border-gray-700"
-                    onClick={() => {
-                        // Handle create new playlist
-                        onClose();
-                    }}
+                    className="bg-white dark:bg-gray-800 text-gray-900 dark:text-white border-gray-300 dark:border-gray-700"
+                    onPointerEnter={settingsSheetView.prefetch}
+                    onClick={() => uiStore.set({ showSettingsSheet: true })}
                 >
-                    + New Playlist
+                    <Settings className="h-5 w-5" />
                 </Button>
+                {settings && (
+                    <settings.SettingsSheet
+                        open={showSettingsSheet}
+                        onOpenChange={(open) => uiStore.set({ showSettingsSheet: open })}
+                        isDarkMode={isDarkMode}
+                        onToggleDarkMode={() => uiStore.set((state) => ({ isDarkMode: !state.isDarkMode }))}
+                        onResetData={onResetData}
+                    />
+                )}
             </div>
-        </SheetContent>
+        </div>
     );
 };
 
-const SettingsSheet: React.FC<{
-    isDarkMode: boolean;
-    onToggleDarkMode: () => void;
-    onResetData: () => void;
-}> = ({ isDarkMode, onToggleDarkMode, onResetData }) => {
-    return (
-        <SheetContent side="right" className="bg-gray-900 text-white border-gray-800 w-full md:max-w-md">
-            <SheetHeader>
-                <SheetTitle>Settings</SheetTitle>
-                <SheetDescription>
-                    Customize the app to your preferences.
-                </SheetDescription>
-            </SheetHeader>
-            <div className="space-y-6">
-                <div className="flex items-center justify-between">
-                    <span className="text-lg font-medium">Dark Mode</span>
-                    <Button
-                        variant="outline"
-                        size="icon"
-                        className={cn(
-                            "w-12 h-12 rounded-full",
-                            isDarkMode ? "bg-gray-800 text-white" : "bg-gray-200 text-gray-900",
-                            "hover:bg-gray-700",
-                        )}
-                        onClick={onToggleDarkMode}
-                    >
-                        {isDarkMode ? <Sun className="h-6 w-6" /> : <Moon className="h-6 w-6" />}
-                    </Button>
-                </div>
-                <div>
-                    <h3 className="text-lg font-medium mb-2">Data</h3>
-                    <p className="text-sm text-gray-400 mb-4">
-                        Clear your saved playlists and history. This action cannot be undone.
-                    </p>
-                    <Button
-                        variant="destructive"
-                        className="w-full bg-red-500/90 hover:bg-red-500"
-                        onClick={onResetData}
-                    >
-                        <AlertCircle className="mr-2 h-4 w-4" /> Reset Data
-                    </Button>
-                </div>
+// The results grid (or its loading skeleton). Subscribes to the search slice and the view mode;
+// nothing about playback or the playlists reaches it.
+const SearchResultsView: React.FC<{
+    searchStore: StateStore<SearchState>;
+    uiStore: StateStore<UiPrefs>;
+    onPlay: (video: VideoItem) => void;
+    onOpenActions: (videoId: string, anchor: HTMLElement) => void;
+    onLoadMore: () => void;
+}> = ({ searchStore, uiStore, onPlay, onOpenActions, onLoadMore }) => {
+    useRenderCount('SearchResults');
+    const searchResults = useStoreSelector(searchStore, (state) => state.results);
+    const searchTerm = useStoreSelector(searchStore, (state) => state.term);
+    const loading = useStoreSelector(searchStore, (state) => state.loading);
+    const isListView = useStoreSelector(uiStore, (state) => state.isListView);
+
+    const renderItem = useCallback((video: VideoItem) => (
+        <VideoCard video={video} onPlay={onPlay} onOpenActions={onOpenActions} isListView={isListView} />
+    ), [onPlay, onOpenActions, isListView]);
+
+    if (loading) {
+        return (
+            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
+                {[...Array(6)].map((_, i) => (
+                    <Card key={i} className="animate-pulse">
+                        <div className="w-full h-48 bg-gray-300 dark:bg-gray-700 rounded-t-lg"></div>
+                        <CardHeader>
+                            <div className="h-4 bg-gray-300 dark:bg-gray-700 rounded w-3/4 mb-2"></div>
+                            <div className="h-3 bg-gray-200 dark:bg-gray-800 rounded w-1/2"></div>
+                        </CardHeader>
+                    </Card>
+                ))}
             </div>
-        </SheetContent>
+        );
+    }
+
+    return (
+        <Presence>
+            {searchResults.length > 0 ? (
+                <VirtualizedResults
+                    items={searchResults}
+                    isListView={isListView}
+                    onEndReached={onLoadMore}
+                    renderItem={renderItem}
+                />
+            ) : (
+                searchTerm && (
+                    <div className="text-center text-gray-500 dark:text-gray-400">
+                        No results found for "{searchTerm}".
+                    </div>
+                )
+            )}
+        </Presence>
     );
 };
 
-const TuneFlowApp = () => {
-    const [searchResults, setSearchResults] = useState<VideoItem[]>([]);
-    const [currentVideo, setCurrentVideo] = useState<VideoItem | null>(null);
-    const [isPlaying, setIsPlaying] = useState(false);
-    const [playlists, setPlaylists] = useState<Playlist[]>(mockPlaylists); // Replace with state management
-    const [showPlaylistSheet, setShowPlaylistSheet] = useState(false);
-    const [showFullScreenPlayer, setShowFullScreenPlayer] = useState(false);
-    const [searchTerm, setSearchTerm] = useState('');
-    const [loading, setLoading] = useState(false);
-    const [isDarkMode, setIsDarkMode] = useState(false);
-    const [showSettingsSheet, setShowSettingsSheet] = useState(false);
-    const [isListView, setIsListView] = useState(false); // List view toggle
-    const [lyrics, setLyrics] = useState<string | null>(null);
-
-    // Function to handle video playback
-    const handlePlay = useCallback((video: VideoItem) => {
-        setCurrentVideo(video);
-        setIsPlaying(true);
-        setShowFullScreenPlayer(false); // Start with mini player
-    }, []);
+// The mini and full-screen players plus everything that drives the shared player: loading tracks,
+// play/pause in both directions, advancing on end, preloading and lyrics. Subscribes to the queue
+// and the player slice only.
+const PlayerDock: React.FC<{
+    playerStore: StateStore<PlayerViewState>;
+    playbackQueue: PlaybackQueue;
+}> = ({ playerStore, playbackQueue }) => {
+    useRenderCount('PlayerDock');
+    const queueState = useSyncExternalStore(playbackQueue.subscribe, playbackQueue.getSnapshot);
+    const currentVideo = queueState.current;
+    const isPlaying = useStoreSelector(playerStore, (state) => state.isPlaying);
+    const isFullScreen = useStoreSelector(playerStore, (state) => state.isFullScreen);
+    const lyrics = useStoreSelector(playerStore, (state) => state.lyrics);
+    // Loaded while a track is playing; until it has, expanding keeps the mini player up
+    const fullScreen = useLazyModule(fullScreenPlayerView, currentVideo !== null);
+    const showFullScreen = isFullScreen && fullScreen !== null;
 
-    const handlePause = () => {
-        setIsPlaying(false);
-    };
+    const handlePause = useCallback(() => playerStore.set({ isPlaying: false }), [playerStore]);
+    const handleResume = useCallback(() => playerStore.set({ isPlaying: true }), [playerStore]);
 
-    const handleResume = () => {
-        setIsPlaying(true);
-    };
+    const handleNext = useCallback(() => {
+        if (playbackQueue.next()) playerStore.set({ isPlaying: true });
+    }, [playbackQueue, playerStore]);
 
-    const handleClosePlayer = () => {
-        setCurrentVideo(null);
-        setIsPlaying(false);
-        setShowFullScreenPlayer(false);
-    };
+    const handlePrevious = useCallback(() => {
+        if (playbackQueue.previous()) playerStore.set({ isPlaying: true });
+    }, [playbackQueue, playerStore]);
 
-    // Function to simulate fetching search results
-    const handleSearch = async (query: string) => {
-        setLoading(true);
-        setSearchTerm(query);
-        // Simulate API call delay
-        setTimeout(() => {
-            if (query) {
-                const filteredResults = mockSearchResults.filter((video) =>
-                    video.title.toLowerCase().includes(query.toLowerCase()) ||
-                    video.artist.toLowerCase().includes(query.toLowerCase())
-                );
-                setSearchResults(filteredResults);
-            } else {
-                setSearchResults([]);
-            }
-            setLoading(false);
-        }, 500);
-    };
+    const handleToggleShuffle = useCallback(() => {
+        playbackQueue.setShuffle(!playbackQueue.getSnapshot().shuffle);
+    }, [playbackQueue]);
 
-    const handleAddToPlaylist = (video: VideoItem, playlistId: string) => {
-        setPlaylists((prevPlaylists) =>
-            prevPlaylists.map((playlist) =>
-                playlist.id === playlistId
-                    ? { ...playlist, videos: [...playlist.videos, video] }
-                    : playlist
-            )
-        );
-    };
+    const handleCycleRepeat = useCallback(() => {
+        const { repeat } = playbackQueue.getSnapshot();
+        playbackQueue.setRepeat(repeat === 'off' ? 'all' : repeat === 'all' ? 'one' : 'off');
+    }, [playbackQueue]);
 
-    const handleSelectPlaylist = (playlistId: string) => {
-        // Handle logic to add currentVideo to the selected playlist
+    const handleClosePlayer = useCallback(() => {
+        playbackQueue.clear();
+        playerStore.set({ isPlaying: false, isFullScreen: false });
+    }, [playbackQueue, playerStore]);
+
+    const handleExpandPlayer = useCallback(() => playerStore.set({ isFullScreen: true }), [playerStore]);
+    const handleCollapsePlayer = useCallback(() => playerStore.set({ isFullScreen: false }), [playerStore]);
+
+    // Switch tracks on the shared player rather than mounting a new embed
+    useEffect(() => {
         if (currentVideo) {
-            handleAddToPlaylist(currentVideo, playlistId);
+            playerController.load(currentVideo.id);
+            void offlineCache.put('track', currentVideo.id, currentVideo);
+        } else {
+            playerController.stop();
         }
-    };
+    }, [currentVideo]);
 
-    const handleResetData = () => {
-        // Implement logic to clear user data (playlists, history, etc.)
-        setPlaylists([]); // Clear playlists
-        setCurrentVideo(null); // Clear current video
-        setSearchResults([]);
-        setSearchTerm('');
-        // Show a toast/alert to confirm
-        alert('All data has been reset.');
-    };
-
-    // Dark mode toggle
+    // Keep isPlaying and the player in sync both ways; pausing inside the embed updates the UI too
+    useEffect(() => playerController.subscribe(() => playerStore.set({ isPlaying: playerController.isPlaying })), [playerStore]);
     useEffect(() => {
-        if (isDarkMode) {
-            document.documentElement.classList.add('dark');
+        if (isPlaying) {
+            playerController.play();
         } else {
-            document.documentElement.classList.remove('dark');
+            playerController.pause();
         }
-    }, [isDarkMode]);
+    }, [isPlaying]);
 
-    // Function to simulate fetching lyrics
-    const fetchLyrics = useCallback(async (videoId: string) => {
-        // Replace with actual API call
-        setLyrics(null); // Clear previous lyrics
-        if (!videoId) return;
+    // Start the next track from the ended event itself, without waiting for a render
+    useEffect(() => playerController.onEnded(() => {
+        const next = playbackQueue.next(true);
+        if (next?.id === playerController.currentVideoId) playerController.restart();
+        else if (next) playerController.load(next.id);
+    }), [playbackQueue]);
+
+    // Warm up the next track during the last seconds of the current one
+    useEffect(() => {
+        if (!currentVideo || !isPlaying) return;
+        const timer = setInterval(() => {
+            const duration = playerController.getDuration();
+            const next = playbackQueue.peekNext();
+            if (next && duration > 0 && duration - playerController.getCurrentTime() <= TRACK_PRELOAD_LEAD_SECONDS) {
+                preloadTrack(next);
+                clearInterval(timer);
+            }
+        }, 1000);
+        return () => clearInterval(timer);
+    }, [currentVideo, isPlaying, playbackQueue, queueState]);
 
-        setTimeout(() => {
-            setLyrics(mockLyrics); // set mock lyrics
-        }, 750);
+    // Fetch lyrics when a new video is played; switching tracks abandons the previous request
+    useEffect(() => {
+        playerStore.set({ lyrics: null }); // Clear previous lyrics
+        if (!currentVideo) return;
 
-    }, []);
+        const controller = new AbortController();
+        lyricsService.get(currentVideo.id, controller.signal).then((parsed) => playerStore.set({ lyrics: parsed }), (error) => {
+            if (!isAbortError(error)) console.error('Failed to load lyrics', error);
+        });
+        return () => controller.abort();
+    }, [currentVideo, playerStore]);
 
-    // Fetch lyrics when a new video is played
+    // Prefetch lyrics for the tracks queued after the current one
     useEffect(() => {
-        if (currentVideo) {
-            fetchLyrics(currentVideo.id);
-        } else {
-            setLyrics(null);
-        }
-    }, [currentVideo, fetchLyrics]);
+        lyricsService.prefetch(playbackQueue.upcoming(LYRICS_PREFETCH_COUNT).map((video) => video.id));
+    }, [playbackQueue, queueState]);
 
     return (
-        <div className={cn(
-            "min-h-screen bg-gray-100 dark:bg-gray-950",
-            currentVideo ? "pb-20" : ""
-        )}>
-            {/* Main Content Area */}
-            <div className="container mx-auto p-4">
-                {/* Search Bar */}
-                <div className="mb-8">
-                    <div className="flex items-center gap-4">
-                        <Input
-                            type="text"
-                            placeholder="Search for songs, artists..."
-                            value={searchTerm}
-                            onChange={(e) => handleSearch(e.target.value)}
-                            className="w-full md:w-96 bg-white dark:bg-gray-800 text-gray-900 dark:text-white border-gray-300 dark:border-gray-700"
-                        />
-                        <Button
-                            variant="outline"
-                            className="bg-white dark:bg-gray-800 text-gray-900 dark:text-white border-gray-300 dark:border-gray-700"
-                            onClick={() => handleSearch(searchTerm)}
-                            disabled={loading}
-                        >
-                            {loading ? (
-                                <Loader2 className="animate-spin h-5 w-5" />
-                            ) : (
-                                <Search className="h-5 w-5" />
-                            )}
-                        </Button>
-                        <DropdownMenu>
-                            <DropdownMenuTrigger asChild>
-                                <Button
-                                    variant="outline"
-                                    className="bg-white dark:bg-gray-800 text-gray-900 dark:text-white border-gray-300 dark:border-gray-700"
-                                >
-                                    <LayoutList className="h-5 w-5" />
-                                    <ChevronDown className="ml-2 h-4 w-4" />
-                                </Button>
-                            </DropdownMenuTrigger>
-                            <DropdownMenuContent align="end">
-                                <DropdownMenuItem onClick={() => setIsListView(false)}>
-                                    Grid View
-                                </DropdownMenuItem>
-                                <DropdownMenuItem onClick={() => setIsListView(true)}>
-                                    List View
-                                </DropdownMenuItem>
-                            </DropdownMenuContent>
-                        </DropdownMenu>
-                        <Sheet open={showSettingsSheet} onOpenChange={setShowSettingsSheet}>
-                            <SheetTrigger asChild>
-                                <Button
-                                    variant="outline"
-                                    className="bg-white dark:bg-gray-800 text-gray-900 dark:text-white border-gray-300 dark:border-gray-700"
-                                >
-                                    <Settings className="h-5 w-5" />
-                                </Button>
-                            </SheetTrigger>
-                            <SettingsSheet
-                                isDarkMode={isDarkMode}
-                                onToggleDarkMode={() => setIsDarkMode(!isDarkMode)}
-                                onResetData={handleResetData}
-                            />
-                        </Sheet>
-                    </div>
-                </div>
-
-                {/* Search Results */}
-                {loading ? (
-                    <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                        {[...Array(6)].map((_, i) => (
-                            <Card key={i} className="animate-pulse">
-                                <div className="w-full h-48 bg-gray-300 dark:bg-gray-700 rounded-t-lg"></div>
-                                <CardHeader>
-                                    <div className="h-4 bg-gray-300 dark:bg-gray-700 rounded w-3/4 mb-2"></div>
-                                    <div className="h-3 bg-gray-200 dark:bg-gray-800 rounded w-1/2"></div>
-                                </CardHeader>
-                            </Card>
-                        ))}
-                    </div>
-                ) : (
-                    <AnimatePresence>
-                        {searchResults.length > 0 ? (
-                            <div
-                                className={cn(
-                                    'grid gap-6',
-                                    isListView ? 'grid-cols-1' : 'grid-cols-1 md:grid-cols-2 lg:grid-cols-3',
-                                )}
-                            >
-                                {searchResults.map((video) => (
-                                    <VideoCard
-                                        key={video.id}
-                                        video={video}
-                                        onPlay={handlePlay}
-                                        onAddToPlaylist={(v, pId) => {
-                                            handleAddToPlaylist(v, pId);
-                                            setShowPlaylistSheet(false); // Close sheet after adding
-                                        }}
-                                        playlists={playlists}
-                                        isListView={isListView}
-                                    />
-                                ))}
-                            </div>) : (
-                            searchTerm && (
-                                <div className="text-center text-gray-500 dark:text-gray-400">
-                                    No results found for "{searchTerm}".
-                                </div>
-                            )
-                        )}
-                    </AnimatePresence>
-                )}
-            </div>
+        <>
+            {/* Keeps the end of the page clear of the mini player */}
+            {currentVideo && <div className="h-20" />}
 
             {/* Mini Player */}
-            <AnimatePresence>
-                {currentVideo && !showFullScreenPlayer && (
+            <Presence>
+                {currentVideo && !showFullScreen && (
                     <MiniPlayer
                         currentVideo={currentVideo}
                         onPause={handlePause}
                         onPlay={handleResume}
                         isPlaying={isPlaying}
+                        hasNext={queueState.hasNext}
+                        onNext={handleNext}
+                        onExpand={handleExpandPlayer}
                         onClose={handleClosePlayer}
                     />
                 )}
-            </AnimatePresence>
+            </Presence>
 
             {/* Full Screen Player */}
-            <AnimatePresence>
-                {currentVideo && showFullScreenPlayer && (
-                    <FullScreenPlayer
+            <Presence>
+                {currentVideo && showFullScreen && (
+                    <fullScreen.FullScreenPlayer
                         currentVideo={currentVideo}
                         onPause={handlePause}
                         onPlay={handleResume}
                         isPlaying={isPlaying}
-                        onClose={handleClosePlayer}
+                        queue={queueState}
+                        onNext={handleNext}
+                        onPrevious={handlePrevious}
+                        onToggleShuffle={handleToggleShuffle}
+                        onCycleRepeat={handleCycleRepeat}
+                        onCollapse={handleCollapsePlayer}
                         lyrics={lyrics}
                     />
                 )}
-            </AnimatePresence>
+            </Presence>
 
-            {/* Playlist Sheet */}
-            <Sheet open={showPlaylistSheet} onOpenChange={setShowPlaylistSheet}>
-                <PlaylistSheet
-                    playlists={playlists}
-                    onSelectPlaylist={handleSelectPlaylist}
-                    onClose={() => setShowPlaylistSheet(false)}
-                />
-            </Sheet>
             {/* Play Directly from URL */}
             {currentVideo && (
                 <div className="absolute top-4 right-4 z-50">
@@ -730,9 +5511,335 @@ const TuneFlowApp = () => {
                     </Button>
                 </div>
             )}
+        </>
+    );
+};
+
+const PlaylistSheetHost: React.FC<{
+    uiStore: StateStore<UiPrefs>;
+    playlistStore: PlaylistStore;
+    onSelectPlaylist: (playlistId: string) => void;
+    onPlayPlaylist: (playlistId: string) => void;
+    onSharePlaylist: (playlistId: string) => void;
+    onClose: () => void;
+}> = ({ uiStore, playlistStore, onSelectPlaylist, onPlayPlaylist, onSharePlaylist, onClose }) => {
+    const showPlaylistSheet = useStoreSelector(uiStore, (state) => state.showPlaylistSheet);
+    const playlists = usePlaylists(playlistStore);
+    const view = useLazyModule(playlistSheetView, showPlaylistSheet);
+    if (!view) return null;
+
+    return (
+        <view.PlaylistSheet
+            open={showPlaylistSheet}
+            onOpenChange={(open) => uiStore.set({ showPlaylistSheet: open })}
+            playlists={playlists}
+            onSelectPlaylist={onSelectPlaylist}
+            onPlayPlaylist={onPlayPlaylist}
+            onSharePlaylist={onSharePlaylist}
+            onClose={onClose}
+        />
+    );
+};
+
+// Owns the stores and the handlers that span them. It subscribes to none of the stores itself, so
+// it renders once and every later update starts in the component that reads the changed value.
+const TuneFlowApp = () => {
+    useRenderCount('TuneFlowApp');
+    const searchStore = useMemo(() => new StateStore(initialSearchState), []);
+    const playerStore = useMemo(() => new StateStore(initialPlayerViewState), []);
+    const uiStore = useMemo(() => new StateStore(initialUiPrefs), []);
+    const actionMenuStore = useMemo(() => new StateStore(initialActionMenuState), []);
+    const playbackQueue = useMemo(() => new PlaybackQueue(), []);
+    const playlistStore = useMemo(() => new PlaylistStore(mockPlaylists, mockSearchResults), []);
+    const suggestionIndex = useMemo(() => new SuggestionIndex({
+        persistence: createLocalStoragePersistence<SuggestionHistoryEntry>('tuneflow.suggestions.v1'),
+    }), []);
+    const playlistSync = useMemo(() => new PlaylistSync(playlistStore, {
+        storage: createLocalStorageSyncStorage('tuneflow.playlists.sync.v1'),
+    }), [playlistStore]);
+    useLayoutEffect(() => {
+        playlistSync.open();
+        return () => playlistSync.close();
+    }, [playlistSync]);
+    const playlistsRestored = useOfflinePlaylists(playlistStore, offlineCache, fetchPlaylistVideos, playlistSync);
+    const searchSpan = useRef<TelemetrySpan | null>(null); // keystroke to results on screen
+    const playSpan = useRef<TelemetrySpan | null>(null); // click to audio
+
+    useEffect(() => telemetry.observeMainThread(), []);
+    useEffect(() => measureStartup(), []);
+    useEffect(() => onFirstInteraction(motionRuntime.prefetch), []);
+    useEffect(() => whenIdle(() => {
+        settingsSheetView.prefetch();
+        playlistSheetView.prefetch();
+        dropdownMenuUi.prefetch();
+    }), []);
+    useEffect(() => whenIdle(() => void registerServiceWorker()), []);
+    useEffect(() => playerController.onAudioStart(() => {
+        playSpan.current?.end();
+        playSpan.current = null;
+    }), []);
+
+    // Times a click until the queue's current track is heard. Asking for the track that is already
+    // playing changes nothing, so there is nothing to time.
+    const startPlaySpan = useCallback(() => {
+        playSpan.current?.cancel();
+        const current = playbackQueue.getSnapshot().current;
+        const alreadyPlaying = current?.id === playerController.currentVideoId && playerController.isPlaying;
+        playSpan.current = alreadyPlaying ? null : telemetry.start('play');
+    }, [playbackQueue]);
+
+    // Function to handle video playback; the rest of the results become the queue
+    const handlePlay = useCallback((video: VideoItem) => {
+        const { results, term } = searchStore.getSnapshot();
+        const index = results.indexOf(video);
+        if (index >= 0) {
+            playbackQueue.playList(results, index);
+            if (term) suggestionIndex.recordQuery(term); // the query found something worth playing
+        } else {
+            playbackQueue.playList([video]);
+        }
+        startPlaySpan();
+        playerStore.set({ isPlaying: true, isFullScreen: false }); // Start with mini player
+    }, [searchStore, playerStore, playbackQueue, suggestionIndex, startPlaySpan]);
+
+    const handlePlayNext = useCallback((video: VideoItem) => {
+        if (playbackQueue.getSnapshot().current) {
+            playbackQueue.playNext(video);
+        } else {
+            handlePlay(video);
+        }
+    }, [playbackQueue, handlePlay]);
+
+    const handlePlayPlaylist = useCallback((playlistId: string) => {
+        if (playbackQueue.playList(playlistStore.videosOf(playlistId))) {
+            startPlaySpan();
+            playerStore.set({ isPlaying: true });
+        }
+    }, [playbackQueue, playlistStore, playerStore, startPlaySpan]);
+
+    // Search results come from the Data API client, through the query cache. An entry holds the
+    // API pages fetched so far and the token for the next one; pages past them are fetched on demand.
+    // Results are not refined from a cached prefix: the backend's matching is fuzzy, so a longer
+    // query's results needn't be a subset of its prefix's.
+    const queryCache = useMemo(() => new QueryCache<CachedSearch>({
+        persistence: createLocalStoragePersistence<PersistedQueryCacheEntry<CachedSearch>>('tuneflow.queryCache.v2'),
+    }), []);
+    const fetchSearchPage = useMemo<SearchPageFetcher<VideoItem>>(() => async (query, pageSize, pageToken, signal) => {
+        const end = Number(pageToken ?? 0) + pageSize;
+        let search = queryCache.get(query);
+        while (!search || (search.videos.length < end && search.nextPageToken !== undefined)) {
+            const page = await youTubeApi.search(query, signal, search?.nextPageToken);
+            search = { videos: (search?.videos ?? []).concat(page.items), nextPageToken: page.nextPageToken };
+            queryCache.set(query, search);
+        }
+        return pageOf(search.videos, pageSize, pageToken, search.nextPageToken !== undefined);
+    }, [queryCache]);
+    const resultStream = useRef<PageStream<VideoItem> | null>(null);
+    const loadingMore = useRef(false);
+    const searchScheduler = useMemo(() => new SearchScheduler<{ results: VideoItem[]; stream: PageStream<VideoItem> | null }>({
+        run: async (query, signal) => {
+            if (!query) return { results: [], stream: null };
+            const stream = new PageStream((streamSignal) => searchPages(fetchSearchPage, query, streamSignal), signal);
+            const firstPage = await stream.next();
+            return { results: firstPage.done ? [] : firstPage.value, stream };
+        },
+        onResult: (_, { results, stream }) => {
+            suggestionIndex.addCatalog(results);
+            resultStream.current?.close();
+            resultStream.current = stream;
+            loadingMore.current = false;
+            searchStore.set({ results, loading: false });
+            searchSpan.current?.end({ results: results.length });
+            searchSpan.current = null;
+        },
+        onError: () => {
+            searchSpan.current?.cancel();
+            searchSpan.current = null;
+            searchStore.set({ loading: false });
+        },
+    }), [fetchSearchPage, suggestionIndex, searchStore]);
+
+    // Appends the next page when the results view scrolls near its end
+    const handleLoadMore = useCallback(async () => {
+        const stream = resultStream.current;
+        if (!stream || stream.done || loadingMore.current) return;
+        loadingMore.current = true;
+        try {
+            const page = await stream.next();
+            if (resultStream.current === stream && !page.done) {
+                searchStore.set((state) => ({ results: [...state.results, ...page.value] }));
+            }
+        } catch (error) {
+            if (!isAbortError(error)) console.error('Failed to load more results', error);
+        } finally {
+            if (resultStream.current === stream) loadingMore.current = false;
+        }
+    }, [searchStore]);
+
+    useEffect(() => {
+        queryCache.hydrate();
+    }, [queryCache]);
+
+    useEffect(() => {
+        suggestionIndex.addCatalog(mockSearchResults);
+        void suggestionIndex.hydrate();
+    }, [suggestionIndex]);
+
+    useEffect(() => () => searchScheduler.cancel(), [searchScheduler]);
+
+    // Function to handle search input; the scheduler debounces and drops superseded queries
+    const handleSearch = useCallback((query: string, immediate = false) => {
+        searchSpan.current?.cancel();
+        searchSpan.current = telemetry.start('search');
+        searchStore.set({ term: query, loading: true });
+        searchScheduler.schedule(query, immediate);
+    }, [searchStore, searchScheduler]);
+
+    const handleSubmitSearch = useCallback((query: string) => {
+        suggestionIndex.recordQuery(query);
+        handleSearch(query, true);
+    }, [suggestionIndex, handleSearch]);
+
+    const suggestSearches = useCallback((prefix: string) => suggestionIndex.suggest(prefix, 6), [suggestionIndex]);
+
+    const handleAddToPlaylist = useCallback((video: VideoItem, playlistId: string) => {
+        const span = telemetry.start('playlist.add');
+        playlistStore.addVideos(playlistId, [video]);
+        uiStore.set({ showPlaylistSheet: false }); // Close sheet after adding
+        span.end();
+    }, [playlistStore, uiStore]);
+
+    // The system share sheet where there is one, otherwise the clipboard.
+    const handleSharePlaylist = useCallback(async (playlistId: string) => {
+        const playlist = playlistStore.getPlaylist(playlistId);
+        if (!playlist) return;
+        try {
+            const url = await shareLinkFor(playlist);
+            if (navigator.share) {
+                await navigator.share({ title: playlist.name, url });
+            } else {
+                await navigator.clipboard.writeText(url);
+            }
+        } catch (error) {
+            if (!isAbortError(error)) console.error('Could not share the playlist', error);
+        }
+    }, [playlistStore]);
+
+    // A shared link opens the playlists and fills the new playlist in as its tracks resolve, once
+    // the saved playlists are back: restoring them would drop a playlist created before.
+    useEffect(() => {
+        if (!playlistsRestored) return;
+        const shared = readShareLink(location.href);
+        if (!shared) return;
+        history.replaceState(history.state, '', location.pathname + location.search);
+        uiStore.set({ showPlaylistSheet: true });
+        const span = telemetry.start('playlist.import');
+        importSharedPlaylist(shared, playlistStore, fetchPlaylistVideos).then(
+            () => span.end(),
+            (error) => {
+                span.cancel();
+                console.error('Could not import the shared playlist', error);
+            },
+        );
+    }, [playlistStore, uiStore, playlistsRestored]);
+
+    const handleOpenActions = useCallback((videoId: string, anchor: HTMLElement) => {
+        actionMenuStore.set({ videoId, anchor });
+    }, [actionMenuStore]);
+
+    // The card's track, from the results or, once they have moved on, from the playlists' tracks.
+    const getActionVideo = useCallback((videoId: string) =>
+        searchStore.getSnapshot().results.find((video) => video.id === videoId) ?? playlistStore.getVideo(videoId),
+    [searchStore, playlistStore]);
+
+    const handleSelectPlaylist = useCallback((playlistId: string) => {
+        // Handle logic to add currentVideo to the selected playlist
+        const currentVideo = playbackQueue.getSnapshot().current;
+        if (currentVideo) {
+            handleAddToPlaylist(currentVideo, playlistId);
+        }
+    }, [playbackQueue, handleAddToPlaylist]);
+
+    const handleClosePlaylistSheet = useCallback(() => uiStore.set({ showPlaylistSheet: false }), [uiStore]);
+
+    const handleResetData = useCallback(() => {
+        // Implement logic to clear user data (playlists, history, etc.)
+        searchScheduler.cancel(); // Drop any pending search so it can't repopulate results
+        searchSpan.current?.cancel();
+        searchSpan.current = null;
+        resultStream.current?.close();
+        resultStream.current = null;
+        queryCache.clear(); // Clear search history
+        suggestionIndex.clearHistory(); // Forget past queries; catalog suggestions stay
+        void offlineCache.clear(); // Clear offline tracks and lyrics
+        void thumbnailOfflineCache.clear();
+        playlistSync.reset(); // Clear playlists, in every tab
+        playlistStore.reset([]);
+        playbackQueue.clear(); // Clear current video and queue
+        searchStore.set(initialSearchState);
+        // Show a toast/alert to confirm
+        alert('All data has been reset.');
+    }, [searchScheduler, queryCache, suggestionIndex, playlistSync, playlistStore, playbackQueue, searchStore]);
+
+    // Dark mode toggle
+    useEffect(() => {
+        const applyDarkMode = () => {
+            document.documentElement.classList.toggle('dark', uiStore.getSnapshot().isDarkMode);
+        };
+        applyDarkMode();
+        return uiStore.subscribe(applyDarkMode);
+    }, [uiStore]);
+
+    return (
+        <div className="min-h-screen bg-gray-100 dark:bg-gray-950">
+            {/* Main Content Area */}
+            <div className="container mx-auto p-4">
+                {/* Search Bar */}
+                <Profiler id="SearchBar" onRender={telemetry.onRender}>
+                    <SearchBar
+                        searchStore={searchStore}
+                        uiStore={uiStore}
+                        suggest={suggestSearches}
+                        onSearch={handleSearch}
+                        onSubmit={handleSubmitSearch}
+                        onResetData={handleResetData}
+                    />
+                </Profiler>
+
+                {/* Search Results */}
+                <Profiler id="SearchResults" onRender={telemetry.onRender}>
+                    <SearchResultsView
+                        searchStore={searchStore}
+                        uiStore={uiStore}
+                        onPlay={handlePlay}
+                        onOpenActions={handleOpenActions}
+                        onLoadMore={handleLoadMore}
+                    />
+                </Profiler>
+            </div>
+            <ActionMenu
+                menuStore={actionMenuStore}
+                playlistStore={playlistStore}
+                getVideo={getActionVideo}
+                onPlayNext={handlePlayNext}
+                onAddToPlaylist={handleAddToPlaylist}
+            />
+
+            <Profiler id="PlayerDock" onRender={telemetry.onRender}>
+                <PlayerDock playerStore={playerStore} playbackQueue={playbackQueue} />
+            </Profiler>
+
+            {/* Playlist Sheet */}
+            <PlaylistSheetHost
+                uiStore={uiStore}
+                playlistStore={playlistStore}
+                onSelectPlaylist={handleSelectPlaylist}
+                onPlayPlaylist={handlePlayPlaylist}
+                onSharePlaylist={handleSharePlaylist}
+                onClose={handleClosePlaylistSheet}
+            />
         </div>
     );
 };
 
 export default TuneFlowApp;
-
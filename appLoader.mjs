@@ -0,0 +1,35 @@
+// App Loader
+// Node module hooks for running the app under Node, e.g. `tsx --import ./appLoader.mjs benchmark.ts`.
+// The app's source is TSX kept in TuneFlowApp.py, which no TypeScript runner compiles by its
+// extension: `./TuneFlowApp` resolves to it here and it is compiled with esbuild, the compiler tsx
+// itself uses. Its own imports (`@/…` through tsconfig's paths, ./searchCore, the lazily loaded
+// .tsx views) are left to tsx; the views' imports of `./TuneFlowApp` resolve to the same module.
+import { readFile } from 'node:fs/promises';
+import { register } from 'node:module';
+import { isMainThread } from 'node:worker_threads';
+import { transform } from 'esbuild';
+
+const ROOT_URL = new URL('./', import.meta.url).href;
+const APP_URL = new URL('./TuneFlowApp.py', import.meta.url).href;
+
+// Imported with --import, this registers the hooks below, which Node runs on a thread of their own
+if (isMainThread) register(import.meta.url);
+
+export const resolve = (specifier, context, nextResolve) => {
+    if (specifier === './TuneFlowApp' && context.parentURL?.startsWith(ROOT_URL)) {
+        return { url: APP_URL, format: 'module', shortCircuit: true };
+    }
+    return nextResolve(specifier, context);
+};
+
+export const load = async (url, context, nextLoad) => {
+    if (url !== APP_URL) return nextLoad(url, context);
+    const { code } = await transform(await readFile(new URL(url), 'utf8'), {
+        loader: 'tsx',
+        format: 'esm',
+        jsx: 'automatic',
+        sourcefile: 'TuneFlowApp.tsx',
+        sourcemap: 'inline',
+    });
+    return { format: 'module', source: code, shortCircuit: true };
+};
@@ -0,0 +1,62 @@
+// Benchmark Runner
+// Runs the app's benchmark suite under Node, with jsdom standing in for the browser so the render
+// benchmark runs too, writes the report as JSON and compares it with a stored baseline:
+//
+//   npm run benchmark -- [--report benchmark-report.json] [--baseline benchmark-baseline.json] [--update-baseline]
+//
+// The script runs this file with tsx and appLoader.mjs, which loads the app from TuneFlowApp.py,
+// using the versions pinned in package.json. With no baseline file, or with --update-baseline, the
+// report becomes the new baseline. Exits non-zero when a timing or heap
+// size regressed past the tolerance, so it can gate a CI job.
+import { readFile, writeFile } from 'node:fs/promises';
+import { installDom } from './nodeDom';
+import type { BenchmarkReport } from './TuneFlowApp';
+
+const DEFAULT_REPORT_PATH = 'benchmark-report.json';
+const DEFAULT_BASELINE_PATH = 'benchmark-baseline.json';
+
+const option = (name: string, fallback: string) => {
+    const at = process.argv.indexOf(name);
+    return at >= 0 && at + 1 < process.argv.length ? process.argv[at + 1] : fallback;
+};
+
+const readReport = async (path: string): Promise<BenchmarkReport | null> => {
+    try {
+        return JSON.parse(await readFile(path, 'utf8'));
+    } catch {
+        return null;
+    }
+};
+
+const percent = (change: number) => `${change > 0 ? '+' : ''}${(change * 100).toFixed(1)}%`;
+
+const main = async () => {
+    const reportPath = option('--report', DEFAULT_REPORT_PATH);
+    const baselinePath = option('--baseline', DEFAULT_BASELINE_PATH);
+
+    const container = installDom();
+    const { runBenchmarkSuite, compareBenchmarks } = await import('./TuneFlowApp');
+
+    const report = await runBenchmarkSuite({ container });
+    await writeFile(reportPath, `${JSON.stringify(report, null, 2)}\n`);
+    console.log(`Wrote ${Object.keys(report.metrics).length} metrics to ${reportPath}`);
+
+    const baseline = await readReport(baselinePath);
+    if (!baseline || process.argv.includes('--update-baseline')) {
+        await writeFile(baselinePath, `${JSON.stringify(report, null, 2)}\n`);
+        console.log(`Saved ${baselinePath} as the new baseline`);
+        return;
+    }
+
+    const { regressions, improvements } = compareBenchmarks(report, baseline);
+    for (const { key, baseline: before, current, change } of [...regressions, ...improvements]) {
+        console.log(`${change > 0 ? 'worse ' : 'better'}  ${key}: ${before.toFixed(3)} -> ${current.toFixed(3)} (${percent(change)})`);
+    }
+    console.log(`${regressions.length} regressions, ${improvements.length} improvements against ${baselinePath}`);
+    if (regressions.length > 0) process.exitCode = 1;
+};
+
+main().catch((error) => {
+    console.error(error);
+    process.exitCode = 1;
+});
@@ -0,0 +1,38 @@
+// Checks
+// Runs the app's regression checks under Node, with jsdom standing in for the browser:
+//
+//   npm run check
+//
+// Each check throws when it fails; this reports every failure and then exits non-zero, so it can
+// gate a CI job next to the benchmark runner.
+import { installDom } from './nodeDom';
+
+const main = async () => {
+    const container = installDom();
+    const { checkFuzzySearchKeepsSubstringMatches, checkPlayPauseRenders, checkPlaylistSyncConvergence } = await import('./TuneFlowApp');
+
+    const checks: [string, () => unknown][] = [
+        ['play/pause leaves the results alone', () => checkPlayPauseRenders(container)],
+        ['synced playlists converge', async () => {
+            for (const seed of [1, 2, 3]) await checkPlaylistSyncConvergence({ seed });
+        }],
+        ['fuzzy search keeps substring matches', () => checkFuzzySearchKeepsSubstringMatches()],
+    ];
+    let failures = 0;
+    for (const [name, run] of checks) {
+        try {
+            await run();
+            console.log(`ok    ${name}`);
+        } catch (error) {
+            failures++;
+            console.error(`FAIL  ${name}\n${error instanceof Error ? error.stack ?? error.message : error}`);
+        }
+    }
+    console.log(`${checks.length - failures} of ${checks.length} checks passed`);
+    if (failures > 0) process.exitCode = 1;
+};
+
+main().catch((error) => {
+    console.error(error);
+    process.exitCode = 1;
+});
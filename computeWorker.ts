@@ -0,0 +1,20 @@
+// Compute Worker
+// The worker's entry: one ComputeState, replying with transferred result buffers. The app starts it
+// with new Worker(new URL('./computeWorker.ts', import.meta.url), { type: 'module' }).
+import { ComputeState, type ComputeMessage, type ComputeReply } from './searchCore';
+
+interface ComputeWorkerScope {
+    onmessage: ((event: MessageEvent<ComputeMessage>) => void) | null;
+    postMessage(reply: ComputeReply, transfer?: Transferable[]): void;
+}
+
+const state = new ComputeState();
+const scope = globalThis as unknown as ComputeWorkerScope;
+scope.onmessage = ({ data: { id, request } }) => {
+    try {
+        const positions = state.run(request);
+        scope.postMessage({ id, positions }, [positions.buffer]);
+    } catch (error) {
+        scope.postMessage({ id, error: String(error) });
+    }
+};
@@ -0,0 +1,141 @@
+// Full-Screen Player
+// The expanded player: the shared player's slot, transport controls and the lyrics panel. It loads
+// as a chunk of its own once a track is playing, so expanding the mini player doesn't wait on it.
+import React, { useState } from 'react';
+import { ChevronDown, Music, Pause, Play, Repeat, Repeat1, Shuffle, SkipBack, SkipForward } from 'lucide-react';
+import { Button } from '@/components/ui/button';
+import { cn } from '@/lib/utils';
+import type { VideoItem } from './searchCore';
+import { SyncedLyrics } from './syncedLyrics';
+import {
+    MotionDiv,
+    PlayerSlot,
+    Presence,
+    playerController,
+    type ParsedLyrics,
+    type QueueState,
+} from './TuneFlowApp';
+
+export const FullScreenPlayer: React.FC<{
+    currentVideo: VideoItem | null;
+    onPause: () => void;
+    onPlay: () => void;
+    isPlaying: boolean;
+    queue: QueueState;
+    onNext: () => void;
+    onPrevious: () => void;
+    onToggleShuffle: () => void;
+    onCycleRepeat: () => void;
+    onCollapse: () => void;
+    lyrics: ParsedLyrics | null;
+}> = ({
+    currentVideo,
+    onPause,
+    onPlay,
+    isPlaying,
+    queue,
+    onNext,
+    onPrevious,
+    onToggleShuffle,
+    onCycleRepeat,
+    onCollapse,
+    lyrics,
+}) => {
+    const [showLyrics, setShowLyrics] = useState(false);
+    if (!currentVideo) return null;
+
+    return (
+        <MotionDiv
+            initial={{ opacity: 0 }}
+            animate={{ opacity: 1 }}
+            exit={{ opacity: 0 }}
+            transition={{ duration: 0.2 }}
+            className="fixed inset-0 bg-black z-50 flex flex-col"
+        >
+            <div className="p-4">
+                <Button
+                    variant="ghost"
+                    size="icon"
+                    className="text-white hover:bg-white/20"
+                    onClick={onCollapse}
+                >
+                    <ChevronDown className="h-6 w-6" />
+                </Button>
+            </div>
+
+            <PlayerSlot className="flex-grow min-h-0 w-full" />
+
+            <div className="p-4 flex items-center justify-center gap-4">
+                <Button
+                    variant="ghost"
+                    size="icon"
+                    className={cn('hover:bg-white/20', queue.shuffle ? 'text-green-400' : 'text-white')}
+                    onClick={onToggleShuffle}
+                >
+                    <Shuffle className="h-5 w-5" />
+                </Button>
+                <Button
+                    variant="ghost"
+                    size="icon"
+                    className="text-white hover:bg-white/20"
+                    onClick={onPrevious}
+                    disabled={!queue.hasPrevious}
+                >
+                    <SkipBack className="h-6 w-6" />
+                </Button>
+                <Button
+                    variant="ghost"
+                    size="icon"
+                    className="text-white hover:bg-white/20"
+                    onClick={isPlaying ? onPause : onPlay}
+                >
+                    {isPlaying ? <Pause className="h-8 w-8" /> : <Play className="h-8 w-8" />}
+                </Button>
+                <Button
+                    variant="ghost"
+                    size="icon"
+                    className="text-white hover:bg-white/20"
+                    onClick={onNext}
+                    disabled={!queue.hasNext}
+                >
+                    <SkipForward className="h-6 w-6" />
+                </Button>
+                <Button
+                    variant="ghost"
+                    size="icon"
+                    className={cn('hover:bg-white/20', queue.repeat === 'off' ? 'text-white' : 'text-green-400')}
+                    onClick={onCycleRepeat}
+                >
+                    {queue.repeat === 'one' ? <Repeat1 className="h-5 w-5" /> : <Repeat className="h-5 w-5" />}
+                </Button>
+                <Button
+                    variant="ghost"
+                    size="icon"
+                    className="text-white hover:bg-white/20"
+                    onClick={() => setShowLyrics(!showLyrics)}
+                >
+                    <Music className="h-6 w-6" />
+                </Button>
+            </div>
+
+            <Presence>
+                {showLyrics && lyrics && (
+                    <MotionDiv
+                        initial={{ y: '100%' }}
+                        animate={{ y: '0%' }}
+                        exit={{ y: '100%' }}
+                        transition={{ type: 'spring', stiffness: 200, damping: 25 }}
+                        className="shrink-0 bg-black/80 backdrop-blur-md p-4 max-h-48 overflow-y-auto"
+                    >
+                        <h4 className="text-lg font-semibold text-white mb-2">Lyrics</h4>
+                        {lyrics.lines.length > 0 ? (
+                            <SyncedLyrics lyrics={lyrics} getCurrentTime={playerController.getCurrentTime} />
+                        ) : (
+                            <p className="text-gray-200 whitespace-pre-line">{lyrics.text}</p>
+                        )}
+                    </MotionDiv>
+                )}
+            </Presence>
+        </MotionDiv>
+    );
+};
@@ -0,0 +1,28 @@
+// Node DOM
+// jsdom installed as the browser globals the app reads, for the Node runners (benchmark.ts,
+// checks.ts). The app reads some of them as it loads, so this runs before it is imported.
+import { JSDOM } from 'jsdom';
+
+const BROWSER_GLOBALS = [
+    'window',
+    'document',
+    'navigator',
+    'localStorage',
+    'HTMLElement',
+    'Element',
+    'Node',
+    'getComputedStyle',
+    'requestAnimationFrame',
+    'cancelAnimationFrame',
+];
+
+// Globals Node already has (e.g. navigator in newer versions) are kept. Returns a container
+// element to render into.
+export const installDom = () => {
+    const { window } = new JSDOM('<!doctype html><div id="root"></div>', { url: 'http://localhost/', pretendToBeVisual: true });
+    const globals = window as unknown as Record<string, unknown>;
+    for (const key of BROWSER_GLOBALS) {
+        if (!(key in globalThis)) Object.defineProperty(globalThis, key, { value: key === 'window' ? window : globals[key], configurable: true });
+    }
+    return window.document.getElementById('root')!;
+};
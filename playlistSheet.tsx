@@ -0,0 +1,98 @@
+// Playlist Sheet
+// The saved playlists, each with play and share buttons. It loads as a chunk of its own, with the
+// sheet primitives, when the browser is idle or the sheet is first opened.
+import React from 'react';
+import { Play, Share } from 'lucide-react';
+import { Button } from '@/components/ui/button';
+import { Sheet, SheetContent, SheetDescription, SheetHeader, SheetTitle } from '@/components/ui/sheet';
+import type { Playlist } from './TuneFlowApp';
+
+// Memoized so that adding a track only re-renders the playlist it was added to.
+const PlaylistSheetItem = React.memo<{
+    playlist: Playlist;
+    onSelectPlaylist: (playlistId: string) => void;
+    onPlayPlaylist: (playlistId: string) => void;
+    onSharePlaylist: (playlistId: string) => void;
+    onClose: () => void;
+}>(({ playlist, onSelectPlaylist, onPlayPlaylist, onSharePlaylist, onClose }) => (
+    <div className="flex items-center gap-2">
+        <Button
+            variant="ghost"
+            className="flex-1 justify-start text-white hover:bg-white/10"
+            onClick={() => {
+                onSelectPlaylist(playlist.id);
+                onClose();
+            }}
+        >
+            {playlist.name} ({playlist.videoIds.length} tracks)
+        </Button>
+        <Button
+            variant="ghost"
+            size="icon"
+            className="text-white hover:bg-white/10"
+            disabled={playlist.videoIds.length === 0}
+            onClick={() => {
+                onPlayPlaylist(playlist.id);
+                onClose();
+            }}
+        >
+            <Play className="h-4 w-4" />
+        </Button>
+        <Button
+            variant="ghost"
+            size="icon"
+            className="text-white hover:bg-white/10"
+            aria-label={`Share ${playlist.name}`}
+            onClick={() => onSharePlaylist(playlist.id)}
+        >
+            <Share className="h-4 w-4" />
+        </Button>
+    </div>
+));
+
+export const PlaylistSheet: React.FC<{
+    open: boolean;
+    onOpenChange: (open: boolean) => void;
+    playlists: Playlist[];
+    onSelectPlaylist: (playlistId: string) => void;
+    onPlayPlaylist: (playlistId: string) => void;
+    onSharePlaylist: (playlistId: string) => void;
+    onClose: () => void;
+}> = ({ open, onOpenChange, playlists, onSelectPlaylist, onPlayPlaylist, onSharePlaylist, onClose }) => (
+    <Sheet open={open} onOpenChange={onOpenChange}>
+        <SheetContent side="bottom" className="bg-gray-900 text-white border-gray-800">
+            <SheetHeader>
+                <SheetTitle>Playlists</SheetTitle>
+                <SheetDescription>
+                    Add to an existing playlist or create a new one.
+                </SheetDescription>
+            </SheetHeader>
+            <div className="space-y-4">
+                {playlists.length > 0 ? (
+                    playlists.map((playlist) => (
+                        <PlaylistSheetItem
+                            key={playlist.id}
+                            playlist={playlist}
+                            onSelectPlaylist={onSelectPlaylist}
+                            onPlayPlaylist={onPlayPlaylist}
+                            onSharePlaylist={onSharePlaylist}
+                            onClose={onClose}
+                        />
+                    ))
+                ) : (
+                    <p className="text-gray-400">No playlists yet.</p>
+                )}
+                <Button
+                    variant="outline"
+                    className="w-full text-white hover:bg-white/10 border-gray-700"
+                    onClick={() => {
+                        // Handle create new playlist
+                        onClose();
+                    }}
+                >
+                    + New Playlist
+                </Button>
+            </div>
+        </SheetContent>
+    </Sheet>
+);
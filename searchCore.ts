@@ -0,0 +1,771 @@
+// Search Core
+// Search and catalog code shared by the app and its compute worker (computeWorker.ts). Nothing
+// here touches the DOM, React or the rest of the app, so the worker loads only this module.
+
+export interface VideoItem {
+    id: string;
+    title: string;
+    artist: string;
+    thumbnail: string;
+    duration: string;
+    url: string; // Add URL for direct playback
+}
+
+// Text Normalization
+// Titles, artists and queries are compared lowercased and split into runs of letters and digits.
+export const normalizeText = (text: string) => text.toLowerCase();
+
+export const tokenize = (normalized: string): string[] => normalized.match(/[\p{L}\p{N}]+/gu) ?? [];
+
+// Search Index
+// Exact substring search, the matching the app started with, kept as part of FuzzySearchIndex.
+// Titles and artists are normalized and tokenized once, when an item is added. Every suffix of
+// every distinct token is stored in a trie, so a partial word (prefix or infix) resolves to its
+// posting lists directly; only the resulting candidates are checked against the substring match.
+interface IndexedDocument {
+    video: VideoItem;
+    title: string;
+    artist: string;
+    titleTokens: string[];
+    artistTokens: string[];
+}
+
+interface TrieNode {
+    children: Map<string, TrieNode>;
+    tokenIds: number[];
+}
+
+const createTrieNode = (): TrieNode => ({ children: new Map(), tokenIds: [] });
+
+export class SearchIndex {
+    private documents: (IndexedDocument | null)[] = [];
+    private docIdsByVideoId = new Map<string, number>();
+    private tokenIds = new Map<string, number>();
+    private postings: number[][] = []; // tokenId -> ascending docIds
+    private trie = createTrieNode();
+    private marks = new Uint32Array(0); // per-doc scratch space for candidatesFor
+    private markBase = 0;
+
+    constructor(videos: VideoItem[] = []) {
+        this.add(videos);
+    }
+
+    get size() {
+        return this.docIdsByVideoId.size;
+    }
+
+    // Re-adding a known id replaces the previous entry; its stale postings are skipped at query time.
+    add(videos: VideoItem[]) {
+        for (const video of videos) {
+            const previousDocId = this.docIdsByVideoId.get(video.id);
+            if (previousDocId !== undefined) {
+                this.documents[previousDocId] = null;
+            }
+
+            const docId = this.documents.length;
+            const title = normalizeText(video.title);
+            const artist = normalizeText(video.artist);
+            const titleTokens = [...new Set(tokenize(title))];
+            const artistTokens = [...new Set(tokenize(artist))];
+            this.documents.push({ video, title, artist, titleTokens, artistTokens });
+            this.docIdsByVideoId.set(video.id, docId);
+
+            for (const token of new Set([...titleTokens, ...artistTokens])) {
+                this.postings[this.internToken(token)].push(docId);
+            }
+        }
+    }
+
+    // Same matches as `title.includes(query) || artist.includes(query)` (case-insensitive), ranked.
+    search(query: string, limit = Infinity): VideoItem[] {
+        const normalizedQuery = normalizeText(query);
+        if (!normalizedQuery) return [];
+
+        const queryTokens = [...new Set(tokenize(normalizedQuery))];
+        const candidates = queryTokens.length > 0
+            ? this.candidatesFor(queryTokens)
+            // Whitespace or punctuation only: nothing to look up, fall back to the normalized fields.
+            : this.documents.keys();
+        return this.rank(candidates, normalizedQuery, queryTokens, limit);
+    }
+
+    // Like `search`, restricted to `videos` (e.g. cached results for a shorter query).
+    searchWithin(videos: VideoItem[], query: string, limit = Infinity): VideoItem[] {
+        const normalizedQuery = normalizeText(query);
+        if (!normalizedQuery) return [];
+
+        const candidates: number[] = [];
+        for (const video of videos) {
+            const docId = this.docIdsByVideoId.get(video.id);
+            if (docId !== undefined) candidates.push(docId);
+        }
+        const queryTokens = [...new Set(tokenize(normalizedQuery))];
+        return this.rank(Uint32Array.from(candidates).sort(), normalizedQuery, queryTokens, limit);
+    }
+
+    // Scores are small integers, so bucketing them keeps the ranking linear; candidates arrive
+    // in docId order, which keeps ties in catalog order.
+    private rank(candidates: Iterable<number>, normalizedQuery: string, queryTokens: string[], limit: number) {
+        const buckets: VideoItem[][] = [];
+        for (const docId of candidates) {
+            const doc = this.documents[docId];
+            if (!doc || (!doc.title.includes(normalizedQuery) && !doc.artist.includes(normalizedQuery))) {
+                continue;
+            }
+            const score = this.score(doc, normalizedQuery, queryTokens);
+            (buckets[score] ??= []).push(doc.video);
+        }
+
+        const results: VideoItem[] = [];
+        for (let score = buckets.length - 1; score >= 0 && results.length < limit; score--) {
+            for (const video of buckets[score] ?? []) {
+                if (results.length >= limit) break;
+                results.push(video);
+            }
+        }
+        return results;
+    }
+
+    private internToken(token: string) {
+        let tokenId = this.tokenIds.get(token);
+        if (tokenId === undefined) {
+            tokenId = this.postings.length;
+            this.tokenIds.set(token, tokenId);
+            this.postings.push([]);
+            for (let start = 0; start < token.length; start++) {
+                let node = this.trie;
+                for (let i = start; i < token.length; i++) {
+                    let child = node.children.get(token[i]);
+                    if (!child) {
+                        child = createTrieNode();
+                        node.children.set(token[i], child);
+                    }
+                    node = child;
+                }
+                node.tokenIds.push(tokenId);
+            }
+        }
+        return tokenId;
+    }
+
+    private matchingTokenIds(queryToken: string) {
+        let node: TrieNode | undefined = this.trie;
+        for (let i = 0; i < queryToken.length && node; i++) {
+            node = node.children.get(queryToken[i]);
+        }
+
+        const tokenIds = new Set<number>();
+        const stack = node ? [node] : [];
+        while (stack.length > 0) {
+            const current = stack.pop()!;
+            for (const tokenId of current.tokenIds) tokenIds.add(tokenId);
+            stack.push(...current.children.values());
+        }
+        return [...tokenIds];
+    }
+
+    // Docs whose tokens cover every query token. Each doc's mark advances one step per query token
+    // it contains, so the intersection costs one typed-array write per posting and no Set churn.
+    private candidatesFor(queryTokens: string[]) {
+        const tokenGroups = queryTokens
+            .map((token) => {
+                const tokenIds = this.matchingTokenIds(token);
+                const postingCount = tokenIds.reduce((sum, tokenId) => sum + this.postings[tokenId].length, 0);
+                return { tokenIds, postingCount };
+            })
+            .sort((a, b) => a.postingCount - b.postingCount);
+
+        if (this.marks.length < this.documents.length || this.markBase > 0xffffffff - tokenGroups.length - 1) {
+            this.marks = new Uint32Array(Math.max(this.documents.length, this.marks.length * 2));
+            this.markBase = 0;
+        }
+        const base = this.markBase;
+        this.markBase += tokenGroups.length + 1;
+
+        const candidates: number[] = [];
+        tokenGroups.forEach(({ tokenIds }, step) => {
+            const isLastStep = step === tokenGroups.length - 1;
+            for (const tokenId of tokenIds) {
+                for (const docId of this.postings[tokenId]) {
+                    const mark = this.marks[docId];
+                    if (step === 0 ? mark > base : mark !== base + step) continue;
+                    this.marks[docId] = base + step + 1;
+                    if (isLastStep) candidates.push(docId);
+                }
+            }
+        });
+        return Uint32Array.from(candidates).sort();
+    }
+
+    // Artist matches outrank title matches, and whole-word matches outrank partial ones.
+    private score(doc: IndexedDocument, normalizedQuery: string, queryTokens: string[]) {
+        let score = 0;
+        if (doc.artist === normalizedQuery) score += 8;
+        else if (doc.artist.startsWith(normalizedQuery)) score += 4;
+        if (doc.title.startsWith(normalizedQuery)) score += 3;
+        for (const token of queryTokens) {
+            if (doc.artistTokens.includes(token)) score += 2;
+            if (doc.titleTokens.includes(token)) score += 1;
+        }
+        return score;
+    }
+}
+
+// Fuzzy Search
+// Typo-tolerant, ranked search. Every distinct title and artist token is indexed by its trigrams.
+// Each query term collects the tokens that share enough trigrams with it, and only those are
+// checked against a bounded edit distance. The last term may also match as a prefix, since it is
+// usually still being typed. Documents with a match for every term are scored with BM25, artist
+// matches weighted up, and a top-k heap keeps only the best. Ties keep catalog order. Typo
+// tolerance is added to the exact matching, not put in its place: every track a SearchIndex finds
+// for the query (i.e. whose title or artist contains it) is returned too, after the ranked ones.
+const BM25_K1 = 1.2;
+const BM25_B = 0.75;
+const ARTIST_FIELD_WEIGHT = 2;
+const PREFIX_MATCH_WEIGHT = 0.8;
+
+const maxEditsFor = (length: number) => (length <= 3 ? 0 : length <= 7 ? 1 : 2);
+
+// Padded so that a term's start (and, unless `prefix`, its end) count as grams too.
+const trigramsOf = (term: string, prefix = false) => {
+    const padded = `$$${term}${prefix ? '' : '$'}`;
+    const grams = new Set<string>();
+    for (let i = 0; i + 3 <= padded.length; i++) grams.add(padded.slice(i, i + 3));
+    return [...grams];
+};
+
+// Optimal-string-alignment distance from `query` to all of `term` and to its closest prefix.
+// Either is Infinity once it must exceed `maxEdits`.
+const boundedEditDistance = (query: string, term: string, maxEdits: number) => {
+    const m = query.length;
+    const n = Math.min(term.length, m + maxEdits); // longer prefixes can't be closer
+    let before = new Array<number>(n + 1).fill(0);
+    let previous = Array.from({ length: n + 1 }, (_, j) => j);
+    let current = new Array<number>(n + 1).fill(0);
+    for (let i = 1; i <= m; i++) {
+        current[0] = i;
+        let rowMin = i;
+        for (let j = 1; j <= n; j++) {
+            const cost = query[i - 1] === term[j - 1] ? 0 : 1;
+            let distance = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost);
+            if (i > 1 && j > 1 && query[i - 1] === term[j - 2] && query[i - 2] === term[j - 1]) {
+                distance = Math.min(distance, before[j - 2] + 1);
+            }
+            current[j] = distance;
+            rowMin = Math.min(rowMin, distance);
+        }
+        if (rowMin > maxEdits) return { full: Infinity, prefix: Infinity };
+        [before, previous, current] = [previous, current, before];
+    }
+    const full = n === term.length && previous[n] <= maxEdits ? previous[n] : Infinity;
+    const prefix = Math.min(...previous);
+    return { full, prefix: prefix <= maxEdits ? prefix : Infinity };
+};
+
+// Keeps the `k` best (score, docId) pairs in a binary min-heap; ties favour the lower docId.
+class TopK {
+    private docIds: number[] = [];
+    private scores: number[] = [];
+
+    constructor(private k: number) {}
+
+    push(docId: number, score: number) {
+        if (this.k <= 0) return;
+        if (this.docIds.length < this.k) {
+            this.docIds.push(docId);
+            this.scores.push(score);
+            this.siftUp(this.docIds.length - 1);
+        } else if (this.worse(0, docId, score)) {
+            this.docIds[0] = docId;
+            this.scores[0] = score;
+            this.siftDown(0);
+        }
+    }
+
+    // Best first.
+    drain() {
+        const docIds: number[] = [];
+        while (this.docIds.length > 0) {
+            docIds.push(this.docIds[0]);
+            const lastDoc = this.docIds.pop()!;
+            const lastScore = this.scores.pop()!;
+            if (this.docIds.length > 0) {
+                this.docIds[0] = lastDoc;
+                this.scores[0] = lastScore;
+                this.siftDown(0);
+            }
+        }
+        return docIds.reverse();
+    }
+
+    // Whether the entry at `i` ranks below (docId, score).
+    private worse(i: number, docId: number, score: number) {
+        return this.scores[i] < score || (this.scores[i] === score && this.docIds[i] > docId);
+    }
+
+    private siftUp(i: number) {
+        while (i > 0) {
+            const parent = (i - 1) >> 1;
+            if (!this.worse(i, this.docIds[parent], this.scores[parent])) break;
+            this.swap(i, parent);
+            i = parent;
+        }
+    }
+
+    private siftDown(i: number) {
+        for (;;) {
+            let smallest = i;
+            for (const child of [2 * i + 1, 2 * i + 2]) {
+                if (child < this.docIds.length && this.worse(child, this.docIds[smallest], this.scores[smallest])) {
+                    smallest = child;
+                }
+            }
+            if (smallest === i) return;
+            this.swap(i, smallest);
+            i = smallest;
+        }
+    }
+
+    private swap(a: number, b: number) {
+        [this.docIds[a], this.docIds[b]] = [this.docIds[b], this.docIds[a]];
+        [this.scores[a], this.scores[b]] = [this.scores[b], this.scores[a]];
+    }
+}
+
+interface TermPostings {
+    docIds: number[];
+    titleTf: number[];
+    artistTf: number[];
+}
+
+const termFrequencies = (tokens: string[]) => {
+    const counts = new Map<string, number>();
+    for (const token of tokens) counts.set(token, (counts.get(token) ?? 0) + 1);
+    return counts;
+};
+
+export class FuzzySearchIndex {
+    private documents: (VideoItem | null)[] = [];
+    private docIdsByVideoId = new Map<string, number>();
+    private titleLengths: number[] = [];
+    private artistLengths: number[] = [];
+    private liveDocuments = 0;
+    private totalTitleLength = 0;
+    private totalArtistLength = 0;
+    private termIds = new Map<string, number>();
+    private terms: string[] = [];
+    private postings: TermPostings[] = [];
+    private termsByTrigram = new Map<string, number[]>();
+    // Per-query scratch space, reset after use
+    private scores = new Float64Array(0);
+    private termScores = new Float64Array(0);
+    private matchedTerms = new Uint16Array(0);
+    private sharedGrams = new Uint16Array(0);
+    private substrings = new SearchIndex();
+
+    constructor(videos: VideoItem[] = []) {
+        this.add(videos);
+    }
+
+    get size() {
+        return this.docIdsByVideoId.size;
+    }
+
+    // Re-adding a video id replaces the earlier entry.
+    add(videos: VideoItem[]) {
+        this.substrings.add(videos);
+        for (const video of videos) {
+            const previous = this.docIdsByVideoId.get(video.id);
+            if (previous !== undefined) {
+                this.documents[previous] = null;
+                this.liveDocuments--;
+                this.totalTitleLength -= this.titleLengths[previous];
+                this.totalArtistLength -= this.artistLengths[previous];
+            }
+
+            const docId = this.documents.length;
+            const titleTokens = tokenize(normalizeText(video.title));
+            const artistTokens = tokenize(normalizeText(video.artist));
+            this.documents.push(video);
+            this.docIdsByVideoId.set(video.id, docId);
+            this.titleLengths.push(titleTokens.length);
+            this.artistLengths.push(artistTokens.length);
+            this.liveDocuments++;
+            this.totalTitleLength += titleTokens.length;
+            this.totalArtistLength += artistTokens.length;
+
+            const titleCounts = termFrequencies(titleTokens);
+            const artistCounts = termFrequencies(artistTokens);
+            for (const term of new Set([...titleTokens, ...artistTokens])) {
+                const postings = this.postings[this.internTerm(term)];
+                postings.docIds.push(docId);
+                postings.titleTf.push(titleCounts.get(term) ?? 0);
+                postings.artistTf.push(artistCounts.get(term) ?? 0);
+            }
+        }
+    }
+
+    search(query: string, limit = Infinity): VideoItem[] {
+        return this.withSubstringMatches(this.rank(query, limit), () => this.substrings.search(query, limit), limit);
+    }
+
+    // Like `search`, restricted to `videos` (e.g. cached results for a shorter query).
+    searchWithin(videos: VideoItem[], query: string, limit = Infinity): VideoItem[] {
+        const allowed = new Set<number>();
+        for (const video of videos) {
+            const docId = this.docIdsByVideoId.get(video.id);
+            if (docId !== undefined) allowed.add(docId);
+        }
+        const ranked = this.rank(query, limit, allowed);
+        return this.withSubstringMatches(ranked, () => this.substrings.searchWithin(videos, query, limit), limit);
+    }
+
+    // Appends the substring matches the ranking missed, e.g. infixes ("psody") and short partial
+    // words that aren't the last term. At most ranked.length of the substring matches repeat a
+    // ranked one, so `limit` of them always fill the results up to `limit`.
+    private withSubstringMatches(ranked: VideoItem[], substringMatches: () => VideoItem[], limit: number) {
+        if (ranked.length >= limit) return ranked;
+        const found = new Set(ranked.map((video) => video.id));
+        for (const video of substringMatches()) {
+            if (ranked.length >= limit) break;
+            if (!found.has(video.id)) ranked.push(video);
+        }
+        return ranked;
+    }
+
+    private rank(query: string, limit: number, allowed?: Set<number>) {
+        const queryTerms = tokenize(normalizeText(query));
+        if (queryTerms.length === 0) return [];
+        this.ensureScratch();
+
+        const avgTitleLength = this.totalTitleLength / Math.max(1, this.liveDocuments) || 1;
+        const avgArtistLength = this.totalArtistLength / Math.max(1, this.liveDocuments) || 1;
+        const { scores, termScores, matchedTerms } = this;
+        let candidates: number[] = [];
+
+        // A document stays a candidate only while it has matched every term so far
+        for (let i = 0; i < queryTerms.length; i++) {
+            const touched: number[] = [];
+            for (const { termId, similarity } of this.matchTerms(queryTerms[i], i === queryTerms.length - 1)) {
+                const { docIds, titleTf, artistTf } = this.postings[termId];
+                const df = docIds.length;
+                const idf = Math.log(1 + (this.liveDocuments - df + 0.5) / (df + 0.5));
+                for (let p = 0; p < df; p++) {
+                    const docId = docIds[p];
+                    if (matchedTerms[docId] !== i || !this.documents[docId] || (allowed && !allowed.has(docId))) continue;
+                    const tf =
+                        titleTf[p] / (1 - BM25_B + (BM25_B * this.titleLengths[docId]) / avgTitleLength) +
+                        (ARTIST_FIELD_WEIGHT * artistTf[p]) / (1 - BM25_B + (BM25_B * this.artistLengths[docId]) / avgArtistLength);
+                    const score = similarity * idf * (tf / (BM25_K1 + tf));
+                    if (termScores[docId] === 0) touched.push(docId);
+                    if (score > termScores[docId]) termScores[docId] = score;
+                }
+            }
+            for (const docId of touched) {
+                scores[docId] += termScores[docId];
+                termScores[docId] = 0;
+                matchedTerms[docId] = i + 1;
+            }
+            if (i === 0) candidates = touched;
+            if (touched.length === 0) break;
+        }
+
+        const top = new TopK(limit);
+        for (const docId of candidates) {
+            if (matchedTerms[docId] === queryTerms.length) top.push(docId, scores[docId]);
+            scores[docId] = 0;
+            matchedTerms[docId] = 0;
+        }
+        return top.drain().map((docId) => this.documents[docId]!);
+    }
+
+    // Indexed terms close enough to `queryTerm`, with a similarity in (0, 1].
+    private matchTerms(queryTerm: string, allowPrefix: boolean) {
+        const maxEdits = maxEditsFor(queryTerm.length);
+        const exactId = this.termIds.get(queryTerm);
+        if (maxEdits === 0 && !allowPrefix) return exactId === undefined ? [] : [{ termId: exactId, similarity: 1 }];
+
+        // Each edit changes at most three trigrams, so closer terms must share the rest
+        const grams = trigramsOf(queryTerm, allowPrefix);
+        const minShared = Math.max(1, grams.length - 3 * maxEdits);
+        const { sharedGrams } = this;
+        const seen: number[] = [];
+        for (const gram of grams) {
+            for (const termId of this.termsByTrigram.get(gram) ?? []) {
+                if (sharedGrams[termId]++ === 0) seen.push(termId);
+            }
+        }
+
+        const matches: { termId: number; similarity: number }[] = [];
+        for (const termId of seen) {
+            const shared = sharedGrams[termId];
+            sharedGrams[termId] = 0;
+            if (shared < minShared) continue;
+            const term = this.terms[termId];
+            if (!allowPrefix && Math.abs(term.length - queryTerm.length) > maxEdits) continue;
+            const { full, prefix } = boundedEditDistance(queryTerm, term, maxEdits);
+            if (full !== Infinity) {
+                matches.push({ termId, similarity: 1 / (1 + full) });
+            } else if (allowPrefix && prefix !== Infinity) {
+                matches.push({ termId, similarity: PREFIX_MATCH_WEIGHT / (1 + prefix) });
+            }
+        }
+        return matches;
+    }
+
+    private internTerm(term: string) {
+        let termId = this.termIds.get(term);
+        if (termId === undefined) {
+            termId = this.terms.push(term) - 1;
+            this.termIds.set(term, termId);
+            this.postings.push({ docIds: [], titleTf: [], artistTf: [] });
+            for (const gram of trigramsOf(term)) {
+                let termIds = this.termsByTrigram.get(gram);
+                if (!termIds) this.termsByTrigram.set(gram, (termIds = []));
+                termIds.push(termId);
+            }
+        }
+        return termId;
+    }
+
+    private ensureScratch() {
+        if (this.scores.length < this.documents.length) {
+            const size = Math.max(this.documents.length, this.scores.length * 2);
+            this.scores = new Float64Array(size);
+            this.termScores = new Float64Array(size);
+            this.matchedTerms = new Uint16Array(size);
+        }
+        if (this.sharedGrams.length < this.terms.length) {
+            this.sharedGrams = new Uint16Array(Math.max(this.terms.length, this.sharedGrams.length * 2));
+        }
+    }
+}
+
+// Track Table
+// A columnar store for large track collections. Artists are interned, durations are kept as whole
+// seconds in a typed array, and thumbnail and watch URLs are derived from the id. Only values that
+// don't follow the usual pattern are stored, in a sparse map. The compute worker keeps its copy of
+// the catalog in one; the app itself holds plain VideoItems. row() returns a view that reads the
+// columns in place. Its fields are getters, which spreading, structuredClone and postMessage don't
+// copy, so anything that copies a track takes toVideoItem() instead.
+interface IrregularTrackFields {
+    thumbnail?: string;
+    url?: string;
+    duration?: string;
+}
+
+// "3:32" -> 212
+export const durationSeconds = (duration: string) => duration.split(':').reduce((total, part) => total * 60 + Number(part), 0);
+
+// 212 -> "3:32", 3723 -> "1:02:03"
+export const formatDuration = (totalSeconds: number) => {
+    const hours = Math.floor(totalSeconds / 3600);
+    const minutes = Math.floor(totalSeconds / 60) % 60;
+    const ss = String(totalSeconds % 60).padStart(2, '0');
+    return hours > 0 ? `${hours}:${String(minutes).padStart(2, '0')}:${ss}` : `${minutes}:${ss}`;
+};
+
+export const watchUrl = (videoId: string) => `https://www.youtube.com/watch?v=${videoId}`;
+
+// The app's thumbnailUrl(videoId, 'mqdefault'), which YouTube's own results use.
+const defaultThumbnailUrl = (videoId: string) => `https://img.youtube.com/vi/${videoId}/mqdefault.jpg`;
+
+export class TrackRow implements VideoItem {
+    constructor(private table: TrackTable, readonly row: number) {}
+
+    get id() {
+        return this.table.idAt(this.row);
+    }
+
+    get title() {
+        return this.table.titleAt(this.row);
+    }
+
+    get artist() {
+        return this.table.artistAt(this.row);
+    }
+
+    get duration() {
+        return this.table.durationAt(this.row);
+    }
+
+    get seconds() {
+        return this.table.secondsAt(this.row);
+    }
+
+    get thumbnail() {
+        return this.table.thumbnailAt(this.row);
+    }
+
+    get url() {
+        return this.table.urlAt(this.row);
+    }
+
+    // A plain copy, for anything that copies, serializes or outlives the table.
+    toVideoItem(): VideoItem {
+        const { id, title, artist, thumbnail, duration, url } = this;
+        return { id, title, artist, thumbnail, duration, url };
+    }
+
+    toJSON() {
+        return this.toVideoItem();
+    }
+}
+
+export class TrackTable {
+    private ids: string[] = [];
+    private titles: string[] = [];
+    private artistIds: Uint32Array;
+    private seconds: Uint32Array;
+    private artists: string[] = [];
+    private artistIdsByName = new Map<string, number>();
+    private rowsById = new Map<string, number>();
+    private irregular = new Map<number, IrregularTrackFields>();
+
+    constructor(videos: VideoItem[] = []) {
+        const capacity = Math.max(16, videos.length);
+        this.artistIds = new Uint32Array(capacity);
+        this.seconds = new Uint32Array(capacity);
+        this.add(videos);
+    }
+
+    get size() {
+        return this.ids.length;
+    }
+
+    get artistCount() {
+        return this.artists.length;
+    }
+
+    // Adds or replaces tracks by id; returns their rows. Rows are assigned in insertion order.
+    add(videos: VideoItem[]) {
+        return videos.map((video) => this.upsert(video));
+    }
+
+    upsert(video: VideoItem) {
+        let row = this.rowsById.get(video.id);
+        if (row === undefined) {
+            row = this.ids.length;
+            if (row === this.seconds.length) this.grow();
+            this.ids.push(video.id);
+            this.titles.push(video.title);
+            this.rowsById.set(video.id, row);
+        } else {
+            this.titles[row] = video.title;
+        }
+
+        let artistId = this.artistIdsByName.get(video.artist);
+        if (artistId === undefined) {
+            artistId = this.artists.push(video.artist) - 1;
+            this.artistIdsByName.set(video.artist, artistId);
+        }
+        this.artistIds[row] = artistId;
+        this.seconds[row] = durationSeconds(video.duration);
+
+        const irregular: IrregularTrackFields = {};
+        if (video.thumbnail !== defaultThumbnailUrl(video.id)) irregular.thumbnail = video.thumbnail;
+        if (video.url !== watchUrl(video.id)) irregular.url = video.url;
+        if (video.duration !== formatDuration(this.seconds[row])) irregular.duration = video.duration;
+        if (Object.keys(irregular).length > 0) this.irregular.set(row, irregular);
+        else this.irregular.delete(row);
+        return row;
+    }
+
+    rowOf(videoId: string) {
+        return this.rowsById.get(videoId);
+    }
+
+    row(row: number) {
+        return new TrackRow(this, row);
+    }
+
+    get(videoId: string) {
+        const row = this.rowsById.get(videoId);
+        return row === undefined ? undefined : new TrackRow(this, row);
+    }
+
+    idAt(row: number) {
+        return this.ids[row];
+    }
+
+    titleAt(row: number) {
+        return this.titles[row];
+    }
+
+    artistAt(row: number) {
+        return this.artists[this.artistIds[row]];
+    }
+
+    secondsAt(row: number) {
+        return this.seconds[row];
+    }
+
+    durationAt(row: number) {
+        return this.irregular.get(row)?.duration ?? formatDuration(this.seconds[row]);
+    }
+
+    thumbnailAt(row: number) {
+        return this.irregular.get(row)?.thumbnail ?? defaultThumbnailUrl(this.ids[row]);
+    }
+
+    urlAt(row: number) {
+        return this.irregular.get(row)?.url ?? watchUrl(this.ids[row]);
+    }
+
+    *[Symbol.iterator]() {
+        for (let row = 0; row < this.ids.length; row++) yield new TrackRow(this, row);
+    }
+
+    private grow() {
+        const artistIds = new Uint32Array(this.artistIds.length * 2);
+        artistIds.set(this.artistIds);
+        this.artistIds = artistIds;
+        const seconds = new Uint32Array(this.seconds.length * 2);
+        seconds.set(this.seconds);
+        this.seconds = seconds;
+    }
+}
+
+// Compute Protocol
+// Requests and results refer to tracks by their position in the catalog the worker was sent.
+export type ComputeRequest =
+    | { type: 'add'; videos: VideoItem[] }
+    | { type: 'search'; query: string; limit: number }
+    | { type: 'searchWithin'; positions: Uint32Array; query: string; limit: number };
+
+export interface ComputeMessage {
+    id: number;
+    request: ComputeRequest;
+}
+
+export interface ComputeReply {
+    id: number;
+    positions?: Uint32Array;
+    error?: string;
+}
+
+// The worker's copy of the catalog is a TrackTable, whose rows are the shared positions.
+export class ComputeState {
+    private index = new FuzzySearchIndex();
+    private table = new TrackTable();
+
+    run(request: ComputeRequest): Uint32Array {
+        switch (request.type) {
+            case 'add':
+                this.index.add(this.table.add(request.videos).map((row) => this.table.row(row)));
+                return new Uint32Array(0);
+            case 'search':
+                return this.toPositions(this.index.search(request.query, request.limit));
+            case 'searchWithin':
+                return this.toPositions(this.index.searchWithin(this.toVideos(request.positions), request.query, request.limit));
+        }
+    }
+
+    private toVideos(positions: Uint32Array) {
+        return Array.from(positions, (position) => this.table.row(position));
+    }
+
+    private toPositions(videos: VideoItem[]) {
+        return Uint32Array.from(videos, (video) => (video as TrackRow).row);
+    }
+}
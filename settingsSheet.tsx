@@ -0,0 +1,189 @@
+// Settings Sheet
+// Dark mode, the offline cache's hit ratios, resetting the saved data and the hidden diagnostics
+// panel. It loads as a chunk of its own, with the sheet primitives, when the browser is idle or the
+// settings button is hovered.
+import React, { useEffect, useState } from 'react';
+import { AlertCircle, Moon, Sun } from 'lucide-react';
+import { Button } from '@/components/ui/button';
+import { Sheet, SheetContent, SheetDescription, SheetHeader, SheetTitle } from '@/components/ui/sheet';
+import { cn } from '@/lib/utils';
+import type { ServiceWorkerCacheName, ServiceWorkerCacheStats } from './sw';
+import { fetchServiceWorkerStats, telemetry } from './TuneFlowApp';
+
+const SERVICE_WORKER_CACHE_LABELS: Record<ServiceWorkerCacheName, string> = {
+    shell: 'App',
+    api: 'Search & metadata',
+    thumbnails: 'Thumbnails',
+};
+
+// Hit ratios of the service worker's caches, refreshed every few seconds while shown.
+const OfflineCachePanel: React.FC = () => {
+    const [stats, setStats] = useState<ServiceWorkerCacheStats[]>([]);
+
+    useEffect(() => {
+        let active = true;
+        const refresh = () => fetchServiceWorkerStats().then((next) => active && setStats(next));
+        void refresh();
+        const timer = setInterval(refresh, 3000);
+        return () => {
+            active = false;
+            clearInterval(timer);
+        };
+    }, []);
+
+    return (
+        <div>
+            <h3 className="text-lg font-medium mb-2">Offline Cache</h3>
+            {stats.length > 0 ? (
+                <table className="w-full text-xs text-gray-300">
+                    <thead className="text-gray-500">
+                        <tr>
+                            <th className="text-left font-normal">Cache</th>
+                            <th className="text-right font-normal">Entries</th>
+                            <th className="text-right font-normal">Requests</th>
+                            <th className="text-right font-normal">Hit ratio</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {stats.map(({ cache, hits, misses, entries }) => (
+                            <tr key={cache}>
+                                <td>{SERVICE_WORKER_CACHE_LABELS[cache]}</td>
+                                <td className="text-right">{entries}</td>
+                                <td className="text-right">{hits + misses}</td>
+                                <td className="text-right">
+                                    {hits + misses > 0 ? `${Math.round((hits / (hits + misses)) * 100)}%` : '-'}
+                                </td>
+                            </tr>
+                        ))}
+                    </tbody>
+                </table>
+            ) : (
+                <p className="text-sm text-gray-400">The offline cache isn't active in this browser yet.</p>
+            )}
+        </div>
+    );
+};
+
+const DIAGNOSTICS_UNLOCK_TAPS = 5;
+
+const formatMs = (ms: number) => (ms < 10 ? ms.toFixed(1) : Math.round(ms).toString());
+
+// Telemetry summaries, refreshed every second while shown, with export and clear.
+const DiagnosticsPanel: React.FC = () => {
+    const [metrics, setMetrics] = useState(() => telemetry.summaries());
+
+    useEffect(() => {
+        const timer = setInterval(() => setMetrics(telemetry.summaries()), 1000);
+        return () => clearInterval(timer);
+    }, []);
+
+    const handleExport = () => {
+        const url = URL.createObjectURL(new Blob([telemetry.export()], { type: 'application/json' }));
+        const link = document.createElement('a');
+        link.href = url;
+        link.download = `tuneflow-telemetry-${Date.now()}.json`;
+        link.click();
+        URL.revokeObjectURL(url);
+    };
+
+    const handleClear = () => {
+        telemetry.clear();
+        setMetrics([]);
+    };
+
+    return (
+        <div>
+            <h3 className="text-lg font-medium mb-2">Diagnostics</h3>
+            {metrics.length > 0 ? (
+                <table className="w-full text-xs text-gray-300 mb-4">
+                    <thead className="text-gray-500">
+                        <tr>
+                            <th className="text-left font-normal">Metric (ms)</th>
+                            <th className="text-right font-normal">n</th>
+                            <th className="text-right font-normal">p50</th>
+                            <th className="text-right font-normal">p95</th>
+                            <th className="text-right font-normal">p99</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {metrics.map((metric) => (
+                            <tr key={metric.name}>
+                                <td className="truncate max-w-[10rem]">{metric.name}</td>
+                                <td className="text-right">{metric.count}</td>
+                                <td className="text-right">{formatMs(metric.p50)}</td>
+                                <td className="text-right">{formatMs(metric.p95)}</td>
+                                <td className="text-right">{formatMs(metric.p99)}</td>
+                            </tr>
+                        ))}
+                    </tbody>
+                </table>
+            ) : (
+                <p className="text-sm text-gray-400 mb-4">Nothing recorded yet.</p>
+            )}
+            <div className="flex gap-2">
+                <Button variant="outline" className="flex-1 text-gray-900" onClick={handleExport}>
+                    Export
+                </Button>
+                <Button variant="outline" className="flex-1 text-gray-900" onClick={handleClear}>
+                    Clear
+                </Button>
+            </div>
+        </div>
+    );
+};
+
+// The diagnostics panel stays hidden until the title is tapped DIAGNOSTICS_UNLOCK_TAPS times.
+export const SettingsSheet: React.FC<{
+    open: boolean;
+    onOpenChange: (open: boolean) => void;
+    isDarkMode: boolean;
+    onToggleDarkMode: () => void;
+    onResetData: () => void;
+}> = ({ open, onOpenChange, isDarkMode, onToggleDarkMode, onResetData }) => {
+    const [titleTaps, setTitleTaps] = useState(0);
+
+    return (
+        <Sheet open={open} onOpenChange={onOpenChange}>
+            <SheetContent side="right" className="bg-gray-900 text-white border-gray-800 w-full md:max-w-md">
+                <SheetHeader>
+                    <SheetTitle onClick={() => setTitleTaps((taps) => taps + 1)}>Settings</SheetTitle>
+                    <SheetDescription>
+                        Customize the app to your preferences.
+                    </SheetDescription>
+                </SheetHeader>
+                <div className="space-y-6">
+                    <div className="flex items-center justify-between">
+                        <span className="text-lg font-medium">Dark Mode</span>
+                        <Button
+                            variant="outline"
+                            size="icon"
+                            className={cn(
+                                "w-12 h-12 rounded-full",
+                                isDarkMode ? "bg-gray-800 text-white" : "bg-gray-200 text-gray-900",
+                                "hover:bg-gray-700",
+                            )}
+                            onClick={onToggleDarkMode}
+                        >
+                            {isDarkMode ? <Sun className="h-6 w-6" /> : <Moon className="h-6 w-6" />}
+                        </Button>
+                    </div>
+                    <OfflineCachePanel />
+                    <div>
+                        <h3 className="text-lg font-medium mb-2">Data</h3>
+                        <p className="text-sm text-gray-400 mb-4">
+                            Clear your saved playlists and history. This action cannot be undone.
+                        </p>
+                        <Button
+                            variant="destructive"
+                            className="w-full bg-red-500/90 hover:bg-red-500"
+                            onClick={onResetData}
+                        >
+                            <AlertCircle className="mr-2 h-4 w-4" /> Reset Data
+                        </Button>
+                    </div>
+                    {titleTaps >= DIAGNOSTICS_UNLOCK_TAPS && <DiagnosticsPanel />}
+                </div>
+            </SheetContent>
+        </Sheet>
+    );
+};
@@ -0,0 +1,268 @@
+// Service Worker
+// Built as its own entry to /sw.js and served from the site root, so its scope covers the app. It
+// depends on nothing else in the app; the page only talks to it through ServiceWorkerMessage. The
+// app shell comes from a precache manifest injected at build time (workbox-build's injectManifest
+// fills in `self.__WB_MANIFEST`). Its content-hashed files are precached on install and served
+// cache-first. A build without the manifest step leaves it empty; the page's own scripts, styles
+// and fonts (lazy chunks included) are then cached as they load and served stale-while-revalidate,
+// so a warm start still works offline. Navigations within the scope are served the cached page at
+// once and refreshed behind it; offline, any navigation gets the cached page. Data API responses
+// are served stale-while-revalidate and thumbnails cache-first, each from a bounded cache. Opaque
+// responses are never stored: they can't be checked, and the browser pads each one's quota use.
+// Shell and API cache names carry a version derived from the manifest, which changes with each
+// deploy, and activation deletes older versions. Hits and misses per cache persist in a small meta
+// cache and are shown in Settings.
+const SERVICE_WORKER_CACHE_PREFIX = 'tuneflow-';
+const SERVICE_WORKER_SCHEMA = 1; // bump to drop every cache, thumbnails included
+const SERVICE_WORKER_META_CACHE = `${SERVICE_WORKER_CACHE_PREFIX}meta`;
+const MAX_CACHED_API_RESPONSES = 200;
+const MAX_CACHED_THUMBNAILS = 500;
+const MAX_RUNTIME_SHELL_FILES = 100;
+const RUNTIME_SHELL_DESTINATIONS = new Set(['script', 'style', 'font', 'worker']);
+const THUMBNAIL_HOSTS = new Set(['img.youtube.com', 'i.ytimg.com']);
+const YOUTUBE_API_BASE_URL = 'https://www.googleapis.com/youtube/v3'; // as in the app's API client
+
+export type ServiceWorkerCacheName = 'shell' | 'api' | 'thumbnails';
+type ServiceWorkerCacheCounts = Record<ServiceWorkerCacheName, { hits: number; misses: number }>;
+
+export interface ServiceWorkerCacheStats {
+    cache: ServiceWorkerCacheName;
+    hits: number;
+    misses: number;
+    entries: number;
+}
+
+export type ServiceWorkerMessage = { type: 'stats' };
+
+type PrecacheEntry = string | { url: string; revision: string | null };
+
+interface ServiceWorkerEvent {
+    waitUntil(promise: Promise<unknown>): void;
+}
+
+interface ServiceWorkerFetchEvent extends ServiceWorkerEvent {
+    request: Request;
+    respondWith(response: Promise<Response>): void;
+}
+
+interface ServiceWorkerMessageEvent extends ServiceWorkerEvent {
+    data: ServiceWorkerMessage;
+    ports: readonly MessagePort[];
+}
+
+interface ServiceWorkerScope {
+    registration: { scope: string };
+    clients: { claim(): Promise<void> };
+    __WB_MANIFEST?: PrecacheEntry[];
+    addEventListener(type: 'install' | 'activate', listener: (event: ServiceWorkerEvent) => void): void;
+    addEventListener(type: 'fetch', listener: (event: ServiceWorkerFetchEvent) => void): void;
+    addEventListener(type: 'message', listener: (event: ServiceWorkerMessageEvent) => void): void;
+}
+
+// Changes whenever the manifest does, i.e. with every deploy that changes a shell file.
+const serviceWorkerVersion = (manifest: PrecacheEntry[]) => {
+    const text = JSON.stringify(manifest);
+    let hash = 0;
+    for (let i = 0; i < text.length; i++) hash = (Math.imul(hash, 31) + text.charCodeAt(i)) | 0;
+    return `${SERVICE_WORKER_SCHEMA}.${(hash >>> 0).toString(36)}`;
+};
+
+// A revisioned entry's URL gets its revision as a query, so a new revision is a new cache key.
+const precacheUrl = (entry: PrecacheEntry, scope: string) => {
+    const url = new URL(typeof entry === 'string' ? entry : entry.url, scope);
+    if (typeof entry !== 'string' && entry.revision) url.searchParams.set('__revision', entry.revision);
+    return url.href;
+};
+
+const withoutRevision = (url: string) => {
+    const parsed = new URL(url);
+    parsed.searchParams.delete('__revision');
+    parsed.hash = '';
+    return parsed.href;
+};
+
+class ServiceWorkerRouter {
+    private cacheNames: Record<ServiceWorkerCacheName, string>;
+    private shellUrls: Map<string, string>; // request URL -> precached URL
+    private runtimeShell: boolean; // no manifest: shell files are cached as they are fetched
+    private counts: ServiceWorkerCacheCounts = {
+        shell: { hits: 0, misses: 0 },
+        api: { hits: 0, misses: 0 },
+        thumbnails: { hits: 0, misses: 0 },
+    };
+    private statsUrl: string;
+    private restored: Promise<void>;
+    private saving: Promise<void> | null = null;
+    private writesSinceTrim = new Map<ServiceWorkerCacheName, number>();
+
+    constructor(private scope: string, manifest: PrecacheEntry[]) {
+        const version = serviceWorkerVersion(manifest);
+        this.cacheNames = {
+            shell: `${SERVICE_WORKER_CACHE_PREFIX}shell-${version}`,
+            api: `${SERVICE_WORKER_CACHE_PREFIX}api-${version}`,
+            thumbnails: `${SERVICE_WORKER_CACHE_PREFIX}thumbnails-${SERVICE_WORKER_SCHEMA}`,
+        };
+        // The page itself is part of the shell whether or not the manifest lists it
+        const urls = [scope, ...manifest.map((entry) => precacheUrl(entry, scope))];
+        this.shellUrls = new Map(urls.map((url) => [withoutRevision(url), url]));
+        this.runtimeShell = manifest.length === 0;
+        this.statsUrl = new URL('__tuneflow/cache-stats', scope).href;
+        this.restored = this.restoreStats();
+    }
+
+    async install() {
+        const cache = await caches.open(this.cacheNames.shell);
+        await cache.addAll([...new Set(this.shellUrls.values())]);
+    }
+
+    // Deletes the caches of other versions.
+    async activate() {
+        const current = new Set([...Object.values(this.cacheNames), SERVICE_WORKER_META_CACHE]);
+        const names = await caches.keys();
+        await Promise.all(
+            names
+                .filter((name) => name.startsWith(SERVICE_WORKER_CACHE_PREFIX) && !current.has(name))
+                .map((name) => caches.delete(name)),
+        );
+    }
+
+    route(request: Request): ServiceWorkerCacheName | null {
+        if (request.method !== 'GET') return null;
+        if (THUMBNAIL_HOSTS.has(new URL(request.url).hostname)) return 'thumbnails';
+        if (request.url.startsWith(YOUTUBE_API_BASE_URL)) return 'api';
+        if (request.mode === 'navigate' || this.shellUrls.has(withoutRevision(request.url))) return 'shell';
+        const sameOrigin = new URL(request.url).origin === new URL(this.scope).origin;
+        if (this.runtimeShell && sameOrigin && RUNTIME_SHELL_DESTINATIONS.has(request.destination)) return 'shell';
+        return null;
+    }
+
+    // Requests with no route are left to the browser.
+    handle(event: ServiceWorkerFetchEvent) {
+        const name = this.route(event.request);
+        if (name === 'shell' && event.request.mode === 'navigate') {
+            event.respondWith(this.navigate(event));
+        } else if (name === 'shell' && !this.shellUrls.has(withoutRevision(event.request.url))) {
+            event.respondWith(this.staleWhileRevalidate(name, event, MAX_RUNTIME_SHELL_FILES));
+        } else if (name === 'shell') {
+            event.respondWith(this.cacheFirst(name, event, Infinity, this.shellUrls.get(withoutRevision(event.request.url))));
+        } else if (name === 'thumbnails') {
+            event.respondWith(this.cacheFirst(name, event, MAX_CACHED_THUMBNAILS));
+        } else if (name === 'api') {
+            event.respondWith(this.staleWhileRevalidate(name, event, MAX_CACHED_API_RESPONSES));
+        }
+    }
+
+    async stats(): Promise<ServiceWorkerCacheStats[]> {
+        await this.restored;
+        return Promise.all(
+            (Object.keys(this.counts) as ServiceWorkerCacheName[]).map(async (cache) => ({
+                cache,
+                ...this.counts[cache],
+                entries: (await (await caches.open(this.cacheNames[cache])).keys()).length,
+            })),
+        );
+    }
+
+    private async cacheFirst(name: ServiceWorkerCacheName, event: ServiceWorkerFetchEvent, maxEntries: number, key: RequestInfo = event.request) {
+        const cache = await caches.open(this.cacheNames[name]);
+        const cached = await cache.match(key);
+        this.count(name, cached !== undefined, event);
+        if (cached) return cached;
+        const response = await fetch(event.request);
+        if (response.ok) event.waitUntil(this.store(name, cache, key, response.clone(), maxEntries));
+        return response;
+    }
+
+    // The cached response at once, refreshed from the network behind it; without one, the network's.
+    private async staleWhileRevalidate(name: ServiceWorkerCacheName, event: ServiceWorkerFetchEvent, maxEntries: number, key: RequestInfo = event.request) {
+        const cache = await caches.open(this.cacheNames[name]);
+        const cached = await cache.match(key);
+        this.count(name, cached !== undefined, event);
+        const refresh = fetch(event.request).then((response) => {
+            if (response.ok) event.waitUntil(this.store(name, cache, key, response.clone(), maxEntries));
+            return response;
+        });
+        if (!cached) return refresh;
+        event.waitUntil(refresh.catch(() => undefined)); // offline: keep serving the cached copy
+        return cached;
+    }
+
+    // The app is one page: navigating to it is served stale-while-revalidate. Other navigations in
+    // the scope go to the network, falling back to the cached page when it fails.
+    private async navigate(event: ServiceWorkerFetchEvent) {
+        const url = new URL(event.request.url);
+        url.search = '';
+        url.hash = '';
+        if (url.href === this.scope) return this.staleWhileRevalidate('shell', event, Infinity, this.scope);
+        try {
+            return await fetch(event.request);
+        } catch (error) {
+            const shell = await (await caches.open(this.cacheNames.shell)).match(this.scope);
+            if (!shell) throw error;
+            return shell;
+        }
+    }
+
+    // Cache.put appends, so keys() lists the oldest-written entries first. Listing the keys of a big
+    // cache is slow, so it is trimmed back to its limit only once per tenth of the limit in writes.
+    // Precached files don't count against it and are never trimmed.
+    private async store(name: ServiceWorkerCacheName, cache: Cache, key: RequestInfo, response: Response, maxEntries: number) {
+        await cache.put(key, response);
+        if (maxEntries === Infinity) return;
+        const writes = (this.writesSinceTrim.get(name) ?? 0) + 1;
+        this.writesSinceTrim.set(name, writes);
+        if (writes < Math.ceil(maxEntries / 10)) return;
+        this.writesSinceTrim.set(name, 0);
+        const precached = new Set(this.shellUrls.values());
+        const keys = (await cache.keys()).filter((stale) => !precached.has(stale.url));
+        await Promise.all(keys.slice(0, Math.max(0, keys.length - maxEntries)).map((stale) => cache.delete(stale)));
+    }
+
+    private count(name: ServiceWorkerCacheName, hit: boolean, event: ServiceWorkerEvent) {
+        this.counts[name][hit ? 'hits' : 'misses']++;
+        // Writes are batched; the worker may be stopped at any point after the batch is written
+        this.saving ??= this.restored
+            .then(() => new Promise((resolve) => setTimeout(resolve, 1000)))
+            .then(() => this.saveStats())
+            .finally(() => {
+                this.saving = null;
+            });
+        event.waitUntil(this.saving);
+    }
+
+    // Counts made before the saved ones are read are added to them.
+    private async restoreStats() {
+        try {
+            const saved = await (await caches.open(SERVICE_WORKER_META_CACHE)).match(this.statsUrl);
+            const counts: Partial<ServiceWorkerCacheCounts> = saved ? await saved.json() : {};
+            for (const name of Object.keys(this.counts) as ServiceWorkerCacheName[]) {
+                this.counts[name].hits += counts[name]?.hits ?? 0;
+                this.counts[name].misses += counts[name]?.misses ?? 0;
+            }
+        } catch (error) {
+            console.warn('Could not restore cache statistics', error);
+        }
+    }
+
+    private async saveStats() {
+        const cache = await caches.open(SERVICE_WORKER_META_CACHE);
+        await cache.put(this.statsUrl, new Response(JSON.stringify(this.counts), { headers: { 'Content-Type': 'application/json' } }));
+    }
+}
+
+// Activation takes over open pages at once; an updated worker waits, as usual, until no page runs
+// the previous version, so a page never loads chunks from another deploy.
+if ('ServiceWorkerGlobalScope' in globalThis) {
+    const scope = globalThis as unknown as ServiceWorkerScope;
+    // Spelled out as `self.__WB_MANIFEST` in the built file, which is what injectManifest replaces
+    const manifest = (self as unknown as ServiceWorkerScope).__WB_MANIFEST;
+    const router = new ServiceWorkerRouter(scope.registration.scope, manifest ?? []);
+    scope.addEventListener('install', (event) => event.waitUntil(router.install()));
+    scope.addEventListener('activate', (event) => event.waitUntil(router.activate().then(() => scope.clients.claim())));
+    scope.addEventListener('fetch', (event) => router.handle(event));
+    scope.addEventListener('message', (event) => {
+        if (event.data.type === 'stats') {
+            event.waitUntil(router.stats().then((stats) => event.ports[0]?.postMessage(stats)));
+        }
+    });
+}
@@ -0,0 +1,74 @@
+// Synced Lyrics View
+// The lyrics panel of the full-screen player, loaded with it as a chunk of its own. Parsing and the
+// line lookup stay in the app (see Synced Lyrics there), since lyrics are fetched and parsed ahead
+// of the view.
+import React, { useCallback, useEffect, useMemo, useRef, useSyncExternalStore } from 'react';
+import { lineIndexAt, type ParsedLyrics } from './TuneFlowApp';
+
+// Holds the active line index outside React. Each line subscribes under its own index, so a
+// change notifies just the line losing and the line gaining the highlight.
+class ActiveLineStore {
+    private active = -1;
+    private listeners = new Map<number, Set<() => void>>();
+
+    get index() {
+        return this.active;
+    }
+
+    subscribe(lineIndex: number, listener: () => void) {
+        let set = this.listeners.get(lineIndex);
+        if (!set) this.listeners.set(lineIndex, (set = new Set()));
+        set.add(listener);
+        return () => {
+            set.delete(listener);
+            if (set.size === 0) this.listeners.delete(lineIndex);
+        };
+    }
+
+    set(index: number) {
+        if (index === this.active) return false;
+        const previous = this.active;
+        this.active = index;
+        this.listeners.get(previous)?.forEach((listener) => listener());
+        this.listeners.get(index)?.forEach((listener) => listener());
+        return true;
+    }
+}
+
+// Re-renders only when this line gains or loses the highlight.
+const LyricLine = React.memo<{ store: ActiveLineStore; index: number; text: string }>(({ store, index, text }) => {
+    const subscribe = useCallback((listener: () => void) => store.subscribe(index, listener), [store, index]);
+    const active = useSyncExternalStore(subscribe, () => store.index === index);
+    return (
+        <p data-line={index} className={active ? 'text-white font-semibold' : 'text-gray-400'}>
+            {text || '\u00a0'}
+        </p>
+    );
+});
+
+// Polls the playback position once per animation frame; React work happens only when the active
+// line changes, and then only in the two affected lines.
+export const SyncedLyrics: React.FC<{ lyrics: ParsedLyrics; getCurrentTime: () => number }> = ({ lyrics, getCurrentTime }) => {
+    const store = useMemo(() => new ActiveLineStore(), [lyrics]);
+    const containerRef = useRef<HTMLDivElement>(null);
+
+    useEffect(() => {
+        let frame = requestAnimationFrame(function tick() {
+            if (store.set(lineIndexAt(lyrics.times, getCurrentTime()))) {
+                containerRef.current
+                    ?.querySelector(`[data-line="${store.index}"]`)
+                    ?.scrollIntoView({ block: 'center', behavior: 'smooth' });
+            }
+            frame = requestAnimationFrame(tick);
+        });
+        return () => cancelAnimationFrame(frame);
+    }, [lyrics, store, getCurrentTime]);
+
+    return (
+        <div ref={containerRef} className="space-y-1">
+            {lyrics.lines.map((line, i) => (
+                <LyricLine key={i} store={store} index={i} text={line} />
+            ))}
+        </div>
+    );
+};